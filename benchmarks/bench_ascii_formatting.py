@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""Compare the formatting of ascii blocks value by value and chunk by chunk.
+
+Formatting value by value is used by forcing the use of a callable separator.
+Run with ``python benchmarks/bench_ascii_formatting.py``.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import timeit
+
+import numpy as np
+
+from pyvisa.util import iter_ascii_block, to_ascii_block
+
+N = 1_000_000
+
+
+def measure(values: np.ndarray, converter: str) -> None:
+    as_list = values.tolist()
+
+    def python() -> None:
+        to_ascii_block(as_list, converter, ",".join).encode("ascii")
+
+    def from_list() -> None:
+        b"".join(iter_ascii_block(as_list, converter))
+
+    def from_array() -> None:
+        b"".join(iter_ascii_block(values, converter))
+
+    reference = min(timeit.repeat(python, number=1, repeat=3))
+    print(f"converter {converter!r}, value by value: {reference * 1e3:7.1f} ms")
+    for name, func in (("list", from_list), ("np.array", from_array)):
+        duration = min(timeit.repeat(func, number=1, repeat=3))
+        print(
+            f"converter {converter!r}, {name + ':':15} {duration * 1e3:7.1f} ms"
+            f" ({reference / duration:4.1f}x)"
+        )
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    measure(rng.random(N) * 1000, "f")
+    measure(rng.random(N) * 1000, "+.6E")
+    measure(rng.integers(-(2**31), 2**31, N), "d")
+    measure(rng.integers(0, 2**31, N), "X")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+"""Compare the parsing of ascii blocks using Python and the numpy based parser.
+
+The Python parser is used by forcing the use of a callable separator. The
+parsing into a numpy array is also compared to the single ``np.fromstring``
+call used before the vectorized parser was introduced, which it should not be
+slower than. Run with ``python benchmarks/bench_ascii_parsing.py``.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import timeit
+
+import numpy as np
+
+from pyvisa.util import _integer_bases, _np_converters, from_ascii_block
+
+N = 1_000_000
+
+
+def measure(block: bytes, converter: str) -> None:
+    text = block.decode("ascii")
+
+    def python() -> None:
+        from_ascii_block(text, converter, lambda s: s.split(","), list)
+
+    def to_list() -> None:
+        from_ascii_block(block, converter, ",", list)
+
+    def to_array() -> None:
+        from_ascii_block(block, converter, ",", np.array)
+
+    def fromstring() -> None:
+        np.fromstring(text, _np_converters[converter], sep=",")
+
+    reference = min(timeit.repeat(python, number=1, repeat=3))
+    print(f"converter {converter!r}, Python:     {reference * 1e3:7.1f} ms")
+    durations = {}
+    for name, func in (("list", to_list), ("np.array", to_array)):
+        durations[name] = duration = min(timeit.repeat(func, number=1, repeat=5))
+        print(
+            f"converter {converter!r}, {name + ':':11} {duration * 1e3:7.1f} ms"
+            f" ({reference / duration:4.1f}x)"
+        )
+    if converter not in _integer_bases:
+        baseline = min(timeit.repeat(fromstring, number=1, repeat=5))
+        print(
+            f"converter {converter!r}, fromstring: {baseline * 1e3:7.1f} ms"
+            f" (np.array {baseline / durations['np.array']:4.2f}x)"
+        )
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    floats = rng.random(N) * 1000
+    integers = rng.integers(-(2**31), 2**31, N)
+    measure(",".join("%+.6E" % v for v in floats).encode(), "f")
+    measure(",".join("%g" % v for v in floats).encode(), "g")
+    measure(",".join("%d" % v for v in integers).encode(), "d")
+    measure(",".join("%X" % v for v in np.abs(integers)).encode(), "X")
+
+
+if __name__ == "__main__":
+    main()
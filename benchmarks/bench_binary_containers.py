@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""Compare the conversion of binary blocks using lists and array.array.
+
+This benchmark does not require numpy. Run with
+``python benchmarks/bench_binary_containers.py``.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import array
+import struct
+import sys
+import timeit
+
+from pyvisa.util import from_binary_block, to_binary_block
+
+N = 1_000_000
+
+
+def measure(datatype: str, is_big_endian: bool) -> None:
+    values = [float(i) if datatype in "fd" else i % 128 for i in range(N)]
+    block = struct.pack("<%d%s" % (N, datatype), *values)
+    arr = array.array(datatype, values)
+    order = "big" if is_big_endian else "little"
+    native = order == sys.byteorder
+
+    def time(func) -> float:
+        return min(timeit.repeat(func, number=1, repeat=3))
+
+    reference = time(
+        lambda: from_binary_block(block, 0, None, datatype, is_big_endian, list)
+    )
+    print(
+        f"datatype {datatype!r} ({order} endian), parse to list: {reference * 1e3:7.2f} ms"
+    )
+    for cont in (array.array, memoryview):
+        duration = time(
+            lambda: from_binary_block(block, 0, None, datatype, is_big_endian, cont)
+        )
+        print(
+            f"datatype {datatype!r}, parse to {cont.__name__ + ':':12} "
+            f"{duration * 1e3:7.2f} ms ({reference / duration:6.1f}x)"
+        )
+
+    reference = time(
+        lambda: struct.pack(
+            "%s%d%s" % (">" if is_big_endian else "<", N, datatype), *values
+        )
+    )
+    print(f"datatype {datatype!r}, struct.pack:  {reference * 1e3:7.2f} ms")
+    duration = time(lambda: to_binary_block(arr, b"", datatype, is_big_endian))
+    print(
+        f"datatype {datatype!r}, pack array.array: {duration * 1e3:7.2f} ms"
+        f" ({reference / duration:6.1f}x)" + ("" if native else " (byte swapped)")
+    )
+
+
+def main() -> None:
+    for datatype in "hfd":
+        for is_big_endian in (False, True):
+            measure(datatype, is_big_endian)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""Compare the decoding of small binary blocks with and without a BlockCodec.
+
+Run with ``python benchmarks/bench_block_codec.py``.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import array
+import timeit
+
+import numpy as np
+
+from pyvisa.util import BlockCodec, from_ieee_block, to_ieee_block
+
+N = 20_000
+
+
+def measure(n_points: int, datatype: str, name: str, container) -> None:
+    block = to_ieee_block(list(range(n_points)), datatype)
+    codec = BlockCodec(datatype, False, "ieee", container)
+
+    def function() -> None:
+        from_ieee_block(block, datatype, False, container)
+
+    def precompiled() -> None:
+        codec.decode(block)
+
+    reference = min(timeit.repeat(function, number=N, repeat=3)) / N
+    duration = min(timeit.repeat(precompiled, number=N, repeat=3)) / N
+    print(
+        f"{n_points:5d} x {datatype!r} to {name:11}: "
+        f"from_ieee_block {reference * 1e6:6.2f} us, "
+        f"BlockCodec.decode {duration * 1e6:6.2f} us ({reference / duration:4.1f}x)"
+    )
+
+
+def main() -> None:
+    for n_points in (16, 256, 4096):
+        for name, container in (
+            ("list", list),
+            ("np.array", np.array),
+            ("array.array", array.array),
+        ):
+            measure(n_points, "h", name, container)
+
+
+if __name__ == "__main__":
+    main()
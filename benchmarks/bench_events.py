@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Measure the number of events per second PyVISA can process.
+
+The in-memory library of the testsuite is used so that only the time spent in
+PyVISA is measured. Run with ``python benchmarks/bench_events.py``.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import timeit
+
+from pyvisa import ResourceManager, constants
+from pyvisa.testsuite.fake_library import FakeVisaLibrary
+
+N = 20000
+
+TRIGGER = (constants.EventType.trig, {constants.ResourceAttribute.trigger_id: 0})
+
+
+def main() -> None:
+    lib = FakeVisaLibrary.create()
+    rm = ResourceManager(lib)
+    instr = rm.open_resource("TCPIP::192.168.0.1::INSTR")
+    session = instr.session
+    events = lib.events[session]
+
+    def wait() -> None:
+        events.append(TRIGGER)
+        with instr.wait_on_event(constants.EventType.trig, 0) as response:
+            response.event.received_trigger_id
+
+    def drain() -> None:
+        events.extend([TRIGGER] * 100)
+        instr.drain_events(constants.EventType.trig)
+
+    def handler(resource, event, user_handle) -> None:
+        event.received_trigger_id
+
+    instr.install_handler(constants.EventType.trig, instr.wrap_handler(handler))
+
+    def callback() -> None:
+        lib.fire_event(session, *TRIGGER)
+
+    results = {
+        "wait_on_event": min(timeit.repeat(wait, number=N, repeat=5)) / N,
+        "drain_events": min(timeit.repeat(drain, number=N // 100, repeat=5)) / N,
+        "handler": min(timeit.repeat(callback, number=N, repeat=5)) / N,
+    }
+    for name, duration in results.items():
+        print(f"{name + ':':16} {1 / duration:10.0f} events/s")
+    rm.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Compare the overhead of regular and fast path queries.
+
+The in-memory library of the testsuite is used so that only the time spent in
+PyVISA is measured. Run with ``python benchmarks/bench_fast_path.py``.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import timeit
+
+from pyvisa import ResourceManager
+from pyvisa.testsuite.fake_library import FakeVisaLibrary
+
+N = 20000
+
+
+def main() -> None:
+    lib = FakeVisaLibrary.create()
+    lib.responder = lambda session, data: b"+1.234E+00\n"
+    rm = ResourceManager(lib)
+    instr = rm.open_resource("TCPIP::192.168.0.1::INSTR", read_termination="\n")
+
+    regular = min(timeit.repeat(lambda: instr.query("MEAS?"), number=N, repeat=5))
+    with instr.fast_path() as fast:
+        fast_path = min(timeit.repeat(lambda: fast.query("MEAS?"), number=N, repeat=5))
+
+    print(f"query:            {regular / N * 1e6:7.2f} us/call")
+    print(f"fast path query:  {fast_path / N * 1e6:7.2f} us/call")
+    print(f"speed up:         {regular / fast_path:7.2f}x")
+    rm.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -21,6 +21,7 @@ from .errors import (  # noqa: E402
     InvalidBinaryFormat,
     InvalidSession,
     LibraryError,
+    OperationCancelled,
     OSNotSupported,
     UnknownHandler,
     VisaIOError,
@@ -31,6 +32,7 @@ from .highlevel import ResourceManager  # noqa: E402
 
 # This is needed to register all resources (E402, F401).
 from .resources import Resource  # noqa
+from .resources.messagebased import transfer  # noqa: E402
 
 
 def log_to_screen(level=logging.DEBUG) -> None:
@@ -65,6 +67,7 @@ __all__ = [
     "InvalidSession",
     "LibraryError",
     "OSNotSupported",
+    "OperationCancelled",
     "ResourceManager",
     "UnknownHandler",
     "VisaIOError",
@@ -73,4 +76,5 @@ __all__ = [
     "log_to_screen",
     "log_to_stream",
     "logger",
+    "transfer",
 ]
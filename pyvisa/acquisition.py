@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+"""Continuous acquisition of binary records into a preallocated ring buffer.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import threading
+from typing import Any, Iterator, Optional
+
+from typing_extensions import Literal
+
+from . import errors, logger, util
+from .resources.messagebased import MessageBasedResource
+
+#: Behavior of the acquisition when the ring buffer is full.
+FULL_BUFFER_POLICIES = Literal["overwrite", "drop"]
+
+
+class ContinuousAcquisition:
+    """Acquire binary records in a background thread into a ring buffer.
+
+    The records are read directly into a preallocated numpy array of shape
+    (n_records, record_length), so no memory is allocated per record. Each
+    record is obtained by writing the trigger command (if any) and the query
+    to the resource and reading the binary block sent back.
+
+    Records are retrieved using get or by iterating over the acquisition, both
+    returning views into the ring buffer. A view remains valid until the next
+    record is requested, unless the 'overwrite' policy is used and the consumer
+    lags by a full buffer.
+
+    Parameters
+    ----------
+    resource : MessageBasedResource
+        Resource from which to acquire the records.
+    query : str
+        Query used to request a record.
+    record_length : int
+        Number of points in each record.
+    n_records : int, optional
+        Number of records in the ring buffer. Defaults to 16.
+    datatype : util.BINARY_DATATYPES, optional
+        Format string for a single element. See struct module. Defaults to 'f'.
+    is_big_endian : bool, optional
+        Are the data in big or little endian order. Defaults to False.
+    header_fmt : util.BINARY_HEADERS, optional
+        Format of the header prefixing the data. Defaults to 'ieee'.
+    expect_termination : bool, optional
+        When set to False, the read termination is not expected after the
+        block. Defaults to True.
+    trigger : Optional[str], optional
+        Command written before each query to trigger an acquisition.
+        Defaults to None.
+    policy : FULL_BUFFER_POLICIES, optional
+        What to do when a record is acquired while the buffer is full: with
+        'overwrite' the oldest unread record is replaced, with 'drop' the new
+        record is discarded. Defaults to 'overwrite'.
+    chunk_size : Optional[int], optional
+        Size of the chunks used to read the records. Defaults to None, meaning
+        the chunk size of the resource.
+
+    """
+
+    #: Total number of records acquired (including the dropped ones).
+    acquired: int
+
+    #: Number of records lost because the consumer did not keep up.
+    dropped: int
+
+    #: Error which stopped the acquisition thread if any.
+    error: Optional[BaseException]
+
+    def __init__(
+        self,
+        resource: MessageBasedResource,
+        query: str,
+        record_length: int,
+        n_records: int = 16,
+        datatype: util.BINARY_DATATYPES = "f",
+        is_big_endian: bool = False,
+        header_fmt: util.BINARY_HEADERS = "ieee",
+        expect_termination: bool = True,
+        trigger: Optional[str] = None,
+        policy: FULL_BUFFER_POLICIES = "overwrite",
+        chunk_size: Optional[int] = None,
+    ) -> None:
+        if util.np is None:
+            raise RuntimeError("ContinuousAcquisition requires numpy.")
+        if policy not in ("overwrite", "drop"):
+            raise ValueError("Invalid policy. Valid options are 'overwrite' and 'drop'")
+        if header_fmt not in ("ieee", "hp", "empty"):
+            raise ValueError(
+                "Invalid header format. Valid options are 'ieee', 'hp' and 'empty'"
+            )
+        np = util.np
+        self.resource = resource
+        self.query = query
+        self.trigger = trigger
+        self.policy = policy
+        self.header_fmt = header_fmt
+        self.is_big_endian = is_big_endian
+        self.expect_termination = expect_termination
+        self.chunk_size = chunk_size
+        dtype = util._np_dtype(datatype, is_big_endian)
+        self._records = np.empty((n_records, record_length), dtype)
+        # Byte views of each record and of a scratch record used to discard data
+        self._raw = self._records.view(np.uint8)
+        self._scratch = np.empty(self._raw.shape[1], np.uint8)
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._write_index = 0
+        self._read_index = 0
+        self._held: Optional[int] = None
+        self.acquired = 0
+        self.dropped = 0
+        self.error = None
+
+    @property
+    def n_records(self) -> int:
+        """Number of records in the ring buffer."""
+        return self._records.shape[0]
+
+    @property
+    def lag(self) -> int:
+        """Number of records acquired but not yet consumed."""
+        with self._condition:
+            return self._write_index - self._read_index
+
+    @property
+    def running(self) -> bool:
+        """Whether the acquisition thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start acquiring records in a background thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the acquisition thread after the current record."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._condition:
+            self._condition.notify_all()
+
+    def __enter__(self) -> "ContinuousAcquisition":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def acquire(self) -> None:
+        """Acquire a single record synchronously."""
+        with self._condition:
+            if self._write_index - self._read_index < self.n_records:
+                target = self._raw[self._write_index % self.n_records]
+            elif self.policy == "drop":
+                target = self._scratch
+            else:
+                if self._held == self._read_index:
+                    # The consumer is still using the record about to be replaced
+                    self._held = None
+                self._read_index += 1
+                self.dropped += 1
+                target = self._raw[self._write_index % self.n_records]
+
+        self._read_record(memoryview(target))
+
+        with self._condition:
+            self.acquired += 1
+            if target is self._scratch:
+                self.dropped += 1
+            else:
+                self._write_index += 1
+                self._condition.notify_all()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Get the next record, waiting for it if necessary.
+
+        Getting a record releases the previously returned one whose view may
+        then be overwritten.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Maximal time to wait in s. Defaults to None meaning wait forever.
+
+        Returns
+        -------
+        numpy.ndarray
+            View of the record in the ring buffer.
+
+        Raises
+        ------
+        TimeoutError
+            Raised if no record is available before the timeout.
+        StopIteration
+            Raised if the acquisition stopped and all records were consumed.
+
+        """
+        with self._condition:
+            if self._held is not None:
+                self._read_index = max(self._read_index, self._held + 1)
+                self._held = None
+
+            def available() -> bool:
+                return self._write_index > self._read_index or not self.running
+
+            if not self._condition.wait_for(available, timeout):
+                raise TimeoutError("No record was acquired within the timeout.")
+            if self._write_index == self._read_index:
+                if self.error is not None:
+                    raise self.error
+                raise StopIteration()
+            self._held = self._read_index
+            return self._records[self._read_index % self.n_records]
+
+    def __iter__(self) -> Iterator[Any]:
+        """Iterate over the records until the acquisition stops."""
+        while True:
+            try:
+                yield self.get()
+            except StopIteration:
+                return
+
+    def _run(self) -> None:
+        """Acquire records until stopped or until an error occurs."""
+        try:
+            while not self._stop.is_set():
+                self.acquire()
+        except BaseException as e:
+            logger.debug(
+                "%s - continuous acquisition stopped by: %s",
+                self.resource._resource_name,
+                e,
+            )
+            self.error = e
+        finally:
+            with self._condition:
+                self._condition.notify_all()
+
+    def _read_record(self, target: memoryview) -> None:
+        """Trigger the instrument and read a record into target."""
+        resource = self.resource
+        # Prevent other threads from using the resource between the query and
+        # the end of the record.
+        with resource.transaction():
+            if self.trigger:
+                resource.write(self.trigger)
+            resource.write(self.query)
+
+            header = bytearray()
+            if self.header_fmt == "ieee":
+                resource._read_bytes_into(header, 2)
+                if header[:1] != b"#":
+                    raise errors.InvalidBinaryFormat("Missing start of block indicator")
+                digits = int(header[1:2], 16)
+                if digits == 0:
+                    raise errors.InvalidBinaryFormat(
+                        "Indefinite length blocks are not supported"
+                    )
+                resource._read_bytes_into(header, 2 + digits)
+                data_length = int(header[2:])
+            elif self.header_fmt == "hp":
+                resource._read_bytes_into(header, 4)
+                _, data_length = util.parse_hp_block_header(header, self.is_big_endian)
+            else:
+                data_length = len(target)
+
+            if data_length != len(target):
+                raise errors.InvalidBinaryFormat(
+                    "Expected a block of %d bytes but got %d bytes"
+                    % (len(target), data_length)
+                )
+
+            resource._read_into(target, self.chunk_size)
+
+            termination = resource._read_termination
+            if self.expect_termination and termination:
+                resource._read_bytes_into(bytearray(), len(termination))
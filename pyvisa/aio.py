@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Deliver the VISA events handled by a resource to asyncio code.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import asyncio
+from typing import Any, Iterable, Optional, Tuple, Union
+
+from . import constants, errors, logger
+from .events import Event, EventRecord
+from .resources import Resource
+from .typing import VISAEventContext, VISASession
+
+#: Marker put in the queue once the stream is closed.
+_CLOSED = object()
+
+
+class AsyncEventStream:
+    """Asynchronous iterator over the events of a given type of a resource.
+
+    A VISA handler is installed on the resource and the handler mechanism
+    enabled for the event type. The handler reads the attributes of each event
+    in the VISA callback thread, which then returns immediately, and passes the
+    resulting EventRecord to the event loop using call_soon_threadsafe.
+
+    .. code:: python
+
+        async with AsyncEventStream(instr, constants.EventType.trig) as events:
+            async for record in events:
+                print(record.received_trigger_id)
+
+    Parameters
+    ----------
+    resource : Resource
+        Resource whose events to deliver.
+    event_type : constants.EventType
+        Type of the events to deliver.
+    maxsize : int, optional
+        Maximal number of events waiting to be consumed, the following events
+        are dropped. Defaults to 0 meaning no limit.
+    names : Optional[Iterable[str]], optional
+        Names of the attributes to read for each event. Defaults to None
+        meaning all the attributes of the events.
+    loop : Optional[asyncio.AbstractEventLoop], optional
+        Event loop to which the events are delivered. Defaults to None meaning
+        the loop running when the stream is opened.
+
+    """
+
+    #: Number of events dropped because the queue was full.
+    dropped: int
+
+    def __init__(
+        self,
+        resource: Resource,
+        event_type: constants.EventType,
+        maxsize: int = 0,
+        names: Optional[Iterable[str]] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        self.resource = resource
+        self.event_type = event_type
+        self.names: Optional[Tuple[str, ...]] = None if names is None else tuple(names)
+        self.dropped = 0
+        self._maxsize = maxsize
+        self._loop = loop
+        self._queue: Optional["asyncio.Queue[Union[EventRecord, object]]"] = None
+        self._user_handle: Any = None
+        self._closed = False
+
+    @property
+    def queue(self) -> "asyncio.Queue[Union[EventRecord, object]]":
+        """Queue in which the event records are delivered."""
+        if self._queue is None:
+            raise RuntimeError("The stream is not open.")
+        return self._queue
+
+    def open(self) -> None:
+        """Install the handler and enable the events on the resource."""
+        if self._queue is not None and not self._closed:
+            return
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+        # The size is limited in _deliver so that closing never blocks.
+        self._queue = asyncio.Queue()
+        self._closed = False
+        self._user_handle = self.resource.install_handler(
+            self.event_type, self._handler
+        )
+        try:
+            self.resource.enable_event(
+                self.event_type, constants.EventMechanism.handler
+            )
+        except Exception:
+            self.resource.uninstall_handler(
+                self.event_type, self._handler, self._user_handle
+            )
+            self._queue = None
+            raise
+
+    def close(self) -> None:
+        """Stop delivering events, ending the iteration once the queue is empty."""
+        if self._queue is None or self._closed:
+            return
+        self._closed = True
+        try:
+            self.resource.disable_event(
+                self.event_type, constants.EventMechanism.handler
+            )
+            self.resource.uninstall_handler(
+                self.event_type, self._handler, self._user_handle
+            )
+        except (errors.InvalidSession, errors.VisaIOError):
+            # The resource may have been closed already.
+            pass
+        # Go through the loop so that the events already delivered by the
+        # handler are consumed first.
+        try:
+            self._loop.call_soon_threadsafe(  # type: ignore
+                self._queue.put_nowait, _CLOSED
+            )
+        except RuntimeError:
+            pass
+
+    async def get(self) -> EventRecord:
+        """Wait for the next event.
+
+        Raises
+        ------
+        StopAsyncIteration
+            Raised if the stream is closed and all the events were consumed.
+
+        """
+        record = await self.queue.get()
+        if record is _CLOSED:
+            # Let the other consumers see the end of the stream.
+            self.queue.put_nowait(_CLOSED)
+            raise StopAsyncIteration
+        return record  # type: ignore
+
+    def __aiter__(self) -> "AsyncEventStream":
+        return self
+
+    async def __anext__(self) -> EventRecord:
+        return await self.get()
+
+    async def __aenter__(self) -> "AsyncEventStream":
+        self.open()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.close()
+
+    def _handler(
+        self,
+        session: VISASession,
+        event_type: constants.EventType,
+        context: VISAEventContext,
+        user_handle: Any,
+    ) -> None:
+        """VISA handler capturing the event and delivering it to the loop."""
+        event = Event(self.resource.visalib, event_type, context)
+        try:
+            record = event.to_record(self.names)
+        finally:
+            event.close()
+        loop = self._loop
+        assert loop is not None
+        try:
+            loop.call_soon_threadsafe(self._deliver, record)
+        except RuntimeError:
+            # The loop is closed.
+            logger.debug("Dropping %s delivered to a closed loop", record)
+
+    def _deliver(self, record: EventRecord) -> None:
+        """Put a record in the queue, in the loop thread."""
+        queue = self.queue
+        if self._maxsize and queue.qsize() >= self._maxsize:
+            self.dropped += 1
+        else:
+            queue.put_nowait(record)
@@ -61,6 +61,10 @@ AttributesPerResource: DefaultDict[
 #: Map id to attribute
 AttributesByID: Dict[int, Type["Attribute"]] = {}
 
+#: Id of the attributes whose value can be cached by a resource: they are local
+#: to the session and their value only changes when they are set.
+CacheableAttributes: Set[int] = set()
+
 
 # --- Descriptor classes ---------------------------------------------------------------
 
@@ -118,6 +122,8 @@ class Attribute(Generic[T]):
             for res in cls.resources:
                 AttributesPerResource[res].add(cls)
         AttributesByID[cls.attribute_id] = cls
+        if cls.local and cls.write and not cls.visa_name.endswith("_STATUS"):
+            CacheableAttributes.add(cls.attribute_id)
 
     @classmethod
     def redoc(cls) -> None:
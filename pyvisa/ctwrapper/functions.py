@@ -13,6 +13,7 @@ from contextlib import contextmanager
 from ctypes import (
     POINTER,
     byref,
+    c_char,
     c_double,
     c_long,
     c_void_p,
@@ -126,6 +127,7 @@ visa_functions = [
     "poke_32",
     "poke_8",
     "read",
+    "read_into",
     "read_to_file",
     "read_stb",
     "set_attribute",
@@ -1184,6 +1186,9 @@ def install_handler(
     with set_user_handle_type(library, converted_user_handle):
         if ctwrapper.WRAP_HANDLER:
             # Wrap the handler to provide a non-wrapper specific interface
+            # The library passes back a pointer to the converted user handle,
+            # so pass the handle itself rather than dereferencing the pointer
+            # (which creates a new ctypes object) on each event.
             def handler_wrapper(
                 ctype_session, ctype_event_type, ctype_event_context, ctype_user_handle
             ):
@@ -1191,11 +1196,7 @@ def install_handler(
                     ctype_session.value,
                     ctype_event_type,
                     ctype_event_context.value,
-                    (
-                        ctype_user_handle.contents
-                        if ctype_user_handle
-                        else ctype_user_handle
-                    ),
+                    converted_user_handle if ctype_user_handle else ctype_user_handle,
                 )
                 return 0
 
@@ -2340,6 +2341,36 @@ def read(library, session, count):
     return buffer.raw[: return_count.value], ret
 
 
+def read_into(library, session, buffer):
+    """Reads data from device or interface synchronously into a buffer.
+
+    Corresponds to viRead function of the VISA library. The data are written
+    directly into the buffer without intermediate copy.
+
+    Parameters
+    ----------
+    library : ctypes.WinDLL or ctypes.CDLL
+        ctypes wrapped library.
+    session : VISASession
+        Unique logical identifier to a session.
+    buffer : Union[bytearray, memoryview]
+        Writable buffer in which to store the data.
+
+    Returns
+    -------
+    int
+        Number of bytes read
+    constants.StatusCode
+        Return value of the library call.
+
+    """
+    count = len(buffer)
+    c_buffer = (c_char * count).from_buffer(buffer)
+    return_count = ViUInt32()
+    ret = library.viRead(session, c_buffer, count, byref(return_count))
+    return return_count.value, ret
+
+
 def read_stb(library, session):
     """Reads a status byte of the service request.
 
@@ -2782,7 +2813,7 @@ def write(library, session, data):
         ctypes wrapped library.
     session : VISASession
         Unique logical identifier to a session.
-    data : bytes
+    data : Union[bytes, bytearray, memoryview]
         Data to be written.
 
     Returns
@@ -2794,6 +2825,13 @@ def write(library, session, data):
 
     """
     return_count = ViUInt32()
+    if not isinstance(data, bytes):
+        # Share the memory of mutable buffers, copy read-only ones.
+        data = memoryview(data)
+        if data.readonly:
+            data = data.tobytes()
+        else:
+            data = (c_char * data.nbytes).from_buffer(data)
     # [ViSession, ViBuf, ViUInt32, ViPUInt32]
     ret = library.viWrite(session, data, len(data), byref(return_count))
     return return_count.value, ret
@@ -10,6 +10,7 @@ This file is part of PyVISA.
 
 import ctypes
 import logging
+import threading
 from collections import OrderedDict
 from typing import (
     Any,
@@ -82,6 +83,9 @@ class IVIVisaLibrary(highlevel.VisaLibraryBase):
 
     """
 
+    #: The data of write are only used during the call to viWrite.
+    write_accepts_buffers = True
+
     @staticmethod
     def get_library_paths() -> Tuple[LibraryPath, ...]:
         """Return a tuple of possible library paths."""
@@ -165,7 +169,11 @@ class IVIVisaLibrary(highlevel.VisaLibraryBase):
             raise errors.LibraryError.from_exception(exc, self.library_path)
 
         self.lib = lib
-        self._async_read_jobs: List[Tuple[types.ViJobId, SupportsBytes]] = []
+        #: Buffers of the asynchronous reads indexed by job id.
+        self._async_read_jobs: Dict[int, SupportsBytes] = {}
+        #: Asynchronous reads being started, whose job id may not be known yet.
+        self._pending_read_jobs: List[Tuple[types.ViJobId, SupportsBytes]] = []
+        self._async_read_lock = threading.Lock()
 
         # Set the argtypes, restype and errcheck for each function
         # of the visa library. Additionally store in `_functions` the
@@ -338,8 +346,18 @@ class IVIVisaLibrary(highlevel.VisaLibraryBase):
         # The buffer actually supports bytes but typing fails
         buffer = ctypes.create_string_buffer(count)
         job_id = types.ViJobId()
-        self._async_read_jobs.append((job_id, buffer))  # type: ignore
-        ret = self.lib.viReadAsync(session, buffer, count, ctypes.byref(job_id))
+        # The job may complete before viReadAsync returns, in which case the
+        # buffer is looked up among the pending jobs.
+        pending = (job_id, buffer)
+        with self._async_read_lock:
+            self._pending_read_jobs.append(pending)  # type: ignore
+        try:
+            ret = self.lib.viReadAsync(session, buffer, count, ctypes.byref(job_id))
+            with self._async_read_lock:
+                self._async_read_jobs[job_id.value] = buffer  # type: ignore
+        finally:
+            with self._async_read_lock:
+                self._pending_read_jobs.remove(pending)  # type: ignore
         return buffer, job_id.value, ret  # type: ignore
 
     def get_buffer_from_id(self, job_id: typing.VISAJobID) -> Optional[SupportsBytes]:
@@ -356,8 +374,24 @@ class IVIVisaLibrary(highlevel.VisaLibraryBase):
             Buffer in which the data are stored.
 
         """
-        for jid, buffer in self._async_read_jobs:
-            if job_id == jid.value:
+        with self._async_read_lock:
+            buffer = self._async_read_jobs.get(job_id)  # type: ignore
+            if buffer is not None:
                 return buffer
+            for jid, buffer in self._pending_read_jobs:
+                if job_id == jid.value:
+                    return buffer
 
         return None
+
+    def release_buffer(self, job_id: typing.VISAJobID) -> None:
+        """Release the buffer associated with a job id created in read_asynchronously.
+
+        Parameters
+        ----------
+        job_id : VISAJobID
+            Id of the job whose buffer is not needed anymore.
+
+        """
+        with self._async_read_lock:
+            self._async_read_jobs.pop(job_id, None)  # type: ignore
@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+"""Run event handlers in worker threads instead of the VISA callback thread.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import enum
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from . import constants, errors, logger
+from .events import Event, EventRecord
+from .resources import Resource
+from .typing import VISAEventContext, VISAHandler, VISASession
+
+#: Handler called in a worker thread with the resource and the event record.
+DispatchedHandler = Callable[[Resource, EventRecord], None]
+
+
+class OverflowPolicy(enum.Enum):
+    """What to do with an event when the queue of a dispatcher is full."""
+
+    #: Block the VISA callback thread until a worker frees some room.
+    block = "block"
+
+    #: Discard the oldest queued event to make room for the new one.
+    drop_oldest = "drop_oldest"
+
+    #: Discard the new event.
+    drop_newest = "drop_newest"
+
+
+class DispatchMetrics:
+    """Statistics about the events going through a dispatcher."""
+
+    #: Number of events passed to the handlers.
+    dispatched: int
+
+    #: Number of events discarded because the queue was full.
+    dropped: int
+
+    #: Largest number of events waiting in the queue.
+    max_depth: int
+
+    #: Total time in seconds between the capture of the events and the call of
+    #: their handler.
+    latency: float
+
+    #: Longest time in seconds between the capture of an event and the call of
+    #: its handler.
+    max_latency: float
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def __repr__(self) -> str:
+        return (
+            "<DispatchMetrics(dispatched=%d, dropped=%d, max_depth=%d, "
+            "latency=%g, max_latency=%g)>"
+            % (
+                self.dispatched,
+                self.dropped,
+                self.max_depth,
+                self.latency,
+                self.max_latency,
+            )
+        )
+
+    @property
+    def mean_latency(self) -> float:
+        """Average time in seconds between the capture and the handling of events."""
+        return self.latency / self.dispatched if self.dispatched else 0.0
+
+    def record(self, latency: float) -> None:
+        """Record the dispatch of an event.
+
+        Parameters
+        ----------
+        latency : float
+            Time in seconds between the capture of the event and the call of
+            its handler.
+
+        """
+        self.dispatched += 1
+        self.latency += latency
+        if latency > self.max_latency:
+            self.max_latency = latency
+
+    def reset(self) -> None:
+        """Reset the statistics."""
+        self.dispatched = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.latency = 0.0
+        self.max_latency = 0.0
+
+
+#: Event waiting to be handled: resource, handler, record and capture time.
+_Item = Tuple[Resource, DispatchedHandler, EventRecord, float]
+
+
+class HandlerDispatcher:
+    """Capture the events in the VISA callback thread and handle them in workers.
+
+    The VISA handler installed by the dispatcher only reads the attributes of
+    the event (the event context is not valid once the callback returns) and
+    puts the resulting EventRecord in a bounded queue, so that a slow handler
+    does not delay the delivery of the events of the other sessions. The
+    handlers are then called by a pool of worker threads.
+
+    .. code:: python
+
+        with HandlerDispatcher(maxsize=256, workers=2) as dispatcher:
+            dispatcher.install(instr, constants.EventType.trig, on_trigger)
+            instr.enable_event(
+                constants.EventType.trig, constants.EventMechanism.handler
+            )
+            ...
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        Maximal number of events waiting to be handled. Defaults to 1024.
+    workers : int, optional
+        Number of threads calling the handlers. With more than one worker the
+        events may be handled out of order. Defaults to 1.
+    overflow : OverflowPolicy, optional
+        What to do with the events received when the queue is full. Defaults
+        to OverflowPolicy.block.
+
+    """
+
+    #: Statistics about the dispatched events.
+    metrics: DispatchMetrics
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        workers: int = 1,
+        overflow: OverflowPolicy = OverflowPolicy.block,
+    ) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.maxsize = maxsize
+        self.workers = workers
+        self.overflow = overflow
+        self.metrics = DispatchMetrics()
+        self._queue: Deque[_Item] = deque()
+        #: Condition used by the workers waiting for events and by the VISA
+        #: callbacks waiting for room in the queue.
+        self._condition = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running = False
+        #: VISA handler and user handle installed for each resource, event
+        #: type and dispatched handler.
+        self._installed: Dict[
+            Tuple[Resource, constants.EventType, DispatchedHandler],
+            Tuple[VISAHandler, Any],
+        ] = {}
+
+    def __repr__(self) -> str:
+        return "<HandlerDispatcher(depth=%d, workers=%d, overflow=%s)>" % (
+            self.depth,
+            self.workers,
+            self.overflow.name,
+        )
+
+    @property
+    def depth(self) -> int:
+        """Number of events waiting to be handled."""
+        return len(self._queue)
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker threads are running."""
+        return self._running
+
+    def start(self) -> None:
+        """Start the worker threads."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+        self._threads = [
+            threading.Thread(target=self._run, daemon=True) for _ in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Uninstall the handlers and stop the workers once the queue is empty."""
+        for resource, event_type, handler in list(self._installed):
+            self.uninstall(resource, event_type, handler)
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self) -> "HandlerDispatcher":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def install(
+        self,
+        resource: Resource,
+        event_type: constants.EventType,
+        handler: DispatchedHandler,
+        names: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Install a handler called in a worker thread for the events of a resource.
+
+        The workers are started if necessary. As with Resource.install_handler,
+        the handler mechanism has to be enabled for the events to be delivered.
+
+        Parameters
+        ----------
+        resource : Resource
+            Resource whose events to handle.
+        event_type : constants.EventType
+            Type of the events to handle.
+        handler : DispatchedHandler
+            Callable called with the resource and the EventRecord of each event.
+        names : Optional[Iterable[str]], optional
+            Names of the attributes to capture for each event. Defaults to None
+            meaning all the attributes of the events.
+
+        """
+        key = (resource, event_type, handler)
+        if key in self._installed:
+            raise ValueError("%r is already installed for %s" % (handler, event_type))
+        self.start()
+        visa_handler = self._make_handler(
+            resource, handler, None if names is None else tuple(names)
+        )
+        user_handle = resource.install_handler(event_type, visa_handler)
+        self._installed[key] = (visa_handler, user_handle)
+
+    def uninstall(
+        self,
+        resource: Resource,
+        event_type: constants.EventType,
+        handler: DispatchedHandler,
+    ) -> None:
+        """Uninstall a handler installed through the dispatcher.
+
+        The events already queued are still handled.
+
+        """
+        visa_handler, user_handle = self._installed.pop((resource, event_type, handler))
+        try:
+            resource.uninstall_handler(event_type, visa_handler, user_handle)
+        except (errors.InvalidSession, errors.VisaIOError):
+            # The resource may have been closed already.
+            pass
+
+    def _make_handler(
+        self,
+        resource: Resource,
+        handler: DispatchedHandler,
+        names: Optional[Tuple[str, ...]],
+    ) -> VISAHandler:
+        """Create the VISA handler capturing the events and queuing them."""
+        visalib = resource.visalib
+
+        def visa_handler(
+            session: VISASession,
+            event_type: constants.EventType,
+            context: VISAEventContext,
+            user_handle: Any,
+        ) -> None:
+            event = Event(visalib, event_type, context)
+            try:
+                record = event.to_record(names)
+            finally:
+                event.close()
+            self._put((resource, handler, record, time.perf_counter()))
+
+        return visa_handler
+
+    def _put(self, item: _Item) -> None:
+        """Queue an event applying the overflow policy."""
+        queue = self._queue
+        with self._condition:
+            if len(queue) >= self.maxsize:
+                if self.overflow is OverflowPolicy.drop_newest:
+                    self.metrics.dropped += 1
+                    return
+                elif self.overflow is OverflowPolicy.drop_oldest:
+                    queue.popleft()
+                    self.metrics.dropped += 1
+                else:
+                    while len(queue) >= self.maxsize and self._running:
+                        self._condition.wait()
+            queue.append(item)
+            if len(queue) > self.metrics.max_depth:
+                self.metrics.max_depth = len(queue)
+            self._condition.notify_all()
+
+    def _run(self) -> None:
+        """Call the handlers of the queued events until the dispatcher stops."""
+        queue = self._queue
+        while True:
+            with self._condition:
+                while not queue and self._running:
+                    self._condition.wait()
+                if not queue:
+                    return
+                resource, handler, record, captured = queue.popleft()
+                self.metrics.record(time.perf_counter() - captured)
+                # Wake up the callbacks waiting for room.
+                self._condition.notify_all()
+            try:
+                handler(resource, record)
+            except Exception:
+                logger.exception(
+                    "Error in the handler of %s for %s", resource, record.event_type
+                )
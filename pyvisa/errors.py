@@ -595,6 +595,17 @@ class VisaIOError(Error):
         return (VisaIOError, (self.error_code,))
 
 
+class OperationCancelled(VisaIOError):
+    """Exception raised when an operation is aborted by cancelling it."""
+
+    def __init__(self) -> None:
+        super(OperationCancelled, self).__init__(VI_ERROR_ABORT)
+
+    def __reduce__(self) -> Tuple[type, tuple]:
+        """Nothing to store when pickling."""
+        return (OperationCancelled, ())
+
+
 class VisaIOWarning(Warning):
     """Exception class for VISA I/O warnings.
 
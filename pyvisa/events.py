@@ -8,7 +8,7 @@ This file is part of PyVISA.
 
 """
 
-from typing import TYPE_CHECKING, Callable, Dict, Optional, Type
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Optional, Tuple, Type
 
 from typing_extensions import ClassVar
 
@@ -20,6 +20,40 @@ if TYPE_CHECKING:
     from . import highlevel  # pragma: no cover
 
 
+class EventRecord:
+    """Type and attribute values of an event whose VISA context is closed.
+
+    The attribute values are available as attributes of the record, or using
+    the values dictionary.
+
+    """
+
+    __slots__ = ("event_type", "values")
+
+    #: Type of the event.
+    event_type: constants.EventType
+
+    #: Values of the attributes of the event by name.
+    values: Dict[str, Any]
+
+    def __init__(self, event_type: constants.EventType, values: Dict[str, Any]):
+        self.event_type = event_type
+        self.values = values
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "values":
+            raise AttributeError(name)
+        try:
+            return self.values[name]
+        except KeyError:
+            raise AttributeError(
+                "%r object has no attribute %r" % (type(self).__name__, name)
+            ) from None
+
+    def __repr__(self) -> str:
+        return "<EventRecord(%s, %r)>" % (self.event_type.name, self.values)
+
+
 class Event:
     """Event that lead to the call of an event handler.
 
@@ -36,6 +70,8 @@ class Event:
 
     """
 
+    __slots__ = ("_context", "event_type", "visalib")
+
     #: Reference to the visa library
     visalib: "highlevel.VisaLibraryBase"
 
@@ -48,6 +84,9 @@ class Event:
     #: Maps Event type to Python class encapsulating that event.
     _event_classes: ClassVar[Dict[constants.EventType, Type["Event"]]] = {}
 
+    #: Names of the VISA attributes of each event class.
+    _attribute_names: ClassVar[Dict[Type["Event"], Tuple[str, ...]]] = {}
+
     @classmethod
     def register(
         cls, event_type: constants.EventType
@@ -109,11 +148,48 @@ class Event:
         """Get the specified VISA attribute."""
         return self.visalib.get_attribute(self.context, attribute_id)[0]
 
+    @classmethod
+    def attribute_names(cls) -> Tuple[str, ...]:
+        """Names of the VISA attributes available on this class of events."""
+        try:
+            return Event._attribute_names[cls]
+        except KeyError:
+            names: Dict[str, None] = {}
+            for klass in reversed(cls.__mro__):
+                for name, value in vars(klass).items():
+                    if isinstance(value, attributes.Attribute):
+                        names[name] = None
+            result = Event._attribute_names[cls] = tuple(names)
+            return result
+
+    def to_record(self, names: Optional[Iterable[str]] = None) -> EventRecord:
+        """Read the attributes of the event and store them in a record.
+
+        Parameters
+        ----------
+        names : Optional[Iterable[str]], optional
+            Names of the attributes to read. Defaults to None meaning all the
+            attributes of the event. Attributes which cannot be read are omitted.
+
+        Returns
+        -------
+        EventRecord
+            Record which remains usable once the event is closed.
+
+        """
+        values = {}
+        for name in self.attribute_names() if names is None else names:
+            try:
+                values[name] = getattr(self, name)
+            except errors.VisaIOError:
+                pass
+        return EventRecord(self.event_type, values)
+
     def close(self):
         """Simply invalidate the context.
 
         The event is not closed since it is only ever required when using
-        the queue mechanism and this is handled in WaitResponse.
+        the queue mechanism and this is handled by WaitResponse.close.
 
         """
         self._context = None
@@ -135,6 +211,8 @@ for event in (
 class ExceptionEvent(Event):
     """Event corresponding to an exception."""
 
+    __slots__ = ()
+
     #: Status code of the operation that generated the exception
     status: Attribute[constants.StatusCode] = attributes.AttrVI_ATTR_STATUS()
 
@@ -150,6 +228,8 @@ class GPIBCICEvent(Event):
 
     """
 
+    __slots__ = ()
+
     #: New state of the controller in charge status
     cic_state: Attribute[constants.LineState] = (
         attributes.AttrVI_ATTR_GPIB_RECV_CIC_STATE()
@@ -160,6 +240,8 @@ class GPIBCICEvent(Event):
 class IOCompletionEvent(Event):
     """Event marking the completion of an IO operation."""
 
+    __slots__ = ()
+
     #: Status code of the asynchronous I/O operation that has completed.
     status: Attribute[constants.StatusCode] = attributes.AttrVI_ATTR_STATUS()
 
@@ -185,6 +267,8 @@ class IOCompletionEvent(Event):
 class TrigEvent(Event):
     """Trigger event."""
 
+    __slots__ = ()
+
     #: Identifier of the triggering mechanism on which the specified trigger event
     #: was received.
     received_trigger_id: Attribute[constants.TriggerID] = (
@@ -196,6 +280,8 @@ class TrigEvent(Event):
 class USBInteruptEvent(Event):
     """USB interruption event."""
 
+    __slots__ = ()
+
     #: Status of the read operation from the USB interrupt-IN pipe.
     status: Attribute[constants.StatusCode] = attributes.AttrVI_ATTR_STATUS()
 
@@ -210,6 +296,8 @@ class USBInteruptEvent(Event):
 class VXISignalInteruptEvent(Event):
     """VXI signal event."""
 
+    __slots__ = ()
+
     #: 16-bit Status/ID value retrieved during the IACK cycle or
     #: from the Signal register.
     signal_register_status_id: Attribute[int] = attributes.AttrVI_ATTR_SIGP_STATUS_ID()
@@ -219,6 +307,8 @@ class VXISignalInteruptEvent(Event):
 class VXIInterruptEvent(Event):
     """VXI interrupt event."""
 
+    __slots__ = ()
+
     #: 32-bit status/ID retrieved during the IACK cycle.
     status_id: Attribute[int] = attributes.AttrVI_ATTR_INTR_STATUS_ID()
 
@@ -230,6 +320,8 @@ class VXIInterruptEvent(Event):
 class PXIInteruptEvent(Event):
     """PXI interruption event."""
 
+    __slots__ = ()
+
     #: Index of the interrupt sequence that detected the interrupt condition.
     sequence: Attribute[int] = attributes.AttrVI_ATTR_PXI_RECV_INTR_SEQ()
 
@@ -13,8 +13,9 @@ import contextlib
 import copy
 import os
 import pkgutil
+import threading
 import warnings
-from collections import defaultdict
+from collections import Counter, defaultdict
 from importlib import import_module
 from itertools import chain
 from types import ModuleType, TracebackType
@@ -27,6 +28,7 @@ from typing import (
     Iterable,
     Iterator,
     List,
+    Mapping,
     NamedTuple,
     Optional,
     Set,
@@ -43,6 +45,7 @@ from typing_extensions import ClassVar, DefaultDict, Literal
 
 from . import attributes, constants, errors, logger, rname
 from .constants import StatusCode
+from .pool import SessionPool
 from .typing import (
     VISAEventContext,
     VISAHandler,
@@ -54,7 +57,7 @@ from .typing import (
 from .util import DebugInfo, LibraryPath
 
 if TYPE_CHECKING:
-    from .resources import Resource  # pragma: no cover
+    from .resources import Resource, ResourceProfile  # pragma: no cover
 
 #: Resource extended information
 #:
@@ -125,8 +128,12 @@ class VisaLibraryBase(object):
         Union[VISASession, VISARMSession, VISAEventContext], StatusCode
     ]
 
-    #: Maps session handle to warnings to ignore.
-    _ignore_warning_in_session: Dict[int, set]
+    #: Maps session handle to warnings to ignore (and the number of contexts
+    #: ignoring them).
+    _ignore_warning_in_session: DefaultDict[int, Counter]
+
+    #: Lock protecting the access to _ignore_warning_in_session.
+    _ignore_warning_lock: threading.Lock
 
     #: Extra information used for logging errors
     _logging_extra: Dict[str, str]
@@ -143,6 +150,11 @@ class VisaLibraryBase(object):
     #: Set error codes on which to issue a warning.
     issue_warning_on: Set[StatusCode]
 
+    #: Whether write accepts bytearray and memoryview objects without keeping a
+    #: reference to them once the call returns. Resources pass bytes to the
+    #: libraries which do not state it.
+    write_accepts_buffers: ClassVar[bool] = False
+
     def __new__(
         cls: Type[T], library_path: Union[str, LibraryPath] = ""
     ) -> "VisaLibraryBase":
@@ -195,7 +207,8 @@ class VisaLibraryBase(object):
         #: Error codes on which to issue a warning.
         obj.issue_warning_on = set(errors.default_warnings)
         obj._last_status_in_session = {}
-        obj._ignore_warning_in_session = defaultdict(set)
+        obj._ignore_warning_in_session = defaultdict(Counter)
+        obj._ignore_warning_lock = threading.Lock()
         obj.handlers = defaultdict(list)
         obj.resource_manager = None
 
@@ -295,9 +308,40 @@ class VisaLibraryBase(object):
             Constants identifying the warnings to ignore.
 
         """
-        self._ignore_warning_in_session[session].update(warnings_constants)
-        yield
-        self._ignore_warning_in_session[session].difference_update(warnings_constants)
+        self._ignore_warnings(session, warnings_constants)
+        try:
+            yield
+        finally:
+            self._restore_warnings(session, warnings_constants)
+
+    def _ignore_warnings(
+        self,
+        session: Union[VISASession, VISARMSession],
+        warnings_constants: Iterable[StatusCode],
+    ) -> None:
+        """Start ignoring warnings for a session.
+
+        The warnings are counted so that nested or concurrent uses of the same
+        warnings only stop being ignored once all of them are over.
+
+        """
+        with self._ignore_warning_lock:
+            self._ignore_warning_in_session[session].update(warnings_constants)
+
+    def _restore_warnings(
+        self,
+        session: Union[VISASession, VISARMSession],
+        warnings_constants: Iterable[StatusCode],
+    ) -> None:
+        """Stop ignoring warnings previously ignored using _ignore_warnings."""
+        with self._ignore_warning_lock:
+            ignored = self._ignore_warning_in_session[session]
+            warnings_constants = list(warnings_constants)
+            ignored.subtract(warnings_constants)
+            # A warning may be given several times but is removed only once.
+            for warning in set(warnings_constants):
+                if ignored[warning] <= 0:
+                    del ignored[warning]
 
     def install_visa_handler(
         self,
@@ -2284,6 +2328,35 @@ class VisaLibraryBase(object):
         """
         raise NotImplementedError
 
+    def read_into(
+        self, session: VISASession, buffer: Union[bytearray, memoryview]
+    ) -> Tuple[int, StatusCode]:
+        """Reads data from device or interface synchronously into a buffer.
+
+        Corresponds to viRead function of the VISA library. At most len(buffer)
+        bytes are read. The default implementation relies on read and copies
+        the data, libraries able to write directly into the buffer should
+        override it.
+
+        Parameters
+        ----------
+        session : VISASession
+            Unique logical identifier to a session.
+        buffer : Union[bytearray, memoryview]
+            Writable buffer in which to store the data.
+
+        Returns
+        -------
+        int
+            Number of bytes read
+        StatusCode
+            Return value of the library call.
+
+        """
+        data, ret = self.read(session, len(buffer))
+        buffer[: len(data)] = data
+        return len(data), ret
+
     def read_asynchronously(
         self, session: VISASession, count: int
     ) -> Tuple[SupportsBytes, VISAJobID, StatusCode]:
@@ -2330,6 +2403,21 @@ class VisaLibraryBase(object):
         """
         raise NotImplementedError
 
+    def release_buffer(self, job_id: VISAJobID) -> None:
+        """Release the buffer associated with a job id created in read_asynchronously
+
+        Should be called once the asynchronous read completed and its data were
+        retrieved so that the backend can free the buffer. The default
+        implementation does nothing.
+
+        Parameters
+        ----------
+        job_id : VISAJobID
+            Id of the job whose buffer is not needed anymore.
+
+        """
+        pass
+
     def read_stb(self, session: VISASession) -> Tuple[int, StatusCode]:
         """Reads a status byte of the service request.
 
@@ -2710,7 +2798,9 @@ class VisaLibraryBase(object):
         """
         raise NotImplementedError
 
-    def write(self, session: VISASession, data: bytes) -> Tuple[int, StatusCode]:
+    def write(
+        self, session: VISASession, data: Union[bytes, bytearray, memoryview]
+    ) -> Tuple[int, StatusCode]:
         """Write data to device or interface synchronously.
 
         Corresponds to viWrite function of the VISA library.
@@ -2719,8 +2809,9 @@ class VisaLibraryBase(object):
         ----------
         session : VISASession
             Unique logical identifier to a session.
-        data : bytes
-            Data to be written.
+        data : Union[bytes, bytearray, memoryview]
+            Data to be written. Only bytes are passed by the resources unless
+            write_accepts_buffers is True.
 
         Returns
         -------
@@ -2928,6 +3019,10 @@ class ResourceManager(object):
     #: Handler for atexit using a weakref to close
     _atexit_handler: Callable
 
+    #: Pool of idle sessions used by the resources opened with pooled=True,
+    #: created on first use.
+    session_pool: Optional[SessionPool] = None
+
     @classmethod
     def register_resource_class(
         cls,
@@ -3100,6 +3195,8 @@ class ResourceManager(object):
             # Cleanly close all resources when closing the manager.
             for resource in self._created_resources:
                 resource.close()
+            if self.session_pool is not None:
+                self.session_pool.clear()
             self.visalib.close(self.session)
             # mypy don't get that we can set a value we cannot get
             self.session = None  # type: ignore
@@ -3245,6 +3342,8 @@ class ResourceManager(object):
         access_mode: constants.AccessModes = constants.AccessModes.no_lock,
         open_timeout: int = constants.VI_TMO_IMMEDIATE,
         resource_pyclass: Optional[Type["Resource"]] = None,
+        profile: Optional[Union["ResourceProfile", Mapping[str, Any]]] = None,
+        pooled: bool = False,
         **kwargs: Any,
     ) -> "Resource":
         """Return an instrument for the resource name.
@@ -3264,6 +3363,14 @@ class ResourceManager(object):
         resource_pyclass : Optional[Type[Resource]], optional
             Resource Python class to use to instantiate the Resource.
             Defaults to None: select based on the resource name.
+        profile : Optional[Union[ResourceProfile, Mapping[str, Any]]], optional
+            Profile applied to the resource once opened, only the attributes
+            whose value differ are set. The attributes of the profile are
+            validated before opening the resource. Defaults to None.
+        pooled : bool, optional
+            Reuse an idle session of session_pool opened for the same resource
+            name, access mode and resource class if any, and return the session
+            to the pool when the resource is closed. Defaults to False.
         kwargs : Any
             Keyword arguments to be used to change instrument attributes
             after construction.
@@ -3274,6 +3381,14 @@ class ResourceManager(object):
             Subclass of Resource matching the resource.
 
         """
+        pool = None
+        if pooled:
+            pool = self.session_pool
+            if pool is None:
+                pool = self.session_pool = SessionPool(self.visalib)
+            if resource_pyclass is None:
+                resource_pyclass = pool.resource_classes.get(resource_name)
+
         if resource_pyclass is None:
             info = self.resource_info(resource_name, extended=True)
 
@@ -3291,6 +3406,16 @@ class ResourceManager(object):
                     "There is no class defined for %r. Using Resource",
                     (info.interface_type, info.resource_class),
                 )
+        if pool is not None:
+            pool.resource_classes[resource_name] = resource_pyclass
+
+        if profile is not None:
+            from .resources.resource import ResourceProfile
+
+            if not isinstance(profile, ResourceProfile):
+                profile = ResourceProfile("", profile)
+            profile.validate(resource_pyclass)
+
         if hasattr(self.visalib, "open_resource"):
             res = self.visalib.open_resource(  # type: ignore
                 resource_name, access_mode, open_timeout, resource_pyclass, **kwargs
@@ -3312,11 +3437,15 @@ class ResourceManager(object):
                         % (key, res.__class__.__name__)
                     )
 
+            res.session_pool = pool
             res.open(access_mode, open_timeout)
 
             for key, value in kwargs.items():
                 setattr(res, key, value)
 
+        if profile is not None:
+            res.apply_profile(profile)
+
         self._created_resources.add(res)
 
         return res
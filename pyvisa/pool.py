@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""Pool of idle sessions reused when opening the same resource again.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import TYPE_CHECKING, Callable, Deque, Dict, Optional, Tuple, Type
+
+from . import constants, errors, logger
+from .typing import VISASession
+
+if TYPE_CHECKING:
+    from .highlevel import VisaLibraryBase  # pragma: no cover
+    from .resources import Resource  # pragma: no cover
+
+#: Key identifying interchangeable sessions: resource name, access mode and
+#: Python class of the resource.
+PoolKey = Tuple[str, constants.AccessModes, Type["Resource"]]
+
+#: Callable checking that an idle session can still be used.
+HealthCheck = Callable[["VisaLibraryBase", VISASession], bool]
+
+
+def check_session(visalib: "VisaLibraryBase", session: VISASession) -> bool:
+    """Default health check ensuring that the session is still valid."""
+    try:
+        visalib.get_attribute(session, constants.ResourceAttribute.resource_class)
+    except errors.VisaIOError:
+        return False
+    return True
+
+
+class SessionPool:
+    """Idle sessions kept open to be reused by ResourceManager.open_resource.
+
+    When a resource opened with ``pooled=True`` is closed, its session is kept
+    open in the pool (after restoring the attributes modified through the
+    resource) instead of being closed, and it is used by the next resource
+    opened for the same resource name, access mode and resource class.
+
+    """
+
+    #: Maximal number of idle sessions kept open.
+    max_size: int
+
+    #: Time in seconds after which an idle session is closed, None to keep idle
+    #: sessions open until they are evicted.
+    idle_timeout: Optional[float]
+
+    #: Callable checking that an idle session can still be used before reusing it.
+    health_check: Optional[HealthCheck]
+
+    #: Number of sessions reused from the pool.
+    hits: int
+
+    #: Number of sessions which had to be opened.
+    misses: int
+
+    #: Resource classes of the resource names opened through the pool, which
+    #: avoids parsing the resource names again.
+    resource_classes: Dict[str, Type["Resource"]]
+
+    def __init__(
+        self,
+        visalib: "VisaLibraryBase",
+        max_size: int = 16,
+        idle_timeout: Optional[float] = 300.0,
+        health_check: Optional[HealthCheck] = check_session,
+    ) -> None:
+        self.visalib = visalib
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self.hits = 0
+        self.misses = 0
+        #: Idle sessions and time at which they were released for each key, the
+        #: most recently used keys being last.
+        self._idle: "OrderedDict[PoolKey, Deque[Tuple[VISASession, float]]]" = (
+            OrderedDict()
+        )
+        self.resource_classes = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return "<SessionPool(idle=%d, hits=%d, misses=%d)>" % (
+            len(self),
+            self.hits,
+            self.misses,
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(sessions) for sessions in self._idle.values())
+
+    def acquire(self, key: PoolKey) -> Optional[VISASession]:
+        """Take an idle session matching the key out of the pool.
+
+        Returns
+        -------
+        Optional[VISASession]
+            Session to reuse, or None if no healthy session is available.
+
+        """
+        self.prune()
+        while True:
+            with self._lock:
+                sessions = self._idle.get(key)
+                if not sessions:
+                    self.misses += 1
+                    return None
+                session, _ = sessions.pop()
+                if not sessions:
+                    del self._idle[key]
+            if self.health_check is None or self.health_check(self.visalib, session):
+                with self._lock:
+                    self.hits += 1
+                return session
+            logger.debug("Discarding unhealthy pooled session %s", session)
+            self._close(session)
+
+    def release(self, key: PoolKey, session: VISASession) -> None:
+        """Put an idle session in the pool.
+
+        The least recently released sessions are closed if the pool is full.
+
+        """
+        evicted = []
+        with self._lock:
+            sessions = self._idle.setdefault(key, deque())
+            sessions.append((session, time.monotonic()))
+            self._idle.move_to_end(key)
+            size = sum(len(s) for s in self._idle.values())
+            while size > self.max_size:
+                oldest_key = next(iter(self._idle))
+                oldest = self._idle[oldest_key]
+                evicted.append(oldest.popleft()[0])
+                if not oldest:
+                    del self._idle[oldest_key]
+                size -= 1
+        for session in evicted:
+            self._close(session)
+
+    def prune(self) -> None:
+        """Close the sessions which have been idle for longer than idle_timeout."""
+        if self.idle_timeout is None:
+            return
+        limit = time.monotonic() - self.idle_timeout
+        expired = []
+        with self._lock:
+            for key in list(self._idle):
+                sessions = self._idle[key]
+                while sessions and sessions[0][1] < limit:
+                    expired.append(sessions.popleft()[0])
+                if not sessions:
+                    del self._idle[key]
+        for session in expired:
+            self._close(session)
+
+    def clear(self) -> None:
+        """Close all the idle sessions."""
+        with self._lock:
+            sessions = [s for idle in self._idle.values() for s, _ in idle]
+            self._idle.clear()
+            self.resource_classes.clear()
+        for session in sessions:
+            self._close(session)
+
+    def _close(self, session: VISASession) -> None:
+        """Close a session which is not used anymore."""
+        try:
+            self.visalib.close(session)
+        except errors.VisaIOError:
+            pass
@@ -13,7 +13,7 @@ from .gpib import GPIBInstrument, GPIBInterface
 from .messagebased import MessageBasedResource
 from .pxi import PXIInstrument, PXIMemory
 from .registerbased import RegisterBasedResource
-from .resource import Resource
+from .resource import ReconnectPolicy, Resource, ResourceProfile
 from .serial import SerialInstrument
 from .tcpip import TCPIPInstrument, TCPIPSocket
 from .usb import USBInstrument, USBRaw
@@ -26,8 +26,10 @@ __all__ = [
     "MessageBasedResource",
     "PXIInstrument",
     "PXIMemory",
+    "ReconnectPolicy",
     "RegisterBasedResource",
     "Resource",
+    "ResourceProfile",
     "SerialInstrument",
     "TCPIPInstrument",
     "TCPIPSocket",
@@ -9,25 +9,39 @@ This file is part of PyVISA.
 """
 
 import contextlib
-import struct
+import functools
+import itertools
+import math
+import queue
+import threading
 import time
 import warnings
+from concurrent.futures import Future
 from typing import (
     Any,
     Callable,
+    Generator,
     Iterable,
     Iterator,
     Optional,
     Protocol,
     Sequence,
+    Tuple,
     Type,
     Union,
+    cast,
 )
 
+from typing_extensions import Literal
+
 from .. import attributes, constants, errors, logger, util
 from ..attributes import Attribute
 from ..highlevel import VisaLibraryBase
-from .resource import Resource
+from ..typing import VISASession
+from .resource import Resource, idempotent, serialized
+
+#: Strategies used to wait for the completion of pending operations.
+WAIT_COMPLETE_STRATEGIES = Literal["auto", "opc_query", "esr_poll", "stb_poll", "srq"]
 
 
 class SupportsUpdate(Protocol):
@@ -36,6 +50,139 @@ class SupportsUpdate(Protocol):
     def update(self, size: int) -> None: ...
 
 
+class TimeoutModel:
+    """Model of the duration of transfers used to compute timeouts.
+
+    The time needed to transfer n bytes is modelled as latency + n / bandwidth.
+    Both parameters are refined after each successful transfer using an
+    exponentially weighted moving average, so that the timeouts track the
+    actual performance of the link.
+
+    Parameters
+    ----------
+    latency : float, optional
+        Initial estimate of the latency in ms. Defaults to 100 ms.
+    bandwidth : float, optional
+        Initial estimate of the bandwidth in bytes/ms (i.e. kB/s). Defaults to
+        100 bytes/ms.
+    safety_factor : float, optional
+        Factor by which the estimated duration is multiplied to obtain the
+        timeout. Defaults to 4.
+    min_timeout : float, optional
+        Smallest timeout in ms that can be used. Defaults to 200 ms.
+    max_timeout : Optional[float], optional
+        Largest timeout in ms that can be used. Defaults to None, meaning no
+        upper bound.
+    stall_timeout : Optional[float], optional
+        Inactivity window in ms. When set, reads are split in chunks small enough
+        to be expected within this window and the operation fails if a chunk
+        does not arrive in time, even if min_timeout is larger. Defaults to
+        None.
+    smoothing : float, optional
+        Weight of the new measurements in the moving averages. Defaults to 0.2.
+
+    """
+
+    #: Transfers smaller than this number of bytes are used to refine the latency,
+    #: larger ones to refine the bandwidth.
+    latency_threshold: int = 1024
+
+    #: Smallest chunk size used when limiting the chunks to the stall window.
+    min_chunk_size: int = 512
+
+    def __init__(
+        self,
+        latency: float = 100.0,
+        bandwidth: float = 100.0,
+        safety_factor: float = 4.0,
+        min_timeout: float = 200.0,
+        max_timeout: Optional[float] = None,
+        stall_timeout: Optional[float] = None,
+        smoothing: float = 0.2,
+    ) -> None:
+        if latency < 0 or bandwidth <= 0:
+            raise ValueError("The latency and the bandwidth must be positive.")
+        if not 0 < smoothing <= 1:
+            raise ValueError("The smoothing must be in ]0, 1].")
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.safety_factor = safety_factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.stall_timeout = stall_timeout
+        self.smoothing = smoothing
+
+    def estimate(self, size: int) -> float:
+        """Timeout in ms to use for a transfer of size bytes."""
+        timeout = self.safety_factor * (self.latency + size / self.bandwidth)
+        timeout = max(timeout, self.min_timeout)
+        if self.max_timeout is not None:
+            timeout = min(timeout, self.max_timeout)
+        return timeout
+
+    def limit_chunk_size(self, size: int) -> int:
+        """Reduce a chunk size so that the chunk is expected within stall_timeout."""
+        if self.stall_timeout is None:
+            return size
+        window = self.stall_timeout / self.safety_factor - self.latency
+        return min(size, max(int(window * self.bandwidth), self.min_chunk_size))
+
+    def update(self, size: int, elapsed: float) -> None:
+        """Refine the model using a transfer of size bytes which took elapsed ms."""
+        alpha = self.smoothing
+        if size <= self.latency_threshold:
+            self.latency += alpha * (elapsed - self.latency)
+        else:
+            # Ensure the transfer time is positive even if the latency is overestimated
+            duration = max(elapsed - self.latency, elapsed / 2, 1e-3)
+            self.bandwidth += alpha * (size / duration - self.bandwidth)
+
+
+class _TimedTransfer:
+    """Apply a timeout model to the low level calls of a single operation."""
+
+    def __init__(
+        self, resource: "MessageBasedResource", model: TimeoutModel, count: int
+    ) -> None:
+        self.resource = resource
+        self.model = model
+        self.start = time.perf_counter()
+        self.deadline = None if count < 0 else self.start + model.estimate(count) / 1e3
+        self.received = 0
+        self.original_timeout = self.timeout = resource.get_visa_attribute(
+            constants.ResourceAttribute.timeout_value
+        )
+
+    def prepare(self, size: int) -> int:
+        """Set the timeout of the next call and return the size to use."""
+        model = self.model
+        size = model.limit_chunk_size(size)
+        timeout = model.estimate(size)
+        if model.stall_timeout is not None:
+            timeout = min(timeout, model.stall_timeout)
+        if self.deadline is not None:
+            left = (self.deadline - time.perf_counter()) * 1e3
+            if left <= 0:
+                raise errors.VisaIOError(constants.StatusCode.error_timeout)
+            timeout = min(timeout, left)
+        self._set_timeout(math.ceil(timeout))
+        return size
+
+    def finish(self, success: bool) -> None:
+        """Restore the resource timeout and update the model if appropriate."""
+        self._set_timeout(self.original_timeout)
+        if success:
+            elapsed = (time.perf_counter() - self.start) * 1e3
+            self.model.update(self.received, elapsed)
+
+    def _set_timeout(self, timeout: int) -> None:
+        if timeout != self.timeout:
+            self.resource.set_visa_attribute(
+                constants.ResourceAttribute.timeout_value, timeout
+            )
+            self.timeout = timeout
+
+
 class ControlRenMixin(object):
     """Common control_ren method of some messaged based resources."""
 
@@ -93,6 +240,18 @@ class MessageBasedResource(Resource):
     #: Internal storage for the encoding
     _encoding: str = "ascii"
 
+    #: Strategy selected by wait_complete in automatic mode
+    _wait_complete_strategy: Optional[WAIT_COMPLETE_STRATEGIES] = None
+
+    #: Time in ms during which wait_complete waits for a service request before
+    #: polling the event status register, when selecting a strategy in
+    #: automatic mode.
+    wait_complete_probe_time: float = 100.0
+
+    #: Model used to compute the timeout of each operation from the expected
+    #: transfer size. When None, the timeout attribute is used as is.
+    timeout_model: Optional[TimeoutModel] = None
+
     @property
     def encoding(self) -> str:
         """Encoding used for read and write operations."""
@@ -156,12 +315,31 @@ class MessageBasedResource(Resource):
     #: Should I/O accesses use DMA (True) or Programmed I/O (False).
     allow_dma: Attribute[bool] = attributes.AttrVI_ATTR_DMA_ALLOW_EN()
 
-    def write_raw(self, message: bytes) -> int:
+    @contextlib.contextmanager
+    def _timed_transfer(self, count: int) -> Iterator[Optional[_TimedTransfer]]:
+        """Apply the timeout model if any to an operation of count bytes.
+
+        Use -1 if the number of bytes to transfer is unknown.
+
+        """
+        if self.timeout_model is None:
+            yield None
+            return
+        timer = _TimedTransfer(self, self.timeout_model, count)
+        success = False
+        try:
+            yield timer
+            success = True
+        finally:
+            timer.finish(success)
+
+    @serialized
+    def write_raw(self, message: Union[bytes, bytearray, memoryview]) -> int:
         """Write a byte message to the device.
 
         Parameters
         ----------
-        message : bytes
+        message : Union[bytes, bytearray, memoryview]
             The message to be sent.
 
         Returns
@@ -170,8 +348,77 @@ class MessageBasedResource(Resource):
             Number of bytes written
 
         """
-        return self.visalib.write(self.session, message)[0]
+        with self._timed_transfer(len(message)) as timer:
+            if timer is None:
+                return self._write_buffer(message)
+            total = len(message)
+            size = timer.prepare(total)
+            if size >= total:
+                count = self._write_buffer(message)
+                timer.received = count
+                return count
+
+            # Split the message so that each piece is expected within the stall
+            # window, END being only asserted with the last piece.
+            send_end = self.get_visa_attribute(
+                constants.ResourceAttribute.send_end_enabled
+            )
+            self.set_visa_attribute(
+                constants.ResourceAttribute.send_end_enabled, constants.VI_FALSE
+            )
+            count = 0
+            try:
+                while count < total:
+                    if count + size >= total and send_end:
+                        self.set_visa_attribute(
+                            constants.ResourceAttribute.send_end_enabled, send_end
+                        )
+                    piece = message[count : count + size]
+                    count += self._write_buffer(piece)
+                    timer.received = count
+                    if count < total:
+                        size = timer.prepare(total - count)
+            finally:
+                self.set_visa_attribute(
+                    constants.ResourceAttribute.send_end_enabled, send_end
+                )
+        return count
+
+    def _write_buffer(self, data: Union[bytes, bytearray, memoryview]) -> int:
+        """Write data, converted to bytes unless the library accepts buffers."""
+        if not (isinstance(data, bytes) or self.visalib.write_accepts_buffers):
+            data = bytes(data)
+        return self.visalib.write(self.session, data)[0]
 
+    @serialized
+    def write_async(
+        self, message: Union[bytes, bytearray, memoryview]
+    ) -> "Future[int]":
+        """Start writing a byte message to the device without waiting.
+
+        The write completes in the background and the returned future is
+        resolved by the IO completion event of the operation, which allows to
+        overlap the transfers to several instruments from a single thread.
+        Cancelling the future terminates the operation.
+
+        Parameters
+        ----------
+        message : Union[bytes, bytearray, memoryview]
+            The message to be sent.
+
+        Returns
+        -------
+        Future[int]
+            Future resolved with the number of bytes written or with the
+            VisaIOError which made the operation fail.
+
+        """
+        jobs = self._get_async_jobs()
+        data = bytes(message)
+        job_id, _ = self.visalib.write_asynchronously(self.session, data)
+        return jobs.start(job_id, None, data)
+
+    @serialized
     def write(
         self,
         message: str,
@@ -214,6 +461,7 @@ class MessageBasedResource(Resource):
 
         return count
 
+    @serialized
     def write_ascii_values(
         self,
         message: str,
@@ -222,6 +470,7 @@ class MessageBasedResource(Resource):
         separator: Union[str, Callable[[Iterable[str]], str]] = ",",
         termination: Optional[str] = None,
         encoding: Optional[str] = None,
+        chunk_size: Optional[int] = None,
     ):
         """Write a string message to the device followed by values in ascii format.
 
@@ -245,6 +494,11 @@ class MessageBasedResource(Resource):
         encoding : Optional[str], optional
             Alternative encoding to use to turn str into bytes. If None, the
             value of encoding is used. Defaults to None.
+        chunk_size : Optional[int], optional
+            Number of values formatted and written at once. When specified, the
+            message is sent using several writes, END being asserted only with
+            the last one, so that the whole message is never held in memory.
+            Defaults to None, meaning the message is sent in a single write.
 
         Returns
         -------
@@ -261,17 +515,63 @@ class MessageBasedResource(Resource):
                 stacklevel=2,
             )
 
-        block = util.to_ascii_block(values, converter, separator)
+        if chunk_size is None:
+            msg = bytearray(message.encode(enco))
+            for chunk in util.iter_ascii_block(
+                values, converter, separator, encoding=enco
+            ):
+                msg += chunk
+            if term:
+                msg += term.encode(enco)
+            return self.write_raw(msg)
+
+        chunks = itertools.chain(
+            (message.encode(enco),),
+            util.iter_ascii_block(values, converter, separator, chunk_size, enco),
+            (term.encode(enco),) if term else (),
+        )
+        return self._write_chunks(chunks)
 
-        msg = message.encode(enco) + block.encode(enco)
+    def _write_chunks(self, chunks: Iterable[bytes]) -> int:
+        """Write chunks of data as a single message.
 
-        if term:
-            msg += term.encode(enco)
+        END is only asserted (if enabled) with the last chunk. Empty chunks are
+        skipped.
 
-        count = self.write_raw(msg)
+        Parameters
+        ----------
+        chunks : Iterable[bytes]
+            Successive parts of the message.
 
+        Returns
+        -------
+        int
+            Number of bytes written.
+
+        """
+        send_end = self.get_visa_attribute(constants.ResourceAttribute.send_end_enabled)
+        count = 0
+        iterator = (chunk for chunk in chunks if chunk)
+        current = next(iterator, None)
+        self.set_visa_attribute(
+            constants.ResourceAttribute.send_end_enabled, constants.VI_FALSE
+        )
+        try:
+            while current is not None:
+                following = next(iterator, None)
+                if following is None and send_end:
+                    self.set_visa_attribute(
+                        constants.ResourceAttribute.send_end_enabled, send_end
+                    )
+                count += self.write_raw(current)
+                current = following
+        finally:
+            self.set_visa_attribute(
+                constants.ResourceAttribute.send_end_enabled, send_end
+            )
         return count
 
+    @serialized
     def write_binary_values(
         self,
         message: str,
@@ -320,16 +620,7 @@ class MessageBasedResource(Resource):
                 stacklevel=2,
             )
 
-        if header_fmt == "ieee":
-            block = util.to_ieee_block(values, datatype, is_big_endian)
-        elif header_fmt == "rs":
-            block = util.to_rs_block(values, datatype, is_big_endian)
-        elif header_fmt == "hp":
-            block = util.to_hp_block(values, datatype, is_big_endian)
-        elif header_fmt == "empty":
-            block = util.to_binary_block(values, b"", datatype, is_big_endian)
-        else:
-            raise ValueError("Unsupported header_fmt: %s" % header_fmt)
+        block = _block_codec(datatype, is_big_endian, header_fmt).encode(values)
 
         msg = message.encode(enco) + block
 
@@ -340,6 +631,7 @@ class MessageBasedResource(Resource):
 
         return count
 
+    @serialized
     def read_bytes(
         self,
         count: int,
@@ -371,20 +663,60 @@ class MessageBasedResource(Resource):
             Bytes read from the instrument.
 
         """
-        chunk_size = chunk_size or self.chunk_size
         ret = bytearray()
-        left_to_read = count
+        self._read_bytes_into(
+            ret, count, chunk_size, break_on_termchar, monitoring_interface
+        )
+        return bytes(ret)
+
+    def _read_bytes_into(
+        self,
+        buffer: bytearray,
+        count: int,
+        chunk_size: Optional[int] = None,
+        break_on_termchar: bool = False,
+        monitoring_interface: Optional[SupportsUpdate] = None,
+    ) -> None:
+        """Read from the instrument until buffer contains count bytes.
+
+        The data are appended to the provided buffer which hence contains all
+        the data received so far even if an error occurs during the transfer.
+
+        Parameters
+        ----------
+        buffer : bytearray
+            Buffer to which the read data are appended.
+        count : int
+            Total number of bytes the buffer should contain.
+        chunk_size : Optional[int], optional
+            The chunk size to use to perform the reading. Defaults to None,
+            meaning the resource wide set value is set.
+        break_on_termchar : bool, optional
+            Should the reading stop when a termination character is encountered
+            or when the message ends. Defaults to False.
+        monitoring_interface : SupportsUpdate Protocol, optional
+            Progress monitoring object with update() method that accepts the number
+            of bytes read.
+
+        """
+        chunk_size = chunk_size or self.chunk_size
         success = constants.StatusCode.success
         termchar_read = constants.StatusCode.success_termination_character_read
 
-        with self.ignore_warning(
-            constants.StatusCode.success_device_not_present,
-            constants.StatusCode.success_max_count_read,
+        with (
+            self._timed_transfer(count - len(buffer)) as timer,
+            self.ignore_warning(
+                constants.StatusCode.success_device_not_present,
+                constants.StatusCode.success_max_count_read,
+            ),
         ):
             try:
                 status = None
-                while len(ret) < count:
-                    size = min(chunk_size, left_to_read)
+                while len(buffer) < count:
+                    self._check_cancelled()
+                    size = min(chunk_size, count - len(buffer))
+                    if timer:
+                        size = timer.prepare(size)
                     logger.debug(
                         "%s - reading %d bytes (last status %r)",
                         self._resource_name,
@@ -394,8 +726,9 @@ class MessageBasedResource(Resource):
                     chunk, status = self.visalib.read(self.session, size)
                     if monitoring_interface:
                         monitoring_interface.update(len(chunk))
-                    ret.extend(chunk)
-                    left_to_read -= len(chunk)
+                    if timer:
+                        timer.received += len(chunk)
+                    buffer.extend(chunk)
                     if break_on_termchar and (
                         status == success or status == termchar_read
                     ):
@@ -405,11 +738,39 @@ class MessageBasedResource(Resource):
                     "%s - exception while reading: %s\nBuffer content: %r",
                     self._resource_name,
                     e,
-                    ret,
+                    buffer,
                 )
                 raise
-        return bytes(ret)
 
+    def _read_into(self, view: memoryview, chunk_size: Optional[int] = None) -> None:
+        """Fill a writable buffer with data read from the instrument.
+
+        The data are written directly in the buffer which avoids allocating
+        memory for each chunk.
+
+        Parameters
+        ----------
+        view : memoryview
+            Writable byte view of the buffer to fill.
+        chunk_size : Optional[int], optional
+            The chunk size to use to perform the reading. Defaults to None,
+            meaning the resource wide set value is set.
+
+        """
+        chunk_size = chunk_size or self.chunk_size
+        offset = 0
+        with self.ignore_warning(
+            constants.StatusCode.success_device_not_present,
+            constants.StatusCode.success_max_count_read,
+        ):
+            while offset < len(view):
+                self._check_cancelled()
+                count, _ = self.visalib.read_into(
+                    self.session, view[offset : offset + chunk_size]
+                )
+                offset += count
+
+    @serialized
     def read_raw(self, size: Optional[int] = None) -> bytes:
         """Read the unmodified string sent from the instrument to the computer.
 
@@ -429,11 +790,40 @@ class MessageBasedResource(Resource):
         """
         return bytes(self._read_raw(size))
 
+    @serialized
+    def read_async(self, count: Optional[int] = None) -> "Future[bytes]":
+        """Start reading bytes from the device without waiting.
+
+        The read completes in the background, once count bytes were received or
+        a termination condition occurred, and the returned future is resolved
+        by the IO completion event of the operation. Cancelling the future
+        terminates the operation.
+
+        Parameters
+        ----------
+        count : Optional[int], optional
+            Maximal number of bytes to read. Defaults to None, meaning the
+            chunk size of the resource.
+
+        Returns
+        -------
+        Future[bytes]
+            Future resolved with the bytes read or with the VisaIOError which
+            made the operation fail.
+
+        """
+        jobs = self._get_async_jobs()
+        buffer, job_id, _ = self.visalib.read_asynchronously(
+            self.session, count or self.chunk_size
+        )
+        return jobs.start(job_id, buffer)
+
     def _read_raw(
         self,
         size: Optional[int] = None,
         monitoring_interface: Optional[SupportsUpdate] = None,
-    ):
+        buffer: Optional[bytearray] = None,
+    ) -> bytearray:
         """Read the unmodified string sent from the instrument to the computer.
 
         In contrast to read(), no termination characters are stripped.
@@ -447,6 +837,10 @@ class MessageBasedResource(Resource):
             Progress monitoring object with update() method that accepts the number
             of bytes read. See the tqdm documentation (a progress bar package) for
             more information.
+        buffer : Optional[bytearray], optional
+            Buffer to which the read data are appended. When provided, the data
+            read before an error occurred can be retrieved from it. Defaults to
+            None, meaning a new buffer is created.
 
         Returns
         -------
@@ -458,14 +852,20 @@ class MessageBasedResource(Resource):
 
         loop_status = constants.StatusCode.success_max_count_read
 
-        ret = bytearray()
-        with self.ignore_warning(
-            constants.StatusCode.success_device_not_present,
-            constants.StatusCode.success_max_count_read,
+        ret = bytearray() if buffer is None else buffer
+        with (
+            self._timed_transfer(-1) as timer,
+            self.ignore_warning(
+                constants.StatusCode.success_device_not_present,
+                constants.StatusCode.success_max_count_read,
+            ),
         ):
             try:
                 status = loop_status
                 while status == loop_status:
+                    self._check_cancelled()
+                    if timer:
+                        size = timer.prepare(size)
                     logger.debug(
                         "%s - reading %d bytes (last status %r)",
                         self._resource_name,
@@ -475,6 +875,8 @@ class MessageBasedResource(Resource):
                     chunk, status = self.visalib.read(self.session, size)
                     if monitoring_interface:
                         monitoring_interface.update(len(chunk))
+                    if timer:
+                        timer.received += len(chunk)
                     ret.extend(chunk)
             except errors.VisaIOError as e:
                 logger.debug(
@@ -487,6 +889,7 @@ class MessageBasedResource(Resource):
 
         return ret
 
+    @serialized
     def read(
         self, termination: Optional[str] = None, encoding: Optional[str] = None
     ) -> str:
@@ -534,6 +937,7 @@ class MessageBasedResource(Resource):
 
         return message[: -len(termination)]
 
+    @serialized
     def read_ascii_values(
         self,
         converter: util.ASCII_CONVERTER = "f",
@@ -560,11 +964,23 @@ class MessageBasedResource(Resource):
             Parsed data.
 
         """
-        # Use read rather than _read_raw because we cannot handle a bytearray
-        block = self.read()
+        # Parse the bytes directly to avoid decoding large blocks
+        block = self._read_raw()
+        termination = (self._read_termination or "").encode(self._encoding)
+        if termination:
+            if block.endswith(termination):
+                del block[-len(termination) :]
+            else:
+                warnings.warn(
+                    "read string doesn't end with termination characters",
+                    stacklevel=2,
+                )
 
-        return util.from_ascii_block(block, converter, separator, container)
+        return util.from_ascii_block(
+            block, converter, separator, container, encoding=self._encoding
+        )
 
+    @serialized
     def read_binary_values(
         self,
         datatype: util.BINARY_DATATYPES = "f",
@@ -614,68 +1030,93 @@ class MessageBasedResource(Resource):
             Data read from the device.
 
         """
-        block = self._read_raw(chunk_size, monitoring_interface=monitoring_interface)
+        return self.resumable_read_binary_values(
+            datatype,
+            is_big_endian,
+            container,
+            header_fmt,
+            expect_termination,
+            data_points,
+            chunk_size,
+            monitoring_interface,
+            length_before_block,
+            raise_on_late_block,
+        ).read()
 
-        if header_fmt == "ieee":
-            offset, data_length = util.parse_ieee_block_header(
-                block, length_before_block, raise_on_late_block
-            )
+    def resumable_read_bytes(
+        self,
+        count: int,
+        chunk_size: Optional[int] = None,
+        monitoring_interface: Optional[SupportsUpdate] = None,
+    ) -> "ResumableTransfer":
+        """Prepare a read of a certain number of bytes that can be resumed.
 
-        elif header_fmt == "rs":
-            offset, data_length = util.parse_ieee_or_rs_block_header(
-                block, length_before_block, raise_on_late_block
-            )
-        elif header_fmt == "hp":
-            offset, data_length = util.parse_hp_block_header(
-                block, is_big_endian, length_before_block, raise_on_late_block
-            )
-        elif header_fmt == "empty":
-            offset = 0
-            data_length = -1
-        else:
-            raise ValueError(
-                "Invalid header format. Valid options are 'ieee', 'empty', 'hp'"
-            )
+        No data is read before calling the read method of the returned object.
+        If the transfer is interrupted by an error (for example a timeout), the
+        data already received are kept and calling read again continues the
+        transfer where it stopped.
 
-        # Allow to support instrument such as the Keithley 2000 that do not
-        # report the length of the block
-        data_length = (
-            data_length if data_length >= 0 else data_points * struct.calcsize(datatype)
-        )
+        Parameters
+        ----------
+        count : int
+            The number of bytes to read from the instrument.
+        chunk_size : Optional[int], optional
+            The chunk size to use to perform the reading. Defaults to None,
+            meaning the resource wide set value is set.
+        monitoring_interface : SupportsUpdate Protocol, optional
+            Progress monitoring object with update() method that accepts the number
+            of bytes read.
 
-        expected_length = offset + data_length
+        Returns
+        -------
+        ResumableTransfer
+            Object managing the transfer.
 
-        if expect_termination and self._read_termination is not None:
-            expected_length += len(self._read_termination)
+        """
+        return ResumableTransfer(self, count, chunk_size, monitoring_interface)
 
-        # Read all the data if we know what to expect.
-        if data_length > 0:
-            block.extend(
-                self.read_bytes(
-                    expected_length - len(block),
-                    chunk_size=chunk_size,
-                    monitoring_interface=monitoring_interface,
-                )
-            )
-        elif data_length == 0:
-            pass
-        else:
-            raise ValueError(
-                "The length of the data to receive could not be "
-                "determined. You should provide the number of "
-                "points you expect using the data_points keyword "
-                "argument."
-            )
+    def resumable_read_binary_values(
+        self,
+        datatype: util.BINARY_DATATYPES = "f",
+        is_big_endian: bool = False,
+        container: Union[Type, Callable[[Iterable], Sequence]] = list,
+        header_fmt: util.BINARY_HEADERS = "ieee",
+        expect_termination: bool = True,
+        data_points: int = -1,
+        chunk_size: Optional[int] = None,
+        monitoring_interface: Optional[SupportsUpdate] = None,
+        length_before_block: Optional[int] = None,
+        raise_on_late_block: bool = False,
+    ) -> "ResumableBinaryTransfer":
+        """Prepare a read of values in binary format that can be resumed.
 
-        try:
-            # Do not reparse the headers since it was already done and since
-            # this allows for custom data length
-            return util.from_binary_block(
-                block, offset, data_length, datatype, is_big_endian, container
-            )
-        except ValueError as e:
-            raise errors.InvalidBinaryFormat(e.args[0])
+        No data is read before calling the read method of the returned object.
+        If the transfer is interrupted by an error (for example a timeout), the
+        data already received are kept and calling read again continues the
+        transfer where it stopped. The arguments are the same as for
+        read_binary_values.
+
+        Returns
+        -------
+        ResumableBinaryTransfer
+            Object managing the transfer.
+
+        """
+        return ResumableBinaryTransfer(
+            self,
+            datatype,
+            is_big_endian,
+            container,
+            header_fmt,
+            expect_termination,
+            data_points,
+            chunk_size,
+            monitoring_interface,
+            length_before_block,
+            raise_on_late_block,
+        )
 
+    @idempotent
     def query(self, message: str, delay: Optional[float] = None) -> str:
         """A combination of write(message) and read()
 
@@ -701,6 +1142,7 @@ class MessageBasedResource(Resource):
 
         return self.read()
 
+    @idempotent
     def query_ascii_values(
         self,
         message: str,
@@ -742,6 +1184,7 @@ class MessageBasedResource(Resource):
 
         return self.read_ascii_values(converter, separator, container)
 
+    @idempotent
     def query_binary_values(
         self,
         message: str,
@@ -822,6 +1265,235 @@ class MessageBasedResource(Resource):
             raise_on_late_block,
         )
 
+    def fast_path(self) -> "FastPath":
+        """Low overhead access to the resource for small repeated messages.
+
+        The returned object should be used as a context manager, and provides
+        write, write_raw, read, read_raw and query methods whose per-call
+        overhead is limited to the library call. The resource settings are
+        captured when entering the context.
+
+        Returns
+        -------
+        FastPath
+            Context manager giving low overhead access to the resource.
+
+        """
+        return FastPath(self)
+
+    @serialized
+    def wait_complete(
+        self,
+        strategy: WAIT_COMPLETE_STRATEGIES = "auto",
+        timeout: Union[float, Literal["default"]] = "default",
+        poll_interval: float = 1.0,
+        max_poll_interval: float = 100.0,
+    ) -> float:
+        """Wait for the completion of all the pending operations of the device.
+
+        The following strategies, relying on the IEEE 488.2 common commands,
+        are available:
+
+        - 'opc_query': send a blocking ``*OPC?`` query.
+        - 'esr_poll': send ``*OPC`` and poll the event status register using ``*ESR?``
+        - 'stb_poll': send ``*ESE 1;*OPC`` and poll the status byte until the
+          event summary bit is set.
+        - 'srq': send ``*ESE 1;*SRE 32;*OPC`` and wait for the service request
+          event.
+        - 'auto': use 'srq' if the service request event can be enabled on the
+          resource and 'opc_query' otherwise. If no service request is received
+          within wait_complete_probe_time, the event status register is polled
+          and 'esr_poll' is used if the operations completed without the device
+          requesting service. The choice is remembered once the operations
+          completed.
+
+        The 'stb_poll' and 'srq' strategies modify the event status enable and
+        service request enable registers of the device. Polling strategies wait
+        between two polls, doubling the waiting time each time.
+
+        Parameters
+        ----------
+        strategy : WAIT_COMPLETE_STRATEGIES, optional
+            Strategy used to detect the completion. Defaults to 'auto'.
+        timeout : Union[float, Literal["default"]], optional
+            Maximal time to wait in ms. Defaults to "default" which means use
+            self.timeout.
+        poll_interval : float, optional
+            Initial waiting time between two polls in ms. Defaults to 1 ms.
+        max_poll_interval : float, optional
+            Maximal waiting time between two polls in ms. Defaults to 100 ms.
+
+        Returns
+        -------
+        float
+            Time spent waiting in s.
+
+        Raises
+        ------
+        errors.VisaIOError
+            Raised with error_timeout if the operations did not complete within
+            the timeout.
+
+        """
+        tout = cast(Optional[float], self.timeout if timeout == "default" else timeout)
+        start = time.perf_counter()
+        deadline = (
+            None if tout is None or math.isinf(tout) else start + max(tout, 0) / 1e3
+        )
+
+        if strategy == "auto":
+            if self._wait_complete_strategy is None:
+                self._wait_complete_strategy = self._probe_wait_complete(
+                    timeout, deadline, poll_interval, max_poll_interval
+                )
+                return time.perf_counter() - start
+            strategy = self._wait_complete_strategy
+
+        if strategy == "opc_query":
+            old_timeout = self.timeout
+            self.timeout = math.inf if tout is None else tout
+            try:
+                self.query("*OPC?")
+            finally:
+                self.timeout = old_timeout
+
+        elif strategy == "esr_poll":
+            # Clear the event status register before requesting a new OPC
+            self.query("*ESR?")
+            self.write("*OPC")
+            self._poll(
+                lambda: int(self.query("*ESR?")) & 0x01,
+                deadline,
+                poll_interval,
+                max_poll_interval,
+            )
+
+        elif strategy == "stb_poll":
+            self.query("*ESR?")
+            self.write("*ESE 1;*OPC")
+            self._poll(
+                lambda: self.read_stb() & 0x20,
+                deadline,
+                poll_interval,
+                max_poll_interval,
+            )
+            # Clear the event status register which resets the summary bit
+            self.query("*ESR?")
+
+        elif strategy == "srq":
+            self.enable_event(
+                constants.EventType.service_request, constants.EventMechanism.queue
+            )
+            try:
+                self.query("*ESR?")
+                self.write("*ESE 1;*SRE 32;*OPC")
+                left = None if deadline is None else deadline - time.perf_counter()
+                self.wait_on_event(
+                    constants.EventType.service_request,
+                    util.cleanup_timeout(None if left is None else max(left, 0) * 1e3),
+                )
+                self.read_stb()
+                self.query("*ESR?")
+            finally:
+                self.disable_event(
+                    constants.EventType.service_request, constants.EventMechanism.queue
+                )
+                self.discard_events(
+                    constants.EventType.service_request, constants.EventMechanism.queue
+                )
+
+        else:
+            raise ValueError(
+                "Invalid strategy. Valid options are 'auto', 'opc_query', "
+                "'esr_poll', 'stb_poll' and 'srq'"
+            )
+
+        return time.perf_counter() - start
+
+    def _probe_wait_complete(
+        self,
+        timeout: Union[float, Literal["default"]],
+        deadline: Optional[float],
+        poll_interval: float,
+        max_poll_interval: float,
+    ) -> WAIT_COMPLETE_STRATEGIES:
+        """Wait for the completion and return the strategy which worked.
+
+        A service request is only waited for during wait_complete_probe_time,
+        the event status register being polled afterwards. Once the operations
+        completed, the service request strategy is selected if a request was
+        received, polling otherwise. Errors propagate without any strategy
+        being selected, so that the next call in automatic mode probes again.
+
+        """
+        srq = constants.EventType.service_request
+        queue = constants.EventMechanism.queue
+        try:
+            self.enable_event(srq, queue)
+        except errors.VisaIOError:
+            self.wait_complete("opc_query", timeout)
+            return "opc_query"
+
+        try:
+            self.query("*ESR?")
+            self.write("*ESE 1;*SRE 32;*OPC")
+            probe = self.wait_complete_probe_time
+            if deadline is not None:
+                probe = min(probe, max(deadline - time.perf_counter(), 0) * 1e3)
+            try:
+                self.wait_on_event(srq, math.ceil(probe))
+            except errors.VisaIOError as e:
+                if e.error_code != constants.StatusCode.error_timeout:
+                    raise
+            else:
+                self.read_stb()
+                self.query("*ESR?")
+                return "srq"
+
+            self._poll(
+                lambda: int(self.query("*ESR?")) & 0x01,
+                deadline,
+                poll_interval,
+                max_poll_interval,
+            )
+            # The request, if any, was issued when the operations completed.
+            try:
+                self.wait_on_event(srq, 0)
+            except errors.VisaIOError as e:
+                if e.error_code != constants.StatusCode.error_timeout:
+                    raise
+                return "esr_poll"
+            self.read_stb()
+            return "srq"
+        finally:
+            self.disable_event(srq, queue)
+            self.discard_events(srq, queue)
+
+    def _poll(
+        self,
+        condition: Callable[[], Any],
+        deadline: Optional[float],
+        interval: float,
+        max_interval: float,
+    ) -> None:
+        """Evaluate condition with exponential backoff until it is true.
+
+        Intervals are in ms, the deadline is a time.perf_counter value. Waiting
+        stops as soon as the operations of the resource are cancelled.
+
+        """
+        while not condition():
+            now = time.perf_counter()
+            if deadline is not None and now >= deadline:
+                raise errors.VisaIOError(constants.StatusCode.error_timeout)
+            delay = interval / 1e3
+            if deadline is not None:
+                delay = min(delay, deadline - now)
+            if self._cancelled.wait(delay):
+                raise errors.OperationCancelled()
+            interval = min(2 * interval, max_interval)
+
+    @serialized
     def assert_trigger(self) -> None:
         """Sends a software trigger to the device."""
         self.visalib.assert_trigger(self.session, constants.TriggerProtocol.default)
@@ -831,6 +1503,7 @@ class MessageBasedResource(Resource):
         """Service request status register."""
         return self.read_stb()
 
+    @idempotent
     def read_stb(self) -> int:
         """Service request status register."""
         value, _retcode = self.visalib.read_stb(self.session)
@@ -838,11 +1511,15 @@ class MessageBasedResource(Resource):
 
     @contextlib.contextmanager
     def read_termination_context(self, new_termination: Optional[str]) -> Iterator:
-        term = self.read_termination
-        self.read_termination = new_termination
-        yield
-        self.read_termination = term
+        with self.transaction():
+            term = self.read_termination
+            self.read_termination = new_termination
+            try:
+                yield
+            finally:
+                self.read_termination = term
 
+    @serialized
     def flush(self, mask: constants.BufferOperation) -> None:
         """Manually clears the specified buffers.
 
@@ -859,6 +1536,587 @@ class MessageBasedResource(Resource):
         self.visalib.flush(self.session, mask)
 
 
+class FastPath:
+    """Low overhead access to a message based resource for small repeated messages.
+
+    The library functions, the session, the termination characters, the encoding
+    and the chunk size are resolved once when entering the context, so that each
+    operation is reduced to the library call and the minimal processing of the
+    message. Changes made to the resource settings while the context is active
+    are not taken into account, and the timeout model of the resource is not
+    used. Nothing is logged.
+
+    Each operation runs in its own transaction, so that other threads (for
+    example a service request dispatcher calling read_stb) can use the
+    resource between two operations. Use the transaction context of the
+    resource around the block to keep other threads out of it.
+
+    Obtain instances using MessageBasedResource.fast_path.
+
+    """
+
+    #: Warnings ignored while the context is active.
+    IGNORED_WARNINGS = (
+        constants.StatusCode.success_device_not_present,
+        constants.StatusCode.success_max_count_read,
+    )
+
+    def __init__(self, resource: MessageBasedResource) -> None:
+        self.resource = resource
+        self._session: Optional[VISASession] = None
+
+    def __enter__(self) -> "FastPath":
+        resource = self.resource
+        visalib = resource.visalib
+        session = resource.session
+        self._begin = resource._begin_transaction
+        self._end = resource._end_transaction
+        self._read = functools.partial(visalib.read, session)
+        self._write = functools.partial(visalib.write, session)
+        self._encoding = resource._encoding
+        self._read_termination = resource._read_termination or ""
+        self._write_termination = resource._write_termination.encode(resource._encoding)
+        self._chunk_size = resource.chunk_size
+        self._query_delay = resource.query_delay
+        visalib._ignore_warnings(session, self.IGNORED_WARNINGS)
+        self._session = session
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self._session is not None:
+            self.resource.visalib._restore_warnings(
+                self._session, self.IGNORED_WARNINGS
+            )
+            self._session = None
+
+    def write_raw(self, message: bytes) -> int:
+        """Write a byte message to the device.
+
+        Returns
+        -------
+        int
+            Number of bytes written.
+
+        """
+        self._begin()
+        try:
+            return self._write(message)[0]
+        finally:
+            self._end()
+
+    def write(self, message: str) -> int:
+        """Write a string message to the device adding the write termination.
+
+        Returns
+        -------
+        int
+            Number of bytes written.
+
+        """
+        return self.write_raw(message.encode(self._encoding) + self._write_termination)
+
+    def read_raw(self) -> bytes:
+        """Read the unmodified message sent by the device."""
+        self._begin()
+        try:
+            chunk, status = self._read(self._chunk_size)
+            if status != constants.StatusCode.success_max_count_read:
+                return chunk
+            ret = bytearray(chunk)
+            while status == constants.StatusCode.success_max_count_read:
+                chunk, status = self._read(self._chunk_size)
+                ret.extend(chunk)
+            return bytes(ret)
+        finally:
+            self._end()
+
+    def read(self) -> str:
+        """Read a string from the device stripping the read termination."""
+        message = self.read_raw().decode(self._encoding)
+        termination = self._read_termination
+        if termination:
+            if message.endswith(termination):
+                return message[: -len(termination)]
+            warnings.warn(
+                "read string doesn't end with termination characters", stacklevel=2
+            )
+        return message
+
+    def query(self, message: str) -> str:
+        """Write a message and read the answer within a single transaction."""
+        self._begin()
+        try:
+            self.write(message)
+            if self._query_delay > 0.0:
+                time.sleep(self._query_delay)
+            return self.read()
+        finally:
+            self._end()
+
+
+def _parse_block_header(
+    block: Union[bytes, bytearray],
+    header_fmt: util.BINARY_HEADERS,
+    is_big_endian: bool,
+    length_before_block: Optional[int],
+    raise_on_late_block: bool,
+) -> Tuple[int, int]:
+    """Parse the header of a binary block in any of the supported formats.
+
+    Returns
+    -------
+    int
+        Offset at which the data start.
+    int
+        Length of the data in bytes, -1 if the header does not specify it.
+
+    """
+    if header_fmt == "ieee":
+        return util.parse_ieee_block_header(
+            block, length_before_block, raise_on_late_block
+        )
+    elif header_fmt == "rs":
+        return util.parse_ieee_or_rs_block_header(
+            block, length_before_block, raise_on_late_block
+        )
+    elif header_fmt == "hp":
+        return util.parse_hp_block_header(
+            block, is_big_endian, length_before_block, raise_on_late_block
+        )
+    return 0, -1
+
+
+@functools.lru_cache(maxsize=32)
+def _cached_block_codec(*args: Any) -> util.BlockCodec:
+    return util.BlockCodec(*args)
+
+
+def _block_codec(
+    datatype: util.BINARY_DATATYPES,
+    is_big_endian: bool,
+    header_fmt: util.BINARY_HEADERS,
+    container: Callable[[Iterable], Sequence] = list,
+    length_before_block: Optional[int] = None,
+    raise_on_late_block: bool = False,
+) -> util.BlockCodec:
+    """Get a codec for binary blocks, reusing the ones recently used."""
+    args = (
+        datatype,
+        is_big_endian,
+        header_fmt,
+        container,
+        length_before_block,
+        raise_on_late_block,
+    )
+    try:
+        hash(container)
+    except TypeError:
+        return util.BlockCodec(*args)
+    return _cached_block_codec(*args)
+
+
+class ResumableTransfer:
+    """Read of a known number of bytes that can be resumed after an error.
+
+    The data received are accumulated in buffer so that a transfer interrupted
+    by an error (typically a timeout) can be continued by calling read again,
+    possibly with a longer timeout, without requesting the data again from the
+    instrument.
+
+    """
+
+    #: Resource from which the data are read.
+    resource: MessageBasedResource
+
+    #: Data received so far.
+    buffer: bytearray
+
+    #: Total number of bytes to read, -1 if it is not known yet.
+    count: int
+
+    #: Chunk size used to perform the reading.
+    chunk_size: Optional[int]
+
+    #: Progress monitoring object.
+    monitoring_interface: Optional[SupportsUpdate]
+
+    #: Error which interrupted the last attempt if any.
+    last_error: Optional[errors.VisaIOError]
+
+    def __init__(
+        self,
+        resource: MessageBasedResource,
+        count: int,
+        chunk_size: Optional[int] = None,
+        monitoring_interface: Optional[SupportsUpdate] = None,
+    ) -> None:
+        self.resource = resource
+        self.buffer = bytearray()
+        self.count = count
+        self.chunk_size = chunk_size
+        self.monitoring_interface = monitoring_interface
+        self.last_error = None
+
+    @property
+    def offset(self) -> int:
+        """Number of bytes received so far."""
+        return len(self.buffer)
+
+    @property
+    def remaining(self) -> int:
+        """Number of bytes left to read, -1 if it is not known yet."""
+        if self.count < 0:
+            return -1
+        return max(self.count - len(self.buffer), 0)
+
+    @property
+    def done(self) -> bool:
+        """Whether all the expected data were received."""
+        return self.remaining == 0
+
+    def read(self, timeout: Optional[float] = None) -> Any:
+        """Start or resume the transfer.
+
+        Parameters
+        ----------
+        timeout : Optional[float], optional
+            Timeout in ms to use for this attempt only. Defaults to None, meaning
+            the timeout of the resource is used.
+
+        Returns
+        -------
+        Any
+            Data read from the instrument.
+
+        Raises
+        ------
+        errors.VisaIOError
+            Raised if the transfer is interrupted. The data received until then
+            are kept and calling read again resumes the transfer.
+
+        """
+        with self.resource.transaction():
+            if timeout is not None:
+                old_timeout = self.resource.timeout
+                self.resource.timeout = timeout
+            try:
+                self._transfer()
+            except errors.VisaIOError as e:
+                self.last_error = e
+                raise
+            finally:
+                if timeout is not None:
+                    self.resource.timeout = old_timeout
+        self.last_error = None
+        return self._result()
+
+    def _transfer(self) -> None:
+        """Read from the instrument the data not yet received."""
+        self.resource._read_bytes_into(
+            self.buffer,
+            self.count,
+            self.chunk_size,
+            monitoring_interface=self.monitoring_interface,
+        )
+
+    def _result(self) -> Any:
+        """Build the value returned once the transfer completed."""
+        return bytes(self.buffer)
+
+
+class ResumableBinaryTransfer(ResumableTransfer):
+    """Read of a binary block that can be resumed after an error.
+
+    The first attempt reads a first message to retrieve the block header,
+    following ones only request the bytes still missing to complete the block.
+
+    """
+
+    #: Offset at which the data start in the block, -1 if not known yet.
+    data_offset: int
+
+    #: Length of the data in bytes, -1 if not known yet.
+    data_length: int
+
+    #: Codec used to parse the header and decode the data of the block.
+    codec: util.BlockCodec
+
+    def __init__(
+        self,
+        resource: MessageBasedResource,
+        datatype: util.BINARY_DATATYPES = "f",
+        is_big_endian: bool = False,
+        container: Union[Type, Callable[[Iterable], Sequence]] = list,
+        header_fmt: util.BINARY_HEADERS = "ieee",
+        expect_termination: bool = True,
+        data_points: int = -1,
+        chunk_size: Optional[int] = None,
+        monitoring_interface: Optional[SupportsUpdate] = None,
+        length_before_block: Optional[int] = None,
+        raise_on_late_block: bool = False,
+    ) -> None:
+        if header_fmt not in ("ieee", "hp", "rs", "empty"):
+            raise ValueError(
+                "Invalid header format. Valid options are 'ieee', 'hp', 'rs', and 'empty'"
+            )
+        super().__init__(resource, -1, chunk_size, monitoring_interface)
+        self.codec = _block_codec(
+            datatype,
+            is_big_endian,
+            header_fmt,
+            container,
+            length_before_block,
+            raise_on_late_block,
+        )
+        self.datatype = datatype
+        self.is_big_endian = is_big_endian
+        self.container = container
+        self.header_fmt = header_fmt
+        self.expect_termination = expect_termination
+        self.data_points = data_points
+        self.length_before_block = length_before_block
+        self.raise_on_late_block = raise_on_late_block
+        self.data_offset = -1
+        self.data_length = -1
+
+    def _transfer(self) -> None:
+        if self.count < 0:
+            self.resource._read_raw(
+                self.chunk_size, self.monitoring_interface, self.buffer
+            )
+            self._parse_header()
+
+        # Read all the data if we know what to expect.
+        if self.data_length > 0:
+            super()._transfer()
+        elif self.data_length < 0:
+            raise ValueError(
+                "The length of the data to receive could not be "
+                "determined. You should provide the number of "
+                "points you expect using the data_points keyword "
+                "argument."
+            )
+
+    def _parse_header(self) -> None:
+        """Parse the block header and compute the total length of the block."""
+        offset, data_length = self.codec.parse_header(self.buffer)
+
+        # Allow to support instrument such as the Keithley 2000 that do not
+        # report the length of the block
+        if data_length < 0 and self.data_points >= 0:
+            data_length = self.data_points * self.codec.element_size
+
+        self.data_offset = offset
+        self.data_length = data_length
+        if data_length < 0:
+            return
+
+        expected_length = offset + data_length
+        termination = self.resource._read_termination
+        if self.expect_termination and termination is not None:
+            expected_length += len(termination)
+        self.count = expected_length
+
+    def _result(self) -> Sequence[Union[int, float]]:
+        try:
+            # Do not reparse the headers since it was already done and since
+            # this allows for custom data length
+            return self.codec.decode_data(
+                self.buffer, self.data_offset, self.data_length
+            )
+        except ValueError as e:
+            raise errors.InvalidBinaryFormat(e.args[0])
+
+
+def transfer(
+    src: MessageBasedResource,
+    dst: MessageBasedResource,
+    query: str,
+    message: str = "",
+    header_fmt: util.BINARY_HEADERS = "ieee",
+    dst_header_fmt: Optional[util.BINARY_HEADERS] = None,
+    is_big_endian: bool = False,
+    expect_termination: bool = True,
+    chunk_size: Optional[int] = None,
+    monitoring_interface: Optional[SupportsUpdate] = None,
+    length_before_block: Optional[int] = None,
+    raise_on_late_block: bool = False,
+) -> int:
+    """Stream a binary block queried from a resource to another resource.
+
+    The block is read from src in chunks that are written to dst as soon as they
+    are received, so that the block is never stored in memory as a whole and the
+    two bus transfers overlap. END is asserted on dst only at the end of the
+    message.
+
+    Parameters
+    ----------
+    src : MessageBasedResource
+        Resource from which to read the block.
+    dst : MessageBasedResource
+        Resource to which to write the block.
+    query : str
+        Message sent to src to request the block.
+    message : str, optional
+        Message sent to dst before the block. Defaults to "".
+    header_fmt : util.BINARY_HEADERS, optional
+        Format of the header of the block sent by src. The header must report
+        the length of the block so 'empty' is not supported. Defaults to 'ieee'.
+    dst_header_fmt : Optional[util.BINARY_HEADERS], optional
+        Format of the header of the block sent to dst. Defaults to None meaning
+        the format used by src.
+    is_big_endian : bool, optional
+        Byte order of the length in 'hp' headers. Defaults to False.
+    expect_termination : bool, optional
+        When set to False, the read termination of src is not expected after
+        the block. Defaults to True.
+    chunk_size : Optional[int], optional
+        Size of the chunks in which the block is transferred. Defaults to None,
+        meaning the chunk_size of src is used.
+    monitoring_interface : SupportsUpdate Protocol, optional
+        Progress monitoring object with update() method that accepts the number
+        of bytes of data written to dst.
+
+    Returns
+    -------
+    int
+        Length of the data of the block in bytes.
+
+    """
+    if header_fmt not in ("ieee", "hp", "rs"):
+        raise ValueError(
+            "Invalid header format. Valid options are 'ieee', 'hp' and 'rs' since "
+            "the length of the block must be known."
+        )
+    dst_header_fmt = header_fmt if dst_header_fmt is None else dst_header_fmt
+    chunk_size = chunk_size or src.chunk_size
+
+    # Lock the resources in a consistent order to avoid deadlocks between
+    # transfers in opposite directions.
+    ordered = sorted((src, dst), key=id)
+    with ordered[0].transaction(), ordered[1].transaction():
+        src.write(query)
+        if src.query_delay > 0.0:
+            time.sleep(src.query_delay)
+
+        # Read a first chunk to get the header (and possibly some data).
+        first = bytearray()
+        src._read_bytes_into(first, chunk_size, chunk_size, break_on_termchar=True)
+        offset, data_length = _parse_block_header(
+            first, header_fmt, is_big_endian, length_before_block, raise_on_late_block
+        )
+        if data_length < 0:
+            raise errors.InvalidBinaryFormat(
+                "The block header does not report the length of the block."
+            )
+        head = memoryview(first)[offset : offset + data_length]
+        left = data_length - len(head)
+        termination = src._read_termination if expect_termination else None
+        if termination:
+            # Only the termination characters which were not already read remain
+            term_left = len(termination) - max(len(first) - offset - data_length, 0)
+        else:
+            term_left = 0
+
+        encoding = dst._encoding
+        prefix = message.encode(encoding) + util.block_header(
+            data_length, dst_header_fmt, is_big_endian
+        )
+        write_term = dst._write_termination.encode(encoding)
+
+        send_end = dst.get_visa_attribute(constants.ResourceAttribute.send_end_enabled)
+
+        def write(data: Union[bytes, memoryview], last: bool) -> None:
+            if last and send_end:
+                dst.set_visa_attribute(
+                    constants.ResourceAttribute.send_end_enabled, send_end
+                )
+            dst.write_raw(data)
+
+        dst.set_visa_attribute(
+            constants.ResourceAttribute.send_end_enabled, constants.VI_FALSE
+        )
+        try:
+            write(prefix + head, left == 0 and not write_term)
+            if monitoring_interface:
+                monitoring_interface.update(len(head))
+            if left:
+                stream = _stream_chunks(src, left, term_left, chunk_size)
+                with contextlib.closing(stream):
+                    for chunk in stream:
+                        left -= len(chunk)
+                        write(chunk, left == 0 and not write_term)
+                        if monitoring_interface:
+                            monitoring_interface.update(len(chunk))
+            elif term_left > 0:
+                src._read_bytes_into(bytearray(), term_left)
+            if write_term:
+                write(write_term, True)
+        finally:
+            dst.set_visa_attribute(
+                constants.ResourceAttribute.send_end_enabled, send_end
+            )
+
+        return data_length
+
+
+def _stream_chunks(
+    src: MessageBasedResource, count: int, trailing: int, chunk_size: int
+) -> Generator[memoryview, None, None]:
+    """Read count bytes from src in chunks using a background thread.
+
+    Two buffers are used in turn so that reading the next chunk overlaps with
+    the processing of the current one. The yielded memoryview is only valid
+    until the next chunk is requested. Once all the data have been read, the
+    trailing bytes (termination characters) are read and discarded.
+
+    """
+    buffers: queue.Queue = queue.Queue()
+    for _ in range(2):
+        buffers.put(bytearray(chunk_size))
+    chunks: queue.Queue = queue.Queue()
+    stop = threading.Event()
+
+    def reader():
+        try:
+            left = count
+            while left > 0:
+                buffer = buffers.get()
+                if stop.is_set():
+                    return
+                read, _ = src.visalib.read_into(
+                    src.session, memoryview(buffer)[: min(chunk_size, left)]
+                )
+                left -= read
+                chunks.put((buffer, read))
+            if trailing > 0:
+                src._read_bytes_into(bytearray(), trailing)
+            chunks.put(None)
+        except BaseException as e:
+            chunks.put(e)
+
+    with src.ignore_warning(
+        constants.StatusCode.success_device_not_present,
+        constants.StatusCode.success_max_count_read,
+    ):
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = chunks.get()
+                if item is None:
+                    break
+                elif isinstance(item, BaseException):
+                    raise item
+                buffer, read = item
+                yield memoryview(buffer)[:read]
+                buffers.put(buffer)
+        finally:
+            stop.set()
+            buffers.put(bytearray())
+            thread.join()
+
+
 # Rohde and Schwarz Device via Passport. Not sure which Resource should be.
 MessageBasedResource.register(constants.InterfaceType.rsnrp, "INSTR")(
     MessageBasedResource
@@ -8,10 +8,149 @@ This file is part of PyVISA.
 
 """
 
-from typing import Iterable, List
+import array
+import contextlib
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import (
+    Any,
+    Callable,
+    DefaultDict,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
 
-from .. import constants
-from .resource import Resource
+from typing_extensions import Literal
+
+from .. import constants, errors, util
+from ..typing import VISAMemoryAddress
+from .resource import Resource, serialized
+
+#: Width of a register in bits.
+Bits = Literal[8, 16, 32, 64]
+
+#: Width of a register as accepted by read_memory.
+Width = Union[Bits, constants.DataWidth]
+
+#: Register identified by its address space, offset in bytes and width.
+Register = Tuple[constants.AddressSpace, int, Width]
+
+#: Minimal number of isolated registers of an address space for which mapping
+#: the address space and using peek/poke is preferred to viIn*/viOut* calls.
+MIN_MAPPED_REGISTERS = 4
+
+#: Isolated register: offset, width in bits and positions at which it was
+#: requested.
+_Single = Tuple[int, Bits, List[int]]
+
+
+class _Block:
+    """Contiguous registers of an address space accessed by a single move."""
+
+    __slots__ = ("bits", "offset", "positions", "space")
+
+    def __init__(
+        self,
+        space: constants.AddressSpace,
+        bits: Bits,
+        offset: int,
+        positions: List[List[int]],
+    ) -> None:
+        #: Address space, width in bits and offset of the first register.
+        self.space = space
+        self.bits = bits
+        self.offset = offset
+        #: Positions at which each register was requested.
+        self.positions = positions
+
+
+class _Group:
+    """Isolated registers of an address space, possibly accessed through a map."""
+
+    __slots__ = ("entries", "space")
+
+    def __init__(self, space: constants.AddressSpace, entries: List[_Single]):
+        self.space = space
+        self.entries = entries
+
+
+def _bits(width: Width) -> Bits:
+    """Number of bits of a register width."""
+    w = width * 8 if isinstance(width, constants.DataWidth) else width
+    if w not in (8, 16, 32, 64):
+        raise ValueError(
+            "%s is not a valid size. Valid values are 8, 16, 32 or 64 "
+            "or one member of constants.DataWidth" % width
+        )
+    return cast(Bits, w)
+
+
+def _plan(registers: Sequence[Register], reorder: bool) -> List[Union[_Block, _Group]]:
+    """Split registers into runs of adjacent registers and isolated registers.
+
+    Without reordering, the registers are accessed in the requested order, only
+    registers consecutive in the request forming a run. With reordering, the
+    registers are sorted by address space, width and offset before forming the
+    runs, and registers requested several times are accessed once.
+
+    """
+    steps: List[Union[_Block, _Group]] = []
+    if not reorder:
+        index = 0
+        while index < len(registers):
+            space, offset, width = registers[index]
+            bits = _bits(width)
+            end = index + 1
+            while end < len(registers):
+                n_space, n_offset, n_width = registers[end]
+                if (
+                    n_space != space
+                    or _bits(n_width) != bits
+                    or n_offset != offset + (end - index) * (bits // 8)
+                ):
+                    break
+                end += 1
+            if end - index > 1:
+                positions = [[i] for i in range(index, end)]
+                steps.append(_Block(space, bits, offset, positions))
+            elif steps and isinstance(steps[-1], _Group) and steps[-1].space == space:
+                steps[-1].entries.append((offset, bits, [index]))
+            else:
+                steps.append(_Group(space, [(offset, bits, [index])]))
+            index = end
+        return steps
+
+    by_key: DefaultDict[
+        Tuple[constants.AddressSpace, Bits], DefaultDict[int, List[int]]
+    ] = defaultdict(lambda: defaultdict(list))
+    for index, (space, offset, width) in enumerate(registers):
+        by_key[(space, _bits(width))][offset].append(index)
+
+    groups: Dict[constants.AddressSpace, _Group] = {}
+    for (space, bits), by_offset in by_key.items():
+        step = bits // 8
+        offsets = sorted(by_offset)
+        start = 0
+        for end in range(1, len(offsets) + 1):
+            if end < len(offsets) and offsets[end] == offsets[end - 1] + step:
+                continue
+            if end - start > 1:
+                positions = [by_offset[o] for o in offsets[start:end]]
+                steps.append(_Block(space, bits, offsets[start], positions))
+            else:
+                offset = offsets[start]
+                group = groups.setdefault(space, _Group(space, []))
+                group.entries.append((offset, bits, by_offset[offset]))
+            start = end
+    steps.extend(groups.values())
+    return steps
 
 
 class RegisterBasedResource(Resource):
@@ -174,3 +313,235 @@ class RegisterBasedResource(Resource):
         return self.visalib.move_out(
             self.session, space, offset, length, data, width, extended
         )
+
+    @serialized
+    def move_async(
+        self,
+        source_space: constants.AddressSpace,
+        source_offset: int,
+        source_width: constants.DataWidth,
+        destination_space: constants.AddressSpace,
+        destination_offset: int,
+        destination_width: constants.DataWidth,
+        length: int,
+    ) -> "Future[int]":
+        """Start moving a block of data between address spaces without waiting.
+
+        Corresponds to viMoveAsync function of the VISA library. The returned
+        future is resolved by the IO completion event of the operation.
+        Cancelling the future terminates the operation.
+
+        Parameters
+        ----------
+        source_space : constants.AddressSpace
+            Address space of the source.
+        source_offset : int
+            Offset of the starting address or register from which to read.
+        source_width : constants.DataWidth
+            Data width of the source.
+        destination_space : constants.AddressSpace
+            Address space of the destination.
+        destination_offset : int
+            Offset of the starting address or register to which to write.
+        destination_width : constants.DataWidth
+            Data width of the destination.
+        length : int
+            Number of elements to transfer, where the data width of the
+            elements to transfer is identical to the source data width.
+
+        Returns
+        -------
+        Future[int]
+            Future resolved with the number of elements transferred or with the
+            VisaIOError which made the operation fail.
+
+        """
+        jobs = self._get_async_jobs()
+        job_id, _ = self.visalib.move_asynchronously(
+            self.session,
+            source_space,
+            source_offset,
+            source_width,
+            destination_space,
+            destination_offset,
+            destination_width,
+            length,
+        )
+        return jobs.start(job_id, None)
+
+    @serialized
+    def read_registers(
+        self,
+        registers: Iterable[Register],
+        container: Callable[..., Any] = array.array,
+        extended: bool = False,
+        reorder: bool = False,
+    ) -> Any:
+        """Read many registers using as few library calls as possible.
+
+        By default the registers are read in the requested order, which matters
+        for registers with side effects (clear on read, FIFOs, ...): registers
+        following each other in the request, with the same address space and
+        width and adjacent offsets, are read using a single viMoveIn* call.
+        When at least MIN_MAPPED_REGISTERS other registers of the same address
+        space follow each other, the space is mapped and they are read using
+        viPeek*, otherwise viIn* is used.
+
+        With reorder=True, the registers are instead sorted so that all the
+        adjacent registers are read by block moves, and registers requested
+        several times are read only once.
+
+        Parameters
+        ----------
+        registers : Iterable[Register]
+            Address space, offset (in bytes) and width of the registers to read.
+        container : Callable, optional
+            Container in which to return the values: array.array (using the
+            "Q" typecode), numpy.array (using the uint64 dtype) or any callable
+            accepting an iterable of int. Defaults to array.array.
+        extended : bool, optional
+            Use 64 bits offset independent of the platform, by default False.
+        reorder : bool, optional
+            Allow reordering and merging the accesses, by default False.
+
+        Returns
+        -------
+        Any
+            Values of the registers in the order in which they were requested.
+
+        Raises
+        ------
+        ValueError
+            Raised if an invalid width is specified.
+
+        """
+        registers = list(registers)
+        values = array.array("Q", [0]) * len(registers)
+        session = self.session
+        visalib = self.visalib
+        for step in _plan(registers, reorder):
+            if isinstance(step, _Block):
+                data = visalib.move_in(
+                    session,
+                    step.space,
+                    step.offset,
+                    len(step.positions),
+                    step.bits,
+                    extended,
+                )[0]
+                for value, indexes in zip(data, step.positions):
+                    for index in indexes:
+                        values[index] = value
+                continue
+            space = step.space
+            with self._mapped(space, step.entries, extended) as mapping:
+                for offset, bits, indexes in step.entries:
+                    if mapping is None:
+                        value = visalib.read_memory(
+                            session, space, offset, bits, extended
+                        )[0]
+                    else:
+                        address, base = mapping
+                        value = visalib.peek(
+                            session, VISAMemoryAddress(address + offset - base), bits
+                        )[0]
+                    for index in indexes:
+                        values[index] = value
+
+        if container is array.array:
+            return values
+        if util._use_numpy_routines(container):
+            return util.np.frombuffer(values, util.np.uint64)  # type: ignore
+        return container(values)
+
+    @serialized
+    def write_registers(
+        self,
+        registers: Iterable[Tuple[constants.AddressSpace, int, Width, int]],
+        extended: bool = False,
+        reorder: bool = False,
+    ) -> None:
+        """Write many registers using as few library calls as possible.
+
+        The registers are grouped as in read_registers: by default they are
+        written in the requested order, registers following each other with
+        adjacent offsets being written using a single viMoveOut* call. With
+        reorder=True, the writes are sorted and, when a register appears
+        several times, only the last value is written.
+
+        Parameters
+        ----------
+        registers : Iterable[Tuple[constants.AddressSpace, int, Width, int]]
+            Address space, offset (in bytes), width and value of the registers
+            to write.
+        extended : bool, optional
+            Use 64 bits offset independent of the platform, by default False.
+        reorder : bool, optional
+            Allow reordering and merging the accesses, by default False.
+
+        Raises
+        ------
+        ValueError
+            Raised if an invalid width is specified.
+
+        """
+        registers = list(registers)
+        session = self.session
+        visalib = self.visalib
+        for step in _plan([r[:3] for r in registers], reorder):  # type: ignore
+            if isinstance(step, _Block):
+                data = [registers[indexes[-1]][3] for indexes in step.positions]
+                visalib.move_out(
+                    session,
+                    step.space,
+                    step.offset,
+                    len(data),
+                    data,
+                    step.bits,
+                    extended,
+                )
+                continue
+            space = step.space
+            with self._mapped(space, step.entries, extended) as mapping:
+                for offset, bits, indexes in step.entries:
+                    value = registers[indexes[-1]][3]
+                    if mapping is None:
+                        visalib.write_memory(
+                            session, space, offset, value, bits, extended
+                        )
+                    else:
+                        address, base = mapping
+                        visalib.poke(
+                            session,
+                            VISAMemoryAddress(address + offset - base),
+                            bits,
+                            value,
+                        )
+
+    @contextlib.contextmanager
+    def _mapped(
+        self,
+        space: constants.AddressSpace,
+        entries: List[_Single],
+        extended: bool,
+    ) -> Iterator[Optional[Tuple[int, int]]]:
+        """Map the window of an address space containing isolated registers.
+
+        Yields the mapped address and the offset it corresponds to, or None if
+        the registers are too few or the library cannot map the address space.
+
+        """
+        if extended or len(entries) < MIN_MAPPED_REGISTERS:
+            yield None
+            return
+        base = min(offset for offset, _, _ in entries)
+        size = max(offset + bits // 8 for offset, bits, _ in entries) - base
+        try:
+            address = self.visalib.map_address(self.session, space, base, size)[0]
+        except (NotImplementedError, errors.VisaIOError):
+            yield None
+            return
+        try:
+            yield address, base
+        finally:
+            self.visalib.unmap_address(self.session)
@@ -9,15 +9,24 @@ This file is part of PyVISA.
 """
 
 import contextlib
+import threading
 import time
+from concurrent.futures import Future
 from functools import update_wrapper
 from typing import (
     Any,
     Callable,
     ContextManager,
+    Dict,
+    FrozenSet,
+    Iterable,
     Iterator,
+    List,
+    Mapping,
     Optional,
     Set,
+    SupportsBytes,
+    Tuple,
     Type,
     TypeVar,
     Union,
@@ -28,20 +37,24 @@ from typing_extensions import ClassVar, Literal
 
 from .. import attributes, constants, errors, highlevel, logger, rname, typing, util
 from ..attributes import Attribute
-from ..events import Event
+from ..events import Event, EventRecord
+from ..pool import PoolKey, SessionPool
 from ..typing import VISAEventContext, VISAHandler, VISASession
 
 
 class WaitResponse:
     """Class used in return of wait_on_event.
 
-    It properly closes the context upon delete.
+    The VISA context of the event is closed by close, when leaving the response
+    used as a context manager, or as a last resort upon delete.
 
     A call with event_type of 0 (normally used when timed_out is True) will store
     None as the event and event type, otherwise it records the proper Event.
 
     """
 
+    __slots__ = ("_visalib", "event", "ret", "timed_out")
+
     #: Reference to the event object that was waited for.
     event: Event
 
@@ -60,23 +73,414 @@ class WaitResponse:
         timed_out: bool = False,
     ):
         self.event = Event(visalib, event_type, context)
-        self._event_type = constants.EventType(event_type)
-        self._context = context
         self.ret = ret
         self._visalib = visalib
         self.timed_out = timed_out
 
-    def __del__(self) -> None:
-        if self.event._context is not None:
+    def __enter__(self) -> "WaitResponse":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the VISA context of the event, invalidating the event."""
+        context = self.event._context
+        if context is not None:
+            self.event.close()
             try:
-                self._visalib.close(self.event._context)
-                self.event.close()
+                self._visalib.close(context)
             except errors.VisaIOError:
                 pass
 
+    def __del__(self) -> None:
+        self.close()
+
+
+class ResourceProfile:
+    """Named set of attribute values to apply to resources.
+
+    The names of the attributes are validated only once for each resource class
+    the profile is applied to.
+
+    Parameters
+    ----------
+    name : str
+        Name of the profile.
+    values : Mapping[str, Any]
+        Values of the attributes by name. Any attribute which can be set on a
+        resource (VISA attributes, read_termination, chunk_size, ...) can be
+        used.
+
+    """
+
+    #: Name of the profile.
+    name: str
+
+    #: Values of the attributes by name.
+    values: Dict[str, Any]
+
+    def __init__(self, name: str, values: Mapping[str, Any]) -> None:
+        self.name = name
+        self.values = dict(values)
+        self._validated: Set[type] = set()
+
+    def __repr__(self) -> str:
+        return "<ResourceProfile(%r, %r)>" % (self.name, self.values)
+
+    def validate(self, resource_class: Type["Resource"]) -> None:
+        """Check that all the attributes of the profile exist on a resource class.
+
+        Parameters
+        ----------
+        resource_class : Type[Resource]
+            Class of the resources to which the profile will be applied.
+
+        Raises
+        ------
+        ValueError
+            Raised if one of the attributes does not exist.
+
+        """
+        if resource_class in self._validated:
+            return
+        for key in self.values:
+            if not hasattr(resource_class, key):
+                raise ValueError(
+                    "%r is not a valid attribute for type %s"
+                    % (key, resource_class.__name__)
+                )
+        self._validated.add(resource_class)
+
+
+class LockMetrics:
+    """Statistics about the time spent waiting to acquire a lock."""
+
+    #: Number of times the lock was acquired.
+    count: int
+
+    #: Total time spent waiting for the lock in seconds.
+    wait_time: float
+
+    #: Longest time spent waiting for the lock in seconds.
+    max_wait_time: float
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def __repr__(self) -> str:
+        return "<LockMetrics(count=%d, wait_time=%g, max_wait_time=%g)>" % (
+            self.count,
+            self.wait_time,
+            self.max_wait_time,
+        )
+
+    def record(self, wait_time: float) -> None:
+        """Record an acquisition of the lock.
+
+        Parameters
+        ----------
+        wait_time : float
+            Time spent waiting to acquire the lock in seconds.
+
+        """
+        self.count += 1
+        self.wait_time += wait_time
+        if wait_time > self.max_wait_time:
+            self.max_wait_time = wait_time
+
+    def reset(self) -> None:
+        """Reset the statistics."""
+        self.count = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+
+class ReconnectPolicy:
+    """Policy used by a resource to reopen its session after a connection loss.
+
+    When an operation fails with one of the error codes of the policy, the
+    resource closes its session and opens a new one, retrying with an
+    exponential backoff. The VISA attributes set through the resource, the
+    enabled events and the installed handlers are then restored.
+
+    """
+
+    #: Error codes indicating that the session must be reopened.
+    DEFAULT_ERROR_CODES: ClassVar[FrozenSet[constants.StatusCode]] = frozenset(
+        {
+            constants.StatusCode.error_invalid_object,
+            constants.StatusCode.error_connection_lost,
+            constants.StatusCode.error_io,
+        }
+    )
+
+    #: Maximal number of attempts to reopen the session.
+    max_attempts: int
+
+    #: Delay in seconds between the first and the second attempts.
+    initial_delay: float
+
+    #: Factor by which the delay is multiplied after each failed attempt.
+    backoff: float
+
+    #: Maximal delay in seconds between two attempts.
+    max_delay: float
+
+    #: Whether idempotent operations (such as queries) which failed are performed
+    #: again once reconnected.
+    retry_idempotent: bool
+
+    #: Error codes triggering a reconnection.
+    error_codes: FrozenSet[constants.StatusCode]
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        initial_delay: float = 0.1,
+        backoff: float = 2.0,
+        max_delay: float = 5.0,
+        retry_idempotent: bool = False,
+        error_codes: Optional[Iterable[constants.StatusCode]] = None,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1, not %d" % max_attempts)
+        self.max_attempts = max_attempts
+        self.initial_delay = initial_delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.retry_idempotent = retry_idempotent
+        self.error_codes = (
+            self.DEFAULT_ERROR_CODES if error_codes is None else frozenset(error_codes)
+        )
+
+    def __repr__(self) -> str:
+        return "<ReconnectPolicy(max_attempts=%d, retry_idempotent=%s)>" % (
+            self.max_attempts,
+            self.retry_idempotent,
+        )
+
+    def delays(self) -> Iterator[float]:
+        """Delays to wait before each attempt to reopen the session.
+
+        The first attempt is performed immediately.
+
+        """
+        delay = self.initial_delay
+        yield 0.0
+        for _ in range(self.max_attempts - 1):
+            yield min(delay, self.max_delay)
+            delay *= self.backoff
+
+
+class _LockLease:
+    """VISA lock held by a resource on behalf of possibly nested contexts."""
+
+    def __init__(self, requested_key: Optional[str], access_key: Optional[str]):
+        #: Key requested when acquiring the lock ("exclusive" for exclusive locks).
+        self.requested_key = requested_key
+
+        #: Access key of shared locks.
+        self.access_key = access_key
+
+        #: Number of contexts currently using the lease.
+        self.depth = 1
+
+        #: Timer releasing the lock once the lease has been idle long enough.
+        self.timer: Optional[threading.Timer] = None
+
+    def matches(self, requested_key: Optional[str]) -> bool:
+        """Can the lease be used for a lock requested with the given key."""
+        if requested_key == "exclusive" or self.requested_key == "exclusive":
+            return requested_key == self.requested_key
+        return requested_key is None or requested_key == self.access_key
+
+
+class _AsyncJobs:
+    """Asynchronous operations of a resource completed by IO completion events.
+
+    The handler is installed, and the handler mechanism enabled, when the first
+    operation is started. Since an operation may complete before the call
+    starting it returns, the completions of unknown jobs are kept until the
+    job is registered.
+
+    """
+
+    def __init__(self, resource: "Resource") -> None:
+        self.resource = resource
+        self.lock = threading.Lock()
+        #: Future, buffer (None for writes and moves) and data being written
+        #: (which must stay alive until the job completes) of each job in progress.
+        self.jobs: Dict[
+            typing.VISAJobID, Tuple[Future, Optional[SupportsBytes], Optional[bytes]]
+        ] = {}
+        #: Status and return count of the jobs completed before being registered.
+        self.completed: Dict[typing.VISAJobID, Tuple[int, int]] = {}
+        event_type = constants.EventType.io_completion
+        self.user_handle = resource.install_handler(event_type, self.handler)
+        try:
+            resource.enable_event(event_type, constants.EventMechanism.handler)
+        except Exception:
+            resource.uninstall_handler(event_type, self.handler, self.user_handle)
+            raise
+
+    def start(
+        self,
+        job_id: typing.VISAJobID,
+        buffer: Optional[SupportsBytes],
+        data: Optional[bytes] = None,
+    ) -> Future:
+        """Register a job started on the resource and return its future.
+
+        The data passed to an asynchronous write are referenced until the job
+        completes since the library keeps using them after the call returns.
+
+        """
+        future: Future = Future()
+        with self.lock:
+            early = self.completed.pop(job_id, None)
+            if early is None:
+                self.jobs[job_id] = (future, buffer, data)
+        if early is not None:
+            self.complete(job_id, future, buffer, *early)
+        else:
+            future.add_done_callback(lambda f: self.terminate(job_id, f))
+        return future
+
+    def handler(
+        self,
+        session: VISASession,
+        event_type: constants.EventType,
+        context: VISAEventContext,
+        user_handle: Any,
+    ) -> None:
+        """VISA handler completing the future of the job of the event."""
+        event = Event(self.resource.visalib, event_type, context)
+        try:
+            job_id = event.job_id  # type: ignore[attr-defined]
+            status = event.status  # type: ignore[attr-defined]
+            count = event.return_count  # type: ignore[attr-defined]
+        finally:
+            event.close()
+        with self.lock:
+            entry = self.jobs.pop(job_id, None)
+            if entry is None:
+                self.completed[job_id] = (status, count)
+                return
+        self.complete(job_id, entry[0], entry[1], status, count)
+
+    def complete(
+        self,
+        job_id: typing.VISAJobID,
+        future: Future,
+        buffer: Optional[SupportsBytes],
+        status: int,
+        count: int,
+    ) -> None:
+        """Resolve the future of a completed job and release its buffer."""
+        if buffer is not None:
+            self.resource.visalib.release_buffer(job_id)
+        if future.done():
+            return
+        if status < 0:
+            future.set_exception(errors.VisaIOError(status))
+        elif buffer is None:
+            future.set_result(count)
+        else:
+            future.set_result(bytes(buffer[:count]))  # type: ignore[index]
+
+    def terminate(self, job_id: typing.VISAJobID, future: Future) -> None:
+        """Terminate the job of a future cancelled by the user."""
+        if not future.cancelled():
+            return
+        session = self.resource._session
+        if session is None:
+            return
+        try:
+            self.resource.visalib.terminate(
+                session,
+                constants.VI_NULL,  # type: ignore[arg-type]
+                job_id,
+            )
+        except (NotImplementedError, errors.VisaIOError):
+            pass
+
+    def cancel_all(self) -> None:
+        """Cancel the futures of the jobs in progress, whose session is gone."""
+        with self.lock:
+            jobs = list(self.jobs.items())
+            self.jobs.clear()
+            self.completed.clear()
+        for job_id, (future, buffer, _) in jobs:
+            if buffer is not None:
+                self.resource.visalib.release_buffer(job_id)
+            future.cancel()
+
 
 T = TypeVar("T", bound="Resource")
 
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _aborted(exc: errors.VisaIOError, cancelled: threading.Event) -> bool:
+    """Was a VISA call aborted by cancelling the operations of the resource.
+
+    Aborts which were not requested using Resource.cancel (by the driver or
+    the device) are reported as they are. The cancelled flag is cleared when
+    the outermost transaction ends.
+
+    """
+    return (
+        exc.error_code == constants.StatusCode.error_abort
+        and cancelled.is_set()
+        and not isinstance(exc, errors.OperationCancelled)
+    )
+
+
+def _serialize(method: F, idempotent: bool) -> F:
+    """Wrap a resource method so that it runs within a transaction."""
+
+    def wrapper(self, *args, **kwargs):
+        self._begin_transaction()
+        try:
+            try:
+                return method(self, *args, **kwargs)
+            except errors.VisaIOError as exc:
+                if _aborted(exc, self._cancelled):
+                    raise errors.OperationCancelled() from exc
+                policy = self.reconnect_policy
+                if not self._reconnect_after(exc):
+                    raise
+                if not (idempotent and policy.retry_idempotent):
+                    raise
+            return method(self, *args, **kwargs)
+        finally:
+            self._end_transaction()
+
+    update_wrapper(wrapper, method)
+    return cast(F, wrapper)
+
+
+def serialized(method: F) -> F:
+    """Decorate a resource method so that it runs within a transaction.
+
+    This prevents other threads from using the resource while the method runs,
+    which allows methods performing several operations (such as a write followed
+    by a read) to be used by threads sharing the resource.
+
+    """
+    return _serialize(method, False)
+
+
+def idempotent(method: F) -> F:
+    """Decorate a resource method which can safely be performed again.
+
+    Such methods are serialized, and retried once after the session has been
+    reopened if the reconnect policy of the resource allows it.
+
+    """
+    return _serialize(method, True)
+
 
 class Resource(object):
     """Base class for resources.
@@ -157,6 +561,61 @@ class Resource(object):
         #: Session handle.
         self._session: Optional[VISASession] = None
 
+        #: Cached values of the VISA attributes, None if caching is disabled.
+        self._attribute_cache: Optional[Dict[int, Any]] = None
+
+        #: Statistics of the time threads waited to use the resource.
+        self.transaction_metrics = LockMetrics()
+
+        #: Reentrant lock serializing the operations of the threads sharing the
+        #: resource and depth of the transaction of the thread holding it.
+        self._transaction_lock = threading.RLock()
+        self._transaction_depth = 0
+
+        #: Set when the operations in progress are cancelled, cleared when the
+        #: outermost transaction starts or ends.
+        self._cancelled = threading.Event()
+
+        #: Statistics of the acquisitions of VISA locks by lock_lease.
+        self.lock_metrics = LockMetrics()
+
+        #: VISA lock currently leased and lock protecting its access.
+        self._lease: Optional[_LockLease] = None
+        self._lease_lock = threading.Lock()
+
+        #: Policy used to reopen the session after a connection loss, None to
+        #: let the errors propagate.
+        self.reconnect_policy: Optional[ReconnectPolicy] = None
+
+        #: Number of times the session was reopened after a connection loss.
+        self.reconnect_count = 0
+
+        #: Arguments used to open the session.
+        self._open_args: Tuple[constants.AccessModes, int] = (
+            constants.AccessModes.no_lock,
+            5000,
+        )
+
+        #: Configuration restored when reopening the session: values of the
+        #: VISA attributes local to the session set through the resource,
+        #: mechanisms enabled for each event type and installed handlers as
+        #: (event type, handler, user handle, returned handle, current handle).
+        self._replayed_attributes: Dict[constants.ResourceAttribute, Any] = {}
+        self._enabled_events: Dict[constants.EventType, int] = {}
+        self._handlers: List[
+            Tuple[constants.EventType, VISAHandler, Any, Any, Any]
+        ] = []
+
+        #: Pool to which the session is returned when closing the resource.
+        self.session_pool: Optional[SessionPool] = None
+
+        #: Values of the attributes modified through the resource before their
+        #: first modification, restored before returning the session to the pool.
+        self._original_attributes: Dict[constants.ResourceAttribute, Any] = {}
+
+        #: Asynchronous operations in progress, created on first use.
+        self._async_jobs: Optional[_AsyncJobs] = None
+
     @property
     def session(self) -> VISASession:
         """Resource session handle.
@@ -199,6 +658,234 @@ class Resource(object):
     def __exit__(self, *args) -> None:
         self.close()
 
+    @contextlib.contextmanager
+    def transaction(self: T) -> Iterator[T]:
+        """A context giving the current thread exclusive use of the resource.
+
+        Operations performed on the resource by other threads wait for the
+        context to exit, so that a sequence of operations is executed
+        atomically. The methods of the resource which perform several
+        operations (such as query) use a transaction internally. Transactions
+        can be nested. The time spent waiting for other threads is recorded in
+        transaction_metrics.
+
+        Yields
+        ------
+        Resource
+            The resource itself.
+
+        """
+        self._begin_transaction()
+        try:
+            yield self
+        except errors.VisaIOError as exc:
+            if _aborted(exc, self._cancelled):
+                raise errors.OperationCancelled() from exc
+            self._reconnect_after(exc)
+            raise
+        finally:
+            self._end_transaction()
+
+    def _begin_transaction(self) -> None:
+        """Acquire the transaction lock, recording the time spent waiting."""
+        lock = self._transaction_lock
+        if lock.acquire(blocking=False):
+            wait_time = 0.0
+        else:
+            start = time.perf_counter()
+            lock.acquire()
+            wait_time = time.perf_counter() - start
+        # Only the thread holding the lock accesses the depth and the metrics.
+        if not self._transaction_depth:
+            self._cancelled.clear()
+            self.transaction_metrics.record(wait_time)
+        elif self._cancelled.is_set():
+            lock.release()
+            raise errors.OperationCancelled()
+        self._transaction_depth += 1
+
+    def _end_transaction(self) -> None:
+        """Release the transaction lock."""
+        self._transaction_depth -= 1
+        if not self._transaction_depth:
+            self._cancelled.clear()
+        self._transaction_lock.release()
+
+    def cancel(self) -> bool:
+        """Abort the operations in progress on the resource.
+
+        This is meant to be called from another thread than the one performing
+        the operations. The VISA call in progress is terminated (the resource is
+        cleared if the library does not support terminating calls), and the
+        operation, as well as the remaining operations of the transaction it
+        belongs to, raise errors.OperationCancelled.
+
+        Returns
+        -------
+        bool
+            Whether an operation was in progress.
+
+        """
+        session = self._session
+        if not self._transaction_depth or session is None:
+            return False
+        logger.debug("%s - cancelling", self._resource_name, extra=self._logging_extra)
+        self._cancelled.set()
+        try:
+            # A null job id terminates the synchronous calls on the session.
+            self.visalib.terminate(
+                session,
+                constants.VI_NULL,  # type: ignore[arg-type]
+                typing.VISAJobID(constants.VI_NULL),
+            )
+        except (NotImplementedError, errors.VisaIOError):
+            try:
+                self.visalib.clear(session)
+            except (NotImplementedError, errors.VisaIOError):
+                pass
+        return True
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the operations in progress were cancelled."""
+        return self._cancelled.is_set()
+
+    def _check_cancelled(self) -> None:
+        """Raise errors.OperationCancelled if the operations were cancelled."""
+        if self._cancelled.is_set():
+            raise errors.OperationCancelled()
+
+    def _reconnect_after(self, exc: errors.VisaIOError) -> bool:
+        """Reopen the session if an error of the outermost operation requires it.
+
+        Returns
+        -------
+        bool
+            Whether the session was reopened.
+
+        """
+        policy = self.reconnect_policy
+        if (
+            policy is None
+            or self._transaction_depth != 1
+            or exc.error_code not in policy.error_codes
+        ):
+            return False
+        logger.info(
+            "%s - reconnecting after %s",
+            self._resource_name,
+            exc.abbreviation,
+            extra=self._logging_extra,
+        )
+        self.reconnect()
+        return True
+
+    def reconnect(self) -> None:
+        """Close the session and open a new one restoring the configuration.
+
+        The attempts to open the session follow the reconnect policy of the
+        resource (or the default policy if none is set). The VISA attributes
+        local to the session set through the resource, the enabled events and
+        the installed handlers are restored. VISA locks are not restored.
+
+        """
+        policy = self.reconnect_policy or ReconnectPolicy()
+        self._begin_transaction()
+        try:
+            self._drop_session()
+            attempt = 0
+            for delay in policy.delays():
+                attempt += 1
+                time.sleep(delay)
+                try:
+                    # Idle sessions of the pool may have lost their connection too.
+                    self._open_session(*self._open_args)
+                    self._logging_extra["session"] = self.session
+                    break
+                except errors.VisaIOError:
+                    if attempt == policy.max_attempts:
+                        raise
+                    logger.debug(
+                        "%s - failed to reopen the session (attempt %d)",
+                        self._resource_name,
+                        attempt,
+                        extra=self._logging_extra,
+                    )
+            self._replay_configuration()
+            self.reconnect_count += 1
+        finally:
+            self._end_transaction()
+
+    def _drop_session(self) -> None:
+        """Close the session ignoring errors since it may be invalid already."""
+        if self._async_jobs is not None:
+            self._async_jobs.cancel_all()
+        with self._lease_lock:
+            if self._lease is not None and self._lease.timer is not None:
+                self._lease.timer.cancel()
+            self._lease = None
+        if self._attribute_cache:
+            self._attribute_cache.clear()
+        session = self._session
+        if session is None:
+            return
+        self._session = None
+        self.visalib.handlers.pop(session, None)
+        try:
+            self.visalib.close(session)
+        except errors.VisaIOError:
+            pass
+
+    def _replay_configuration(self) -> None:
+        """Restore the configuration of the resource in a new session."""
+        session = self.session
+        for name, state in self._replayed_attributes.items():
+            self.set_visa_attribute(name, state)
+        for index, (event_type, handler, user_handle, returned, _) in enumerate(
+            self._handlers
+        ):
+            current = self.visalib.install_visa_handler(
+                session, event_type, handler, user_handle
+            )
+            self._handlers[index] = (
+                event_type,
+                handler,
+                user_handle,
+                returned,
+                current,
+            )
+        for event_type, mechanisms in self._enabled_events.items():
+            for mechanism in (
+                constants.EventMechanism.queue,
+                constants.EventMechanism.handler,
+                constants.EventMechanism.suspend_handler,
+            ):
+                if mechanisms & mechanism:
+                    self.visalib.enable_event(session, event_type, mechanism)
+
+    def _get_async_jobs(self) -> _AsyncJobs:
+        """Asynchronous operations of the resource, enabling their completion."""
+        if self._async_jobs is None:
+            self._async_jobs = _AsyncJobs(self)
+        return self._async_jobs
+
+    @property
+    def cache_attributes(self) -> bool:
+        """Whether the values of the VISA attributes local to the session are cached.
+
+        When enabled, attributes such as the timeout, the termination character
+        or send_end are retrieved from the VISA library only once, and setting
+        them to their current value does not call the library. The cache is
+        updated when the attributes are set through the resource, so they
+        should not be modified by calling the VISA library directly.
+
+        """
+        return self._attribute_cache is not None
+
+    @cache_attributes.setter
+    def cache_attributes(self, value: bool) -> None:
+        self._attribute_cache = {} if value else None
+
     @property
     def last_status(self) -> constants.StatusCode:
         """Last status code for this session."""
@@ -284,6 +971,31 @@ class Resource(object):
 
         """
         logger.debug("%s - opening ...", self._resource_name, extra=self._logging_extra)
+        if self._attribute_cache:
+            self._attribute_cache.clear()
+        self._open_args = (access_mode, open_timeout)
+        self._original_attributes.clear()
+        session = None
+        if self.session_pool is not None:
+            session = self.session_pool.acquire(self._pool_key())
+        if session is not None:
+            self.session = session
+        else:
+            self._open_session(access_mode, open_timeout)
+
+        self._logging_extra["session"] = self.session
+        logger.debug(
+            "%s - is open with session %s%s",
+            self._resource_name,
+            self.session,
+            " (reused)" if session is not None else "",
+            extra=self._logging_extra,
+        )
+
+    def _open_session(
+        self, access_mode: constants.AccessModes, open_timeout: int
+    ) -> None:
+        """Open a new session waiting for the device to be ready if necessary."""
         with self._resource_manager.ignore_warning(
             constants.StatusCode.success_device_not_present
         ):
@@ -307,16 +1019,53 @@ class Resource(object):
                         if error.error_code != constants.StatusCode.error_no_listeners:
                             raise
 
-        self._logging_extra["session"] = self.session
-        logger.debug(
-            "%s - is open with session %s",
-            self._resource_name,
-            self.session,
-            extra=self._logging_extra,
-        )
+    def _pool_key(self) -> PoolKey:
+        """Key identifying the sessions of the pool usable by this resource."""
+        return (self._resource_name, self._open_args[0], type(self))
+
+    def _release_session(self) -> bool:
+        """Return the session to the pool after restoring its attributes.
+
+        Returns
+        -------
+        bool
+            Whether the session was returned to the pool, if not it should be
+            closed.
+
+        """
+        pool = self.session_pool
+        if pool is None:
+            return False
+        session = self.session
+        try:
+            for name, state in self._original_attributes.items():
+                if state is attributes.NotAvailable:
+                    return False
+                self.visalib.set_attribute(session, name, state)
+            # Closing the session would release the locks it holds.
+            if (
+                self._open_args[0] == constants.AccessModes.no_lock
+                and self.visalib.get_attribute(
+                    session, constants.ResourceAttribute.resource_lock_state
+                )[0]
+                != constants.AccessModes.no_lock
+            ):
+                return False
+        except errors.VisaIOError:
+            return False
+        self._original_attributes.clear()
+        pool.release(self._pool_key(), session)
+        return True
 
     def before_close(self) -> None:
         """Called just before closing an instrument."""
+        with self._lease_lock:
+            if self._lease is not None and self._lease.timer is not None:
+                self._lease.timer.cancel()
+            self._lease = None
+        if self._async_jobs is not None:
+            self._async_jobs.cancel_all()
+            self._async_jobs = None
         self.__switch_events_off()
 
     def close(self) -> None:
@@ -324,9 +1073,13 @@ class Resource(object):
         try:
             logger.debug("%s - closing", self._resource_name, extra=self._logging_extra)
             self.before_close()
-            self.visalib.close(self.session)
+            if not self._release_session():
+                self.visalib.close(self.session)
             # Mypy is confused by the idea that we can set a value we cannot get
             self.session = None  # type: ignore
+            if self._attribute_cache:
+                self._attribute_cache.clear()
+            self._replayed_attributes.clear()
         except errors.InvalidSession:
             pass
 
@@ -341,6 +1094,7 @@ class Resource(object):
             constants.EventType.all_enabled, constants.EventMechanism.all
         )
         self.visalib.uninstall_all_visa_handlers(self.session)
+        self._handlers.clear()
 
     def get_visa_attribute(self, name: constants.ResourceAttribute) -> Any:
         """Retrieves the state of an attribute in this resource.
@@ -359,7 +1113,15 @@ class Resource(object):
             The state of the queried attribute for a specified resource.
 
         """
-        return self.visalib.get_attribute(self.session, name)[0]
+        cache = self._attribute_cache
+        if cache is None or name not in attributes.CacheableAttributes:
+            return self.visalib.get_attribute(self.session, name)[0]
+
+        try:
+            return cache[name]
+        except KeyError:
+            value = cache[name] = self.visalib.get_attribute(self.session, name)[0]
+            return value
 
     def set_visa_attribute(
         self, name: constants.ResourceAttribute, state: Any
@@ -382,8 +1144,103 @@ class Resource(object):
             Return value of the library call.
 
         """
-        return self.visalib.set_attribute(self.session, name, state)
+        if name not in attributes.CacheableAttributes:
+            return self.visalib.set_attribute(self.session, name, state)
+
+        if self.session_pool is not None and name not in self._original_attributes:
+            try:
+                original = self.visalib.get_attribute(self.session, name)[0]
+            except errors.VisaIOError:
+                original = attributes.NotAvailable
+            self._original_attributes[name] = original
+
+        cache = self._attribute_cache
+        if cache is None:
+            status = self.visalib.set_attribute(self.session, name, state)
+        elif name in cache and cache[name] == state:
+            return constants.StatusCode.success
+        else:
+            # Forget the value in case setting it fails
+            cache.pop(name, None)
+            status = self.visalib.set_attribute(self.session, name, state)
+            cache[name] = state
+        self._replayed_attributes[name] = state
+        return status
+
+    def snapshot_attributes(self) -> Dict[str, Any]:
+        """Read the values of the VISA attributes of the resource that can be set.
+
+        Read only attributes, and attributes which cannot be read or converted
+        for this resource, are omitted.
+
+        Returns
+        -------
+        Dict[str, Any]
+            Values of the attributes by Python name. The result can be used as
+            a profile to restore the state of the resource later.
+
+        """
+        snapshot = {}
+        for attr in sorted(self.visa_attributes_classes, key=lambda a: a.py_name):
+            if not (attr.read and attr.write and attr.py_name):
+                continue
+            try:
+                snapshot[attr.py_name] = getattr(self, attr.py_name)
+            except (errors.Error, ValueError) as e:
+                logger.debug(
+                    "%s - cannot snapshot %s: %s",
+                    self._resource_name,
+                    attr.py_name,
+                    e,
+                    extra=self._logging_extra,
+                )
+        return snapshot
+
+    def apply_profile(
+        self, profile: Union[ResourceProfile, Mapping[str, Any]]
+    ) -> List[str]:
+        """Set the attributes of the resource that differ from a profile.
+
+        Each attribute of the profile is read and only set if its value differs.
+        Reading attributes is free when cache_attributes is enabled.
+
+        Parameters
+        ----------
+        profile : Union[ResourceProfile, Mapping[str, Any]]
+            Profile, or values of the attributes by name, to apply.
+
+        Returns
+        -------
+        List[str]
+            Names of the attributes which were modified.
+
+        """
+        if not isinstance(profile, ResourceProfile):
+            profile = ResourceProfile("", profile)
+        profile.validate(type(self))
+
+        changed = []
+        for name, value in profile.values.items():
+            try:
+                current = getattr(self, name)
+            except (AttributeError, errors.VisaIOError):
+                # Write only or unreadable attribute, always set it.
+                current = attributes.NotAvailable
+            if current is attributes.NotAvailable or current != value:
+                setattr(self, name, value)
+                changed.append(name)
+
+        if changed:
+            logger.debug(
+                "%s - applied profile %r, modified %s",
+                self._resource_name,
+                profile.name,
+                ", ".join(changed),
+                extra=self._logging_extra,
+            )
+        return changed
 
+    @idempotent
     def clear(self) -> None:
         """Clear this resource."""
         self.visalib.clear(self.session)
@@ -413,9 +1270,11 @@ class Resource(object):
             a handler.
 
         """
-        return self.visalib.install_visa_handler(
+        returned = self.visalib.install_visa_handler(
             self.session, event_type, handler, user_handle
         )
+        self._handlers.append((event_type, handler, user_handle, returned, returned))
+        return returned
 
     def wrap_handler(
         self, callable: Callable[["Resource", Event, Any], None]
@@ -429,6 +1288,7 @@ class Resource(object):
         used to wrap the handler.
 
         """
+        visalib = self.visalib
 
         def event_handler(
             session: VISASession,
@@ -436,13 +1296,13 @@ class Resource(object):
             event_context: typing.VISAEventContext,
             user_handle: Any,
         ) -> None:
-            if session != self.session:
+            if session != self._session:
                 raise RuntimeError(
                     "When wrapping a handler, the resource used to wrap the handler"
                     "must be the same on which the handler will be installed."
                     f"Wrapping session: {self.session}, event on session: {session}"
                 )
-            event = Event(self.visalib, event_type, event_context)
+            event = Event(visalib, event_type, event_context)
             try:
                 return callable(self, event, user_handle)
             finally:
@@ -467,6 +1327,19 @@ class Resource(object):
             The user handle returned by install_handler.
 
         """
+        for index, record in enumerate(self._handlers):
+            # The handle returned by install_handler changes if the session is
+            # reopened, so look for the current one.
+            if (
+                record[0] == event_type
+                and record[1] == handler
+                and record[3] is user_handle
+            ):
+                self.visalib.uninstall_visa_handler(
+                    self.session, event_type, handler, record[4]
+                )
+                del self._handlers[index]
+                return
         self.visalib.uninstall_visa_handler(
             self.session, event_type, handler, user_handle
         )
@@ -485,6 +1358,14 @@ class Resource(object):
 
         """
         self.visalib.disable_event(self.session, event_type, mechanism)
+        if event_type == constants.EventType.all_enabled:
+            event_types = list(self._enabled_events)
+        else:
+            event_types = [event_type]
+        for event_type in event_types:
+            remaining = self._enabled_events.pop(event_type, 0) & ~mechanism
+            if remaining:
+                self._enabled_events[event_type] = remaining
 
     def discard_events(
         self, event_type: constants.EventType, mechanism: constants.EventMechanism
@@ -520,6 +1401,9 @@ class Resource(object):
 
         """
         self.visalib.enable_event(self.session, event_type, mechanism, context)
+        self._enabled_events[event_type] = (
+            self._enabled_events.get(event_type, 0) | mechanism
+        )
 
     def wait_on_event(
         self,
@@ -562,6 +1446,65 @@ class Resource(object):
             raise
         return WaitResponse(event_type, context, ret, self.visalib)
 
+    def drain_events(
+        self,
+        event_type: constants.EventType,
+        max_events: Optional[int] = None,
+        timeout: int = constants.VI_TMO_IMMEDIATE,
+        names: Optional[Iterable[str]] = None,
+    ) -> List[EventRecord]:
+        """Retrieve the queued occurrences of an event in a single call.
+
+        The events must have been enabled using the queue mechanism. Their
+        attributes are read and their VISA context closed right away.
+
+        Parameters
+        ----------
+        event_type : constants.EventType
+            Logical identifier of the event(s) to retrieve.
+        max_events : Optional[int], optional
+            Maximal number of events to retrieve. Defaults to None meaning all
+            the queued events.
+        timeout : int, optional
+            Time in milliseconds to wait for a first event if none is queued.
+            Defaults to 0 meaning that the call returns immediately.
+        names : Optional[Iterable[str]], optional
+            Names of the attributes of the events to read. Defaults to None
+            meaning all the attributes of the events.
+
+        Returns
+        -------
+        List[EventRecord]
+            Records of the retrieved events in the order in which they occurred.
+
+        """
+        if names is not None:
+            names = tuple(names)
+        visalib = self.visalib
+        session = self.session
+        records: List[EventRecord] = []
+        while max_events is None or len(records) < max_events:
+            try:
+                out_type, context, _ = visalib.wait_on_event(
+                    session, event_type, timeout
+                )
+            except errors.VisaIOError as exc:
+                if exc.error_code == constants.StatusCode.error_timeout:
+                    break
+                raise
+            # Only the first event may be waited for.
+            timeout = constants.VI_TMO_IMMEDIATE
+            event = Event(visalib, out_type, context)
+            try:
+                records.append(event.to_record(names))
+            finally:
+                event.close()
+                try:
+                    visalib.close(context)
+                except errors.VisaIOError:
+                    pass
+        return records
+
     def lock(
         self,
         timeout: Union[float, Literal["default"]] = "default",
@@ -646,5 +1589,134 @@ class Resource(object):
         finally:
             self.unlock()
 
+    @contextlib.contextmanager
+    def lock_lease(
+        self,
+        timeout: Union[float, Literal["default"]] = "default",
+        requested_key: Optional[str] = "exclusive",
+        hold_time: float = 0.0,
+    ) -> Iterator[Optional[str]]:
+        """A context that locks the resource, reusing the lock of enclosing contexts.
+
+        Contrary to lock_context, nested contexts (and contexts entered while
+        the lock is still held because of hold_time) reuse the VISA lock
+        instead of locking and unlocking the resource again. The time spent
+        waiting to acquire the VISA lock is recorded in lock_metrics.
+
+        Parameters
+        ----------
+        timeout : Union[float, Literal["default"]], optional
+            Absolute time period (in milliseconds) that a resource waits to get
+            unlocked by the locking session before returning an error.
+            Defaults to "default" which means use self.timeout.
+        requested_key : Optional[str], optional
+            When using default of 'exclusive' the lock is an exclusive lock.
+            Otherwise it is the access key for the shared lock or None to
+            generate a new shared access key or use the one of the shared lock
+            currently held.
+        hold_time : float, optional
+            Time in milliseconds during which the lock is kept after the last
+            context using it exits, so that a following context can reuse it.
+            Defaults to 0, meaning the lock is released immediately.
+
+        Yields
+        ------
+        Optional[str]
+            The access_key if applicable.
+
+        """
+        access_key = self._acquire_lease(timeout, requested_key)
+        try:
+            yield access_key
+        finally:
+            self._release_lease(hold_time)
+
+    def release_lock_lease(self) -> None:
+        """Release immediately the VISA lock held by an idle lock lease."""
+        with self._lease_lock:
+            lease = self._lease
+            if lease is not None and lease.depth == 0:
+                self._expire_lease(lease)
+
+    def _acquire_lease(
+        self,
+        timeout: Union[float, Literal["default"]],
+        requested_key: Optional[str],
+    ) -> Optional[str]:
+        """Get the lease of a VISA lock, locking the resource if necessary.
+
+        The lease lock is not held while waiting for the VISA lock, so that the
+        contexts of other threads can exit in the meantime. If another lease
+        was installed while waiting, the VISA lock is released and the lease is
+        looked up again.
+
+        """
+        while True:
+            with self._lease_lock:
+                lease = self._lease
+                if lease is not None:
+                    if lease.matches(requested_key):
+                        if lease.timer is not None:
+                            lease.timer.cancel()
+                            lease.timer = None
+                        lease.depth += 1
+                        return lease.access_key
+                    if lease.depth:
+                        raise ValueError(
+                            "Cannot lock the resource with key %r while a lock "
+                            "acquired with key %r is in use."
+                            % (requested_key, lease.requested_key)
+                        )
+                    self._expire_lease(lease)
+
+            start = time.perf_counter()
+            if requested_key == "exclusive":
+                self.lock_excl(timeout)
+                access_key = None
+            else:
+                access_key = self.lock(timeout, requested_key)
+            self.lock_metrics.record(time.perf_counter() - start)
+
+            with self._lease_lock:
+                if self._lease is None:
+                    self._lease = _LockLease(requested_key, access_key)
+                    return access_key
+            self.unlock()
+
+    def _release_lease(self, hold_time: float) -> None:
+        """Stop using the current lease, releasing the VISA lock if appropriate."""
+        with self._lease_lock:
+            lease = self._lease
+            if lease is None:
+                # The resource was closed while the lease was in use.
+                return
+            lease.depth -= 1
+            if lease.depth:
+                return
+            if hold_time > 0:
+                lease.timer = threading.Timer(
+                    hold_time / 1000, self._expire_idle_lease, (lease,)
+                )
+                lease.timer.daemon = True
+                lease.timer.start()
+            else:
+                self._expire_lease(lease)
+
+    def _expire_idle_lease(self, lease: _LockLease) -> None:
+        """Release the VISA lock of a lease which has been idle long enough."""
+        with self._lease_lock:
+            if self._lease is lease and lease.depth == 0:
+                self._expire_lease(lease)
+
+    def _expire_lease(self, lease: _LockLease) -> None:
+        """Release the VISA lock of a lease, the lease lock must be held."""
+        if lease.timer is not None:
+            lease.timer.cancel()
+        self._lease = None
+        try:
+            self.unlock()
+        except errors.InvalidSession:
+            pass
+
 
 Resource.register(constants.InterfaceType.unknown, "")(Resource)
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""Dispatch the service requests of many resources from a single thread.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+from . import constants, errors, logger
+from .resources.messagebased import MessageBasedResource
+from .typing import VISAEventContext, VISASession
+
+#: Callback called with the resource and its status byte on a service request.
+SRQCallback = Callable[[MessageBasedResource, int], None]
+
+#: Bit of the status byte set by a device requesting service.
+RQS_BIT = 0x40
+
+
+class _Registration:
+    """Resource registered on a multiplexer and what to notify on its requests."""
+
+    def __init__(self, resource: MessageBasedResource) -> None:
+        self.resource = resource
+        self.callbacks: List[SRQCallback] = []
+        self.futures: List["Future[int]"] = []
+        self.handler: Optional[Callable[..., None]] = None
+        self.user_handle: Any = None
+
+
+class SRQMultiplexer:
+    """Wait for the service requests of several resources using a single thread.
+
+    The service request event is enabled once for each registered resource.
+    When a resource requests service, its status byte is read by a serial poll
+    (which identifies the source and clears the request) in the dispatching
+    thread, and passed to the callbacks registered for the resource and to the
+    futures returned by next_srq.
+
+    Parameters
+    ----------
+    mechanism : constants.EventMechanism, optional
+        Mechanism used to be notified of the service requests. With the handler
+        mechanism, the VISA library notifies the dispatching thread. With the
+        queue mechanism, the dispatching thread polls the event queue of each
+        resource every poll_interval. Defaults to the handler mechanism.
+    poll_interval : float, optional
+        Interval in s between two polls of the event queues when using the
+        queue mechanism. Defaults to 0.01.
+    rqs_only : bool, optional
+        Only dispatch the requests whose status byte has the RQS bit set,
+        ignoring the spurious ones. Defaults to True.
+
+    """
+
+    #: Error which stopped the dispatching thread if any.
+    error: Optional[BaseException]
+
+    def __init__(
+        self,
+        mechanism: constants.EventMechanism = constants.EventMechanism.handler,
+        poll_interval: float = 0.01,
+        rqs_only: bool = True,
+    ) -> None:
+        if mechanism not in (
+            constants.EventMechanism.handler,
+            constants.EventMechanism.queue,
+        ):
+            raise ValueError("mechanism must be EventMechanism.handler or queue")
+        self.mechanism = mechanism
+        self.poll_interval = poll_interval
+        self.rqs_only = rqs_only
+        self.error = None
+        self._registrations: Dict[int, _Registration] = {}
+        self._lock = threading.Lock()
+        #: Resources which requested service, None to wake up the thread.
+        self._pending: "queue.SimpleQueue[Optional[MessageBasedResource]]" = (
+            queue.SimpleQueue()
+        )
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatching thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start dispatching the service requests in a background thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the dispatching thread and unregister all the resources."""
+        self._stop.set()
+        self._pending.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            resources = [r.resource for r in self._registrations.values()]
+        for resource in resources:
+            self.unregister(resource)
+
+    def __enter__(self) -> "SRQMultiplexer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def register(
+        self, resource: MessageBasedResource, callback: Optional[SRQCallback] = None
+    ) -> None:
+        """Enable the service requests of a resource and dispatch them.
+
+        Parameters
+        ----------
+        resource : MessageBasedResource
+            Resource whose service requests to dispatch. Registering a resource
+            again only adds the callback.
+        callback : Optional[SRQCallback], optional
+            Callable called with the resource and its status byte, in the
+            dispatching thread, on each service request. Defaults to None.
+
+        """
+        with self._lock:
+            registration = self._registrations.get(id(resource))
+            new = registration is None
+            if registration is None:
+                registration = self._registrations[id(resource)] = _Registration(
+                    resource
+                )
+            if callback is not None:
+                registration.callbacks.append(callback)
+        if not new:
+            return
+
+        event_type = constants.EventType.service_request
+        try:
+            if self.mechanism == constants.EventMechanism.handler:
+                handler = self._make_handler(resource)
+                registration.user_handle = resource.install_handler(event_type, handler)
+                registration.handler = handler
+            resource.enable_event(event_type, self.mechanism)
+        except Exception:
+            with self._lock:
+                del self._registrations[id(resource)]
+            if registration.handler is not None:
+                resource.uninstall_handler(
+                    event_type, registration.handler, registration.user_handle
+                )
+            raise
+
+    def unregister(self, resource: MessageBasedResource) -> None:
+        """Stop dispatching the service requests of a resource.
+
+        The pending futures of the resource are cancelled.
+
+        """
+        with self._lock:
+            registration = self._registrations.pop(id(resource), None)
+        if registration is None:
+            return
+        for future in registration.futures:
+            future.cancel()
+        event_type = constants.EventType.service_request
+        try:
+            resource.disable_event(event_type, self.mechanism)
+            resource.discard_events(event_type, self.mechanism)
+            if registration.handler is not None:
+                resource.uninstall_handler(
+                    event_type, registration.handler, registration.user_handle
+                )
+        except (errors.InvalidSession, errors.VisaIOError):
+            # The resource may have been closed already.
+            pass
+
+    def next_srq(self, resource: MessageBasedResource) -> "Future[int]":
+        """Future resolved with the status byte on the next service request.
+
+        The resource must be registered. Use asyncio.wrap_future to await the
+        future in a coroutine.
+
+        """
+        future: "Future[int]" = Future()
+        with self._lock:
+            try:
+                self._registrations[id(resource)].futures.append(future)
+            except KeyError:
+                raise ValueError("%s is not registered" % resource) from None
+        return future
+
+    def wait_for_srq(
+        self, resource: MessageBasedResource, timeout: Optional[float] = None
+    ) -> int:
+        """Wait for the next service request of a registered resource.
+
+        Parameters
+        ----------
+        resource : MessageBasedResource
+            Resource whose service request to wait for.
+        timeout : Optional[float], optional
+            Maximal time to wait in s. Defaults to None meaning wait forever.
+
+        Returns
+        -------
+        int
+            Status byte of the resource.
+
+        Raises
+        ------
+        errors.VisaIOError
+            Raised with a timeout error code if no service request occurred.
+
+        """
+        future = self.next_srq(resource)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._lock:
+                registration = self._registrations.get(id(resource))
+                if registration is not None and future in registration.futures:
+                    registration.futures.remove(future)
+            raise errors.VisaIOError(constants.StatusCode.error_timeout) from None
+
+    def _make_handler(self, resource: MessageBasedResource) -> Callable[..., None]:
+        """Create the VISA handler notifying the thread of a resource request."""
+        pending = self._pending
+
+        def handler(
+            session: VISASession,
+            event_type: constants.EventType,
+            context: VISAEventContext,
+            user_handle: Any,
+        ) -> None:
+            pending.put(resource)
+
+        return handler
+
+    def _run(self) -> None:
+        """Wait for the service requests and dispatch them."""
+        polling = self.mechanism == constants.EventMechanism.queue
+        timeout = self.poll_interval if polling else None
+        try:
+            while not self._stop.is_set():
+                try:
+                    resource = self._pending.get(timeout=timeout)
+                except queue.Empty:
+                    resource = None
+                if resource is not None:
+                    self._dispatch(resource)
+                elif polling and not self._stop.is_set():
+                    self._poll_queues()
+        except BaseException as e:
+            logger.exception("Service request dispatching stopped")
+            self.error = e
+
+    def _poll_queues(self) -> None:
+        """Dispatch the requests queued on the resources using the queue mechanism."""
+        with self._lock:
+            resources = [r.resource for r in self._registrations.values()]
+        for resource in resources:
+            try:
+                pending = resource.drain_events(constants.EventType.service_request)
+            except errors.InvalidSession:
+                self._discard(resource)
+                continue
+            except errors.Error as e:
+                logger.warning("Failed to poll the events of %s: %s", resource, e)
+                continue
+            if pending:
+                self._dispatch(resource)
+
+    def _discard(self, resource: MessageBasedResource) -> None:
+        """Unregister a resource closed without being unregistered."""
+        logger.debug("Unregistering %s whose session is closed", resource)
+        self.unregister(resource)
+
+    def _dispatch(self, resource: MessageBasedResource) -> None:
+        """Read the status byte of a resource and notify the registered parties."""
+        with self._lock:
+            registration = self._registrations.get(id(resource))
+        if registration is None:
+            return
+        try:
+            stb = resource.read_stb()
+        except errors.InvalidSession:
+            self._discard(resource)
+            return
+        except errors.Error as e:
+            logger.warning("Failed to read the status byte of %s: %s", resource, e)
+            return
+        if self.rqs_only and not stb & RQS_BIT:
+            return
+
+        with self._lock:
+            futures, registration.futures = registration.futures, []
+            callbacks = list(registration.callbacks)
+        for future in futures:
+            if future.set_running_or_notify_cancel():
+                future.set_result(stb)
+        for callback in callbacks:
+            try:
+                callback(resource, stb)
+            except Exception:
+                logger.exception(
+                    "Error in the service request callback of %s", resource
+                )
@@ -0,0 +1,398 @@
+# -*- coding: utf-8 -*-
+"""In-memory VISA library used to test resources without an instrument.
+
+This file is part of PyVISA.
+
+:copyright: 2014-2024 by PyVISA Authors, see AUTHORS for more details.
+:license: MIT, see LICENSE for more details.
+
+"""
+
+import itertools
+import threading
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from pyvisa import constants, errors
+from pyvisa.constants import ResourceAttribute, StatusCode
+from pyvisa.highlevel import ResourceManager, VisaLibraryBase
+from pyvisa.util import LibraryPath
+
+from . import BaseTestCase
+
+_COUNTER = itertools.count()
+
+#: Address at which map_address maps the address spaces.
+MAPPED_ADDRESS = 0x10000000
+
+#: Attributes values of a freshly opened session.
+DEFAULT_ATTRIBUTES = {
+    ResourceAttribute.timeout_value: 2000,
+    ResourceAttribute.termchar: ord("\n"),
+    ResourceAttribute.termchar_enabled: constants.VI_FALSE,
+    ResourceAttribute.send_end_enabled: constants.VI_TRUE,
+    ResourceAttribute.resource_class: "INSTR",
+    ResourceAttribute.resource_lock_state: constants.AccessModes.no_lock,
+}
+
+
+class FakeVisaLibrary(VisaLibraryBase):
+    """VISA library serving pre-recorded answers from memory.
+
+    Data queued using ``queue_output`` are returned by read operations and all
+    written messages are recorded in ``written``. A ``responder`` can be used to
+    generate answers based on the messages written to the instrument.
+
+    """
+
+    #: Messages written to each session.
+    written: Dict[int, List[bytes]]
+
+    #: Data waiting to be read on each session.
+    output: Dict[int, bytearray]
+
+    #: Exceptions (or None for a normal read) to use for the next read calls.
+    read_errors: Deque[Optional[errors.VisaIOError]]
+
+    #: Exceptions (or None for a normal write) to use for the next write calls.
+    write_errors: Deque[Optional[errors.VisaIOError]]
+
+    #: Callable generating the answer to a written message.
+    responder: Optional[Callable[[int, bytes], Optional[bytes]]]
+
+    #: Number of calls to each library function.
+    calls: Dict[str, int]
+
+    #: Status byte of each session.
+    stb: Dict[int, int]
+
+    #: Events waiting to be retrieved using wait_on_event on each session, with
+    #: optionally the values of their attributes.
+    events: Dict[int, Deque[Any]]
+
+    #: Whether reads wait for the timeout (or for terminate) when no data are
+    #: available instead of failing immediately.
+    blocking_reads: bool
+
+    #: Event types for which enable_event fails.
+    unsupported_events: Set[constants.EventType]
+
+    #: Session and return count of the asynchronous operations in progress.
+    jobs: Dict[int, Tuple[int, int]]
+
+    #: Whether asynchronous operations complete before the call starting them
+    #: returns instead of waiting for complete_job.
+    complete_immediately: bool
+
+    #: Register values of each session by address space and offset.
+    memory: Dict[int, Dict[Tuple[constants.AddressSpace, int], int]]
+
+    #: Whether map_address succeeds.
+    mappable: bool
+
+    #: Written data are copied before being recorded.
+    write_accepts_buffers = True
+
+    @staticmethod
+    def get_library_paths() -> Tuple[LibraryPath, ...]:
+        return (LibraryPath("fake%d" % next(_COUNTER)),)
+
+    @classmethod
+    def create(cls) -> "FakeVisaLibrary":
+        """Create a new library instance not shared with other tests."""
+        return cls(cls.get_library_paths()[0])  # type: ignore
+
+    def _init(self) -> None:
+        self._session_counter = itertools.count(100)
+        self.sessions: Dict[int, str] = {}
+        self.attributes: Dict[int, Dict[Any, Any]] = {}
+        self.written = defaultdict(list)
+        self.output = defaultdict(bytearray)
+        self.read_errors = deque()
+        self.write_errors = deque()
+        self.responder = None
+        self.calls = defaultdict(int)
+        self.stb = defaultdict(int)
+        self.events = defaultdict(deque)
+        self.unsupported_events = set()
+        self.blocking_reads = False
+        self._terminated: Dict[int, threading.Event] = defaultdict(threading.Event)
+        self._context_counter = itertools.count(10000)
+        self._job_counter = itertools.count(1)
+        self.jobs = {}
+        self.buffers: Dict[int, bytearray] = {}
+        self.complete_immediately = False
+        self.memory = defaultdict(dict)
+        self.mappable = True
+        self._mapped: Dict[int, Tuple[constants.AddressSpace, int]] = {}
+
+    def queue_output(self, session: int, data: bytes) -> None:
+        """Queue data to be read from a session."""
+        self.output[session].extend(data)
+
+    def open_default_resource_manager(self):
+        self.calls["open_default_resource_manager"] += 1
+        return 1, StatusCode.success
+
+    def open(self, session, resource_name, access_mode=0, open_timeout=0):
+        self.calls["open"] += 1
+        new = next(self._session_counter)
+        self.sessions[new] = resource_name
+        self.attributes[new] = dict(DEFAULT_ATTRIBUTES)
+        return new, self.handle_return_value(new, StatusCode.success)
+
+    def close(self, session):
+        self.calls["close"] += 1
+        self.sessions.pop(session, None)
+        return StatusCode.success
+
+    def clear(self, session):
+        self.calls["clear"] += 1
+        self.output[session].clear()
+        return StatusCode.success
+
+    def get_attribute(self, session, attribute):
+        self.calls["get_attribute"] += 1
+        try:
+            return self.attributes[session][attribute], StatusCode.success
+        except KeyError:
+            raise errors.VisaIOError(StatusCode.error_nonsupported_attribute)
+
+    def set_attribute(self, session, attribute, attribute_state):
+        self.calls["set_attribute"] += 1
+        self.attributes[session][attribute] = attribute_state
+        return StatusCode.success
+
+    def lock(self, session, lock_type, timeout, requested_key=None):
+        self.calls["lock"] += 1
+        self.attributes[session][ResourceAttribute.resource_lock_state] = lock_type
+        if lock_type == constants.Lock.exclusive:
+            return None, StatusCode.success
+        return requested_key or "key%d" % session, StatusCode.success
+
+    def unlock(self, session):
+        self.calls["unlock"] += 1
+        self.attributes[session][ResourceAttribute.resource_lock_state] = (
+            constants.AccessModes.no_lock
+        )
+        return StatusCode.success
+
+    def enable_event(self, session, event_type, mechanism, context=None):
+        self.calls["enable_event"] += 1
+        if event_type in self.unsupported_events:
+            raise errors.VisaIOError(StatusCode.error_invalid_event)
+        return StatusCode.success
+
+    def disable_event(self, session, event_type, mechanism):
+        return StatusCode.success
+
+    def discard_events(self, session, event_type, mechanism):
+        return StatusCode.success
+
+    def read_stb(self, session):
+        self.calls["read_stb"] += 1
+        return self.stb[session], StatusCode.success
+
+    def wait_on_event(self, session, in_event_type, timeout):
+        self.calls["wait_on_event"] += 1
+        if not self.events[session]:
+            raise errors.VisaIOError(StatusCode.error_timeout)
+        event = self.events[session].popleft()
+        context = next(self._context_counter)
+        if isinstance(event, tuple):
+            event, self.attributes[context] = event
+        return event, context, StatusCode.success
+
+    def terminate(self, session, degree, job_id):
+        self.calls["terminate"] += 1
+        self._terminated[session].set()
+        return StatusCode.success
+
+    def install_handler(self, session, event_type, handler, user_handle=None):
+        self.calls["install_handler"] += 1
+        return handler, object(), handler, StatusCode.success
+
+    def uninstall_handler(self, session, event_type, handler, user_handle=None):
+        self.calls["uninstall_handler"] += 1
+        return StatusCode.success
+
+    def write(self, session, data):
+        self.calls["write"] += 1
+        if self.write_errors:
+            error = self.write_errors.popleft()
+            if error is not None:
+                raise error
+        data = bytes(data)
+        self.written[session].append(data)
+        if self.responder is not None:
+            answer = self.responder(session, data)
+            if answer is not None:
+                self.queue_output(session, answer)
+        return len(data), self.handle_return_value(session, StatusCode.success)
+
+    def read(self, session, count):
+        self.calls["read"] += 1
+        if self.read_errors:
+            error = self.read_errors.popleft()
+            if error is not None:
+                raise error
+
+        buffer = self.output[session]
+        attrs = self.attributes[session]
+        if not buffer and self.blocking_reads:
+            terminated = self._terminated[session]
+            terminated.clear()
+            if terminated.wait(attrs[ResourceAttribute.timeout_value] / 1000):
+                raise errors.VisaIOError(StatusCode.error_abort)
+        if not buffer:
+            raise errors.VisaIOError(StatusCode.error_timeout)
+
+        size = min(count, len(buffer))
+        status = StatusCode.success_max_count_read
+        if attrs[ResourceAttribute.termchar_enabled]:
+            index = buffer.find(attrs[ResourceAttribute.termchar], 0, size)
+            if index >= 0:
+                size = index + 1
+                status = StatusCode.success_termination_character_read
+        data = bytes(buffer[:size])
+        del buffer[:size]
+        if not buffer and status == StatusCode.success_max_count_read:
+            status = StatusCode.success
+        return data, self.handle_return_value(session, status)
+
+    def read_asynchronously(self, session, count):
+        self.calls["read_asynchronously"] += 1
+        buffer = bytearray(count)
+        output = self.output[session]
+        size = min(count, len(output))
+        buffer[:size] = output[:size]
+        del output[:size]
+        job_id = next(self._job_counter)
+        self.buffers[job_id] = buffer
+        self._start_job(session, job_id, size)
+        return buffer, job_id, StatusCode.success
+
+    def get_buffer_from_id(self, job_id):
+        return self.buffers.get(job_id)
+
+    def release_buffer(self, job_id):
+        self.calls["release_buffer"] += 1
+        self.buffers.pop(job_id, None)
+
+    def write_asynchronously(self, session, data):
+        self.calls["write_asynchronously"] += 1
+        self.written[session].append(bytes(data))
+        job_id = next(self._job_counter)
+        self._start_job(session, job_id, len(data))
+        return job_id, StatusCode.success
+
+    def move_asynchronously(
+        self,
+        session,
+        source_space,
+        source_offset,
+        source_width,
+        destination_space,
+        destination_offset,
+        destination_width,
+        length,
+    ):
+        self.calls["move_asynchronously"] += 1
+        job_id = next(self._job_counter)
+        self._start_job(session, job_id, length)
+        return job_id, StatusCode.success
+
+    def _start_job(self, session: int, job_id: int, count: int) -> None:
+        self.jobs[job_id] = (session, count)
+        if self.complete_immediately:
+            self.complete_job(job_id)
+
+    def complete_job(self, job_id: int, status: StatusCode = StatusCode.success):
+        """Signal the completion of an asynchronous operation to the handlers."""
+        session, count = self.jobs.pop(job_id)
+        self.fire_event(
+            session,
+            constants.EventType.io_completion,
+            {
+                constants.EventAttribute.job_id: job_id,
+                constants.EventAttribute.status: status,
+                constants.EventAttribute.return_count: count,
+            },
+        )
+
+    def fire_event(
+        self, session: Any, event_type: constants.EventType, attrs: Dict[int, Any]
+    ) -> None:
+        """Call the handlers installed on a session for an event type."""
+        context: Any = next(self._context_counter)
+        self.attributes[context] = attrs
+        for handler, user_handle, _, handled_type in list(self.handlers[session]):
+            if handled_type == event_type:
+                handler(session, event_type, context, user_handle)
+
+    def read_memory(self, session, space, offset, width, extended=False):
+        self.calls["read_memory"] += 1
+        return self.memory[session].get((space, offset), 0), StatusCode.success
+
+    def write_memory(self, session, space, offset, data, width, extended=False):
+        self.calls["write_memory"] += 1
+        self.memory[session][(space, offset)] = data
+        return StatusCode.success
+
+    def move_in(self, session, space, offset, length, width, extended=False):
+        self.calls["move_in"] += 1
+        step = _width_bits(width) // 8
+        memory = self.memory[session]
+        data = [memory.get((space, offset + i * step), 0) for i in range(length)]
+        return data, StatusCode.success
+
+    def move_out(self, session, space, offset, length, data, width, extended=False):
+        self.calls["move_out"] += 1
+        step = _width_bits(width) // 8
+        for i, value in enumerate(list(data)[:length]):
+            self.memory[session][(space, offset + i * step)] = value
+        return StatusCode.success
+
+    def map_address(
+        self, session, map_space, map_base, map_size, access=False, suggested=None
+    ):
+        self.calls["map_address"] += 1
+        if not self.mappable:
+            raise errors.VisaIOError(StatusCode.error_nonsupported_operation)
+        self._mapped[session] = (map_space, map_base)
+        return MAPPED_ADDRESS, StatusCode.success
+
+    def unmap_address(self, session):
+        self.calls["unmap_address"] += 1
+        del self._mapped[session]
+        return StatusCode.success
+
+    def peek(self, session, address, width):
+        self.calls["peek"] += 1
+        space, base = self._mapped[session]
+        offset = base + address - MAPPED_ADDRESS
+        return self.memory[session].get((space, offset), 0), StatusCode.success
+
+    def poke(self, session, address, width, data):
+        self.calls["poke"] += 1
+        space, base = self._mapped[session]
+        self.memory[session][(space, base + address - MAPPED_ADDRESS)] = data
+        return StatusCode.success
+
+
+def _width_bits(width) -> int:
+    """Number of bits of a width given in bits or as a DataWidth."""
+    return width * 8 if isinstance(width, constants.DataWidth) else width
+
+
+class FakeLibraryTestCase(BaseTestCase):
+    """Base class providing a fake library and a resource manager using it."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.lib = FakeVisaLibrary.create()
+        self.rm = ResourceManager(self.lib)
+
+    def teardown_method(self):
+        self.rm.close()
+        super().teardown_method()
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""Test the continuous acquisition of records."""
+
+import struct
+
+import pytest
+
+from pyvisa import errors, util
+from pyvisa.acquisition import ContinuousAcquisition
+
+from .test_messagebased import MessageBasedTestCase
+
+pytestmark = pytest.mark.skipif(util.np is None, reason="Requires numpy")
+
+
+class TestContinuousAcquisition(MessageBasedTestCase):
+    """Test acquiring records into a ring buffer."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.counter = 0
+
+        def responder(session, data):
+            if data == b"CURV?\r\n":
+                self.counter += 1
+                return util.to_ieee_block([self.counter] * 4, "h") + b"\n"
+            return None
+
+        self.lib.responder = responder
+
+    def create(self, **kwargs):
+        return ContinuousAcquisition(
+            self.instr, "CURV?", 4, n_records=3, datatype="h", **kwargs
+        )
+
+    def test_acquire_and_get(self):
+        acq = self.create(trigger="TRIG")
+        acq.acquire()
+        acq.acquire()
+        assert acq.lag == 2
+        assert list(acq.get()) == [1] * 4
+        record = acq.get()
+        assert list(record) == [2] * 4
+        assert acq.lag == 1
+        # The records are views into the ring buffer
+        assert util.np.shares_memory(record, acq._records)
+        assert self.lib.written[self.instr.session][:2] == [b"TRIG\r\n", b"CURV?\r\n"]
+        assert not self.lib.output[self.instr.session]
+
+    def test_single_transaction(self):
+        acq = self.create(trigger="TRIG")
+        count = self.instr.transaction_metrics.count
+        acq.acquire()
+        # The writes and reads of a record are not interleaved with the
+        # operations of other threads.
+        assert self.instr.transaction_metrics.count == count + 1
+
+    def test_overwrite_policy(self):
+        acq = self.create()
+        for _ in range(5):
+            acq.acquire()
+        assert acq.acquired == 5
+        assert acq.dropped == 2
+        assert acq.lag == 3
+        assert [r[0] for r in (acq.get(), acq.get(), acq.get())] == [3, 4, 5]
+
+    def test_drop_policy(self):
+        acq = self.create(policy="drop")
+        record = None
+        for _ in range(5):
+            acq.acquire()
+            if record is None:
+                record = acq.get()
+        # The record held by the consumer is not overwritten
+        assert list(record) == [1] * 4
+        assert acq.dropped == 2
+        assert [r[0] for r in (acq.get(), acq.get())] == [2, 3]
+
+    def test_background_acquisition(self):
+        acq = self.create(policy="drop")
+        received = []
+        with acq:
+            for record in acq:
+                received.append(int(record[0]))
+                if len(received) == 10:
+                    break
+        assert received == sorted(received)
+        assert len(received) == 10
+        assert not acq.running
+
+    def test_hp_header(self):
+        self.lib.responder = lambda session, data: (
+            b"#A\x08\x00" + struct.pack("<4h", 1, 2, 3, 4) + b"\n"
+        )
+        acq = self.create(header_fmt="hp")
+        acq.acquire()
+        assert list(acq.get()) == [1, 2, 3, 4]
+
+    def test_error(self):
+        self.lib.responder = lambda session, data: b"#14ABCD\n"
+        acq = self.create()
+        acq.start()
+        with pytest.raises(errors.InvalidBinaryFormat):
+            acq.get(timeout=5)
+        assert isinstance(acq.error, errors.InvalidBinaryFormat)
+
+    def test_get_not_running(self):
+        acq = self.create()
+        with pytest.raises(StopIteration):
+            acq.get(timeout=0)
+        assert list(acq) == []
+
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            self.create(policy="invalid")
+        with pytest.raises(ValueError):
+            self.create(header_fmt="rs")
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""Test delivering VISA events to asyncio code."""
+
+import asyncio
+import threading
+
+import pytest
+
+from pyvisa import errors
+from pyvisa.aio import AsyncEventStream
+from pyvisa.constants import EventType, ResourceAttribute, TriggerID
+
+from .fake_library import FakeLibraryTestCase
+
+
+class TestAsyncEventStream(FakeLibraryTestCase):
+    """Test the asynchronous event streams."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.instr = self.rm.open_resource("TCPIP::192.168.0.1::INSTR")
+
+    def fire(self, trigger_ids):
+        """Call the installed handler from another thread for each trigger id."""
+        session = self.instr.session
+        handler = self.lib.handlers[session][0][0]
+
+        def target():
+            for context, trigger_id in enumerate(trigger_ids, 20000):
+                self.lib.attributes[context] = {
+                    ResourceAttribute.trigger_id: trigger_id
+                }
+                handler(session, EventType.trig, context, None)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+
+    def test_stream(self):
+        async def main():
+            received = []
+            async with AsyncEventStream(self.instr, EventType.trig) as stream:
+                assert self.lib.calls["enable_event"] == 1
+                self.fire([0, 1, -1])
+                async for record in stream:
+                    received.append(record.received_trigger_id)
+                    if len(received) == 3:
+                        break
+            return received
+
+        assert asyncio.run(main()) == [
+            TriggerID.ttl0,
+            TriggerID.ttl1,
+            TriggerID.serial_word,
+        ]
+        assert not self.lib.handlers[self.instr.session]
+
+    def test_close_ends_iteration(self):
+        async def main():
+            stream = AsyncEventStream(self.instr, EventType.trig, names=())
+            stream.open()
+            self.fire([0])
+            stream.close()
+            return [record.values async for record in stream]
+
+        assert asyncio.run(main()) == [{}]
+
+    def test_maxsize(self):
+        async def main():
+            async with AsyncEventStream(self.instr, EventType.trig, 2) as stream:
+                self.fire([0, 1, 2])
+                await asyncio.sleep(0)
+                assert stream.queue.qsize() == 2
+                return stream.dropped
+
+        assert asyncio.run(main()) == 1
+
+    def test_not_open(self):
+        stream = AsyncEventStream(self.instr, EventType.trig)
+        with pytest.raises(RuntimeError):
+            stream.queue
+        self.lib.unsupported_events.add(EventType.trig)
+
+        async def main():
+            await stream.__aenter__()
+
+        with pytest.raises(errors.VisaIOError):
+            asyncio.run(main())
+        assert not self.lib.handlers[self.instr.session]
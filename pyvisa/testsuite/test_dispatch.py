@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""Test handling events in worker threads through a dispatcher."""
+
+import threading
+import time
+
+import pytest
+
+from pyvisa.constants import EventType, ResourceAttribute
+from pyvisa.dispatch import HandlerDispatcher, OverflowPolicy
+
+from .fake_library import FakeLibraryTestCase
+
+
+class TestHandlerDispatcher(FakeLibraryTestCase):
+    """Test the handler dispatcher."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.instr = self.rm.open_resource("TCPIP::192.168.0.1::INSTR")
+        self.received = []
+        self.release = threading.Event()
+        self.started = threading.Event()
+
+    def teardown_method(self):
+        self.release.set()
+        super().teardown_method()
+
+    def fire(self, trigger_id):
+        self.lib.fire_event(
+            self.instr.session,
+            EventType.trig,
+            {ResourceAttribute.trigger_id: trigger_id},
+        )
+
+    def handler(self, resource, record):
+        self.received.append((resource, record, threading.current_thread()))
+
+    def slow_handler(self, resource, record):
+        self.started.set()
+        self.release.wait(1)
+        self.received.append(record.received_trigger_id)
+
+    def test_dispatch(self):
+        with HandlerDispatcher() as dispatcher:
+            dispatcher.install(self.instr, EventType.trig, self.handler)
+            self.fire(0)
+        # Stopping waits for the queued events to be handled.
+        ((resource, record, thread),) = self.received
+        assert resource is self.instr
+        assert record.event_type == EventType.trig
+        assert record.received_trigger_id == 0
+        assert thread is not threading.current_thread()
+        assert dispatcher.metrics.dispatched == 1
+        assert dispatcher.metrics.max_depth == 1
+        # The handlers are uninstalled when stopping.
+        assert not self.lib.handlers[self.instr.session]
+
+    def test_install_twice(self):
+        with HandlerDispatcher() as dispatcher:
+            dispatcher.install(self.instr, EventType.trig, self.handler)
+            with pytest.raises(ValueError):
+                dispatcher.install(self.instr, EventType.trig, self.handler)
+
+    def fill(self, dispatcher):
+        """Block the worker on a first event and fire four more."""
+        dispatcher.install(self.instr, EventType.trig, self.slow_handler)
+        self.fire(0)
+        assert self.started.wait(1)
+        for trigger_id in range(1, 5):
+            self.fire(trigger_id)
+
+    def test_drop_newest(self):
+        with HandlerDispatcher(2, overflow=OverflowPolicy.drop_newest) as dispatcher:
+            self.fill(dispatcher)
+            assert dispatcher.depth == 2
+            self.release.set()
+        assert self.received == [0, 1, 2]
+        assert dispatcher.metrics.dropped == 2
+
+    def test_drop_oldest(self):
+        with HandlerDispatcher(2, overflow=OverflowPolicy.drop_oldest) as dispatcher:
+            self.fill(dispatcher)
+            self.release.set()
+        assert self.received == [0, 3, 4]
+        assert dispatcher.metrics.dropped == 2
+
+    def test_block(self):
+        with HandlerDispatcher(2) as dispatcher:
+            thread = threading.Thread(target=self.fill, args=(dispatcher,))
+            thread.start()
+            time.sleep(0.05)
+            # The callback waits for room in the queue.
+            assert thread.is_alive()
+            assert dispatcher.depth == 2
+            self.release.set()
+            thread.join(1)
+        assert self.received == [0, 1, 2, 3, 4]
+        assert dispatcher.metrics.dropped == 0
+        assert dispatcher.metrics.max_latency > 0
+
+    def test_handler_error(self):
+        def failing(resource, record):
+            raise RuntimeError()
+
+        with HandlerDispatcher(workers=2) as dispatcher:
+            dispatcher.install(self.instr, EventType.trig, failing)
+            dispatcher.install(self.instr, EventType.trig, self.handler)
+            self.fire(0)
+        assert len(self.received) == 1
+        assert dispatcher.metrics.dispatched == 2
+        # The error is logged and does not stop the worker.
+        (log,) = self._test_handler.buffer
+        assert log["msg"].startswith("Error in the handler")
+        self._test_handler.buffer.clear()
@@ -34,6 +34,9 @@ class TestPicleUnpickle(BaseTestCase):
     def test_InvalidSession(self):
         self._test_pickle_unpickle(errors.InvalidSession())
 
+    def test_OperationCancelled(self):
+        self._test_pickle_unpickle(errors.OperationCancelled())
+
 
 class TestLibraryError(BaseTestCase):
     """Test the creation of Library errors."""
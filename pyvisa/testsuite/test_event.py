@@ -57,3 +57,9 @@ class TestEvent(BaseTestCase):
         event.close()
         with pytest.raises(errors.InvalidSession):
             event.context
+
+    def test_slots(self):
+        event = Event(None, constants.EventType.trig, 1)
+        assert type(event).__name__ == "TrigEvent"
+        with pytest.raises(AttributeError):
+            event.__dict__
@@ -0,0 +1,1138 @@
+# -*- coding: utf-8 -*-
+"""Test message based resources using an in-memory VISA library."""
+
+import struct
+import threading
+import time
+
+import pytest
+
+from pyvisa import errors, transfer
+from pyvisa.constants import (
+    AddressSpace,
+    DataWidth,
+    EventMechanism,
+    EventType,
+    InterfaceType,
+    ResourceAttribute,
+    StatusCode,
+    TriggerID,
+)
+from pyvisa.resources import ReconnectPolicy, ResourceProfile
+from pyvisa.resources.messagebased import TimeoutModel
+
+from .fake_library import FakeLibraryTestCase
+
+
+class MessageBasedTestCase(FakeLibraryTestCase):
+    """Base class opening a message based resource on a fake library."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.instr = self.rm.open_resource(
+            "TCPIP::192.168.0.1::INSTR", read_termination="\n"
+        )
+
+
+class TestResumableTransfer(MessageBasedTestCase):
+    """Test resuming transfers interrupted by an error."""
+
+    def test_resume_read_bytes(self):
+        """Test that the data read before a timeout are not read again."""
+        self.lib.queue_output(self.instr.session, b"0123456789")
+        self.lib.read_errors.extend(
+            [None, errors.VisaIOError(StatusCode.error_timeout)]
+        )
+        transfer = self.instr.resumable_read_bytes(10, chunk_size=4)
+        with pytest.raises(errors.VisaIOError):
+            transfer.read()
+        assert transfer.buffer == b"0123"
+        assert transfer.offset == 4
+        assert transfer.remaining == 6
+        assert not transfer.done
+        assert transfer.last_error.error_code == StatusCode.error_timeout
+
+        assert transfer.read(timeout=5000) == b"0123456789"
+        assert transfer.done
+        assert transfer.last_error is None
+        # The temporary timeout is only used for the resumed attempt.
+        assert self.instr.timeout == 2000
+
+    def test_read_bytes_forwards_errors(self):
+        """Test that read_bytes still forwards the errors."""
+        self.lib.queue_output(self.instr.session, b"0123")
+        with pytest.raises(errors.VisaIOError):
+            self.instr.read_bytes(10, chunk_size=4)
+
+    @pytest.mark.parametrize("header_fmt", ["ieee", "hp", "empty"])
+    def test_resume_read_binary_values(self, header_fmt):
+        """Test resuming a binary transfer during and after the header."""
+        values = list(range(64))
+        data = struct.pack("<64f", *values)
+        if header_fmt == "ieee":
+            block = b"#3256" + data
+        elif header_fmt == "hp":
+            block = b"#A" + struct.pack("<H", len(data)) + data
+        else:
+            block = data
+        self.lib.queue_output(self.instr.session, block + b"\n")
+        self.lib.read_errors.extend(
+            [None, errors.VisaIOError(StatusCode.error_timeout)]
+        )
+        transfer = self.instr.resumable_read_binary_values(
+            header_fmt=header_fmt, chunk_size=16, data_points=64
+        )
+        with pytest.raises(errors.VisaIOError):
+            transfer.read()
+        assert transfer.offset == 16
+
+        for _ in range(3):
+            self.lib.read_errors.extend(
+                [None, errors.VisaIOError(StatusCode.error_timeout)]
+            )
+            with pytest.raises(errors.VisaIOError):
+                transfer.read()
+        assert transfer.read() == values
+        assert transfer.buffer == block + b"\n"
+
+    def test_read_binary_values(self):
+        """Test that read_binary_values is unaffected."""
+        block = b"#18" + struct.pack("<2f", 1, 2) + b"\n"
+        self.lib.queue_output(self.instr.session, block)
+        assert self.instr.read_binary_values(chunk_size=4) == [1.0, 2.0]
+
+    def test_invalid_header_format(self):
+        with pytest.raises(ValueError):
+            self.instr.resumable_read_binary_values(header_fmt="invalid")
+
+
+class TestReadAsciiValues(MessageBasedTestCase):
+    """Test parsing ascii values from the undecoded message."""
+
+    def test_read_ascii_values(self):
+        self.lib.queue_output(self.instr.session, b"1.5,2.5,3\n")
+        assert self.instr.read_ascii_values() == [1.5, 2.5, 3.0]
+
+    def test_missing_termination(self):
+        self.lib.queue_output(self.instr.session, b"1,2")
+        with pytest.warns(UserWarning):
+            assert self.instr.read_ascii_values("d") == [1, 2]
+
+
+class TestWriteAsciiValues(MessageBasedTestCase):
+    """Test writing ascii values in one or several writes."""
+
+    def test_write_ascii_values(self):
+        count = self.instr.write_ascii_values("DATA ", list(range(5)), "d")
+        assert self.lib.written[self.instr.session] == [b"DATA 0,1,2,3,4\r\n"]
+        assert count == 16
+
+    def test_write_ascii_values_utf16(self):
+        self.instr.write_ascii_values(
+            "DATA ", [1, 2], "d", termination="", encoding="utf-16", chunk_size=1
+        )
+        written = self.lib.written[self.instr.session]
+        assert written == ["DATA ".encode("utf-16"), "1,2".encode("utf-16")]
+
+    def test_chunked_write(self):
+        send_end = []
+        write = self.lib.write
+
+        def record_send_end(session, data):
+            send_end.append(
+                self.lib.attributes[session][ResourceAttribute.send_end_enabled]
+            )
+            return write(session, data)
+
+        self.lib.write = record_send_end
+        count = self.instr.write_ascii_values(
+            "DATA ", list(range(5)), "d", chunk_size=2
+        )
+        written = self.lib.written[self.instr.session]
+        assert written == [b"DATA ", b"0,1", b",2,3", b",4", b"\r\n"]
+        assert count == 16
+        assert send_end == [False, False, False, False, True]
+        assert self.instr.send_end
+
+    def test_chunked_write_empty_parts(self):
+        count = self.instr.write_ascii_values("", [1, 2], "d", chunk_size=1)
+        # No empty write is issued for the empty message.
+        assert self.lib.written[self.instr.session] == [b"1", b",2", b"\r\n"]
+        assert count == 5
+
+
+class TestTimeoutModel(MessageBasedTestCase):
+    """Test computing the timeouts from the transfer size."""
+
+    def test_estimate(self):
+        model = TimeoutModel(latency=10, bandwidth=100, safety_factor=2, min_timeout=0)
+        assert model.estimate(1000) == 2 * (10 + 10)
+        model.min_timeout = 100
+        assert model.estimate(0) == 100
+        model.max_timeout = 150
+        assert model.estimate(10**6) == 150
+
+    def test_update(self):
+        model = TimeoutModel(latency=10, bandwidth=100, smoothing=0.5)
+        model.update(10, 20)
+        assert model.latency == 15
+        model.update(10000, 15 + 50)
+        assert model.bandwidth == 150
+
+    def test_invalid_parameters(self):
+        with pytest.raises(ValueError):
+            TimeoutModel(bandwidth=0)
+        with pytest.raises(ValueError):
+            TimeoutModel(smoothing=0)
+
+    def record_timeouts(self):
+        """Record the timeouts set on the resource."""
+        timeouts = []
+        set_attribute = self.lib.set_attribute
+
+        def record_set_attribute(session, attribute, state):
+            if attribute == ResourceAttribute.timeout_value:
+                timeouts.append(state)
+            return set_attribute(session, attribute, state)
+
+        self.lib.set_attribute = record_set_attribute
+        return timeouts
+
+    def test_timeout_per_operation(self):
+        """Test the timeout is set per chunk and restored afterwards."""
+        timeouts = self.record_timeouts()
+        self.instr.timeout_model = model = TimeoutModel(
+            latency=10, bandwidth=100, safety_factor=2, min_timeout=1
+        )
+        self.lib.queue_output(self.instr.session, bytes(4000))
+        assert self.instr.read_bytes(4000, chunk_size=1000) == bytes(4000)
+        # The timeout is set once for all chunks and restored at the end.
+        assert timeouts == [40, 2000]
+        assert model.bandwidth != 100
+
+    def test_stall_timeout(self):
+        """Test that chunks are small enough to arrive within the stall window."""
+        self.instr.timeout_model = TimeoutModel(
+            latency=0, bandwidth=1, safety_factor=1, stall_timeout=1000
+        )
+        self.lib.queue_output(self.instr.session, bytes(3000))
+        assert self.instr.read_bytes(3000, chunk_size=20000) == bytes(3000)
+        assert self.lib.calls["read"] == 3
+
+    def test_stall_timeout_write(self):
+        """Test that large writes are split to fit in the stall window."""
+        send_end = []
+        write = self.lib.write
+
+        def record_send_end(session, data):
+            send_end.append(
+                self.lib.attributes[session][ResourceAttribute.send_end_enabled]
+            )
+            return write(session, data)
+
+        self.lib.write = record_send_end
+        timeouts = self.record_timeouts()
+        self.instr.timeout_model = TimeoutModel(
+            latency=0, bandwidth=1, safety_factor=1, min_timeout=0, stall_timeout=1000
+        )
+        assert self.instr.write_raw(bytes(2500)) == 2500
+        assert self.lib.written[self.instr.session] == [
+            bytes(1000),
+            bytes(1000),
+            bytes(500),
+        ]
+        assert send_end == [False, False, True]
+        assert self.instr.send_end
+        assert timeouts == [1000, 500, 2000]
+
+    def test_stall_timeout_below_min_timeout(self):
+        """Test that the stall window bounds the timeout of each chunk."""
+        timeouts = self.record_timeouts()
+        self.instr.timeout_model = TimeoutModel(min_timeout=200, stall_timeout=100)
+        self.lib.queue_output(self.instr.session, bytes(10))
+        assert self.instr.read_bytes(10) == bytes(10)
+        assert timeouts == [100, 2000]
+
+    def test_deadline(self, monkeypatch):
+        """Test that the operation fails once the expected duration has elapsed."""
+        self.instr.timeout_model = TimeoutModel(latency=0, min_timeout=1)
+        self.lib.queue_output(self.instr.session, bytes(100))
+        clock = iter(range(0, 100, 10))
+        monkeypatch.setattr(time, "perf_counter", lambda: next(clock))
+        with pytest.raises(errors.VisaIOError) as e:
+            self.instr.read_bytes(100, chunk_size=10)
+        assert e.value.error_code == StatusCode.error_timeout
+        assert self.instr.timeout == 2000
+
+
+class TestTransfer(MessageBasedTestCase):
+    """Test streaming a binary block between two resources."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.dst = self.rm.open_resource(
+            "TCPIP::192.168.0.2::INSTR", write_termination="\n"
+        )
+        # Avoid the termination character to get chunks of predictable size
+        self.data = (bytes(range(16, 256)) * 43)[:10240]
+        self.send_end = []
+        set_attribute = self.lib.set_attribute
+        write = self.lib.write
+
+        def record_set_attribute(session, attribute, state):
+            if attribute == ResourceAttribute.send_end_enabled:
+                self.send_end.append(state)
+            return set_attribute(session, attribute, state)
+
+        def record_write(session, data):
+            if session == self.dst.session:
+                self.send_end.append(bytes(data))
+            return write(session, data)
+
+        self.lib.set_attribute = record_set_attribute
+        self.lib.write = record_write
+
+    def respond(self, block):
+        def responder(session, data):
+            if session == self.instr.session and data == b"CURV?\r\n":
+                return block
+            return None
+
+        self.lib.responder = responder
+
+    def test_transfer(self):
+        self.respond(b"#510240" + self.data + b"\n")
+        assert (
+            transfer(self.instr, self.dst, "CURV?", "DATA ", chunk_size=1000) == 10240
+        )
+        assert b"".join(self.lib.written[self.dst.session]) == (
+            b"DATA #510240" + self.data + b"\n"
+        )
+        # END is only asserted with the termination
+        assert self.send_end[0] == 0
+        assert self.send_end[-3:] == [1, b"\n", 1]
+        assert len(self.lib.written[self.dst.session]) == 12
+        assert not self.lib.output[self.instr.session]
+
+    def test_transfer_bytes_only_library(self):
+        types = set()
+        write = self.lib.write
+
+        def record_type(session, data):
+            types.add(type(data))
+            return write(session, data)
+
+        self.lib.write = record_type
+        self.lib.write_accepts_buffers = False
+        self.respond(b"#510240" + self.data + b"\n")
+        transfer(self.instr, self.dst, "CURV?", chunk_size=1000)
+        assert b"".join(self.lib.written[self.dst.session]).endswith(self.data + b"\n")
+        # The views of the reused buffers are not passed to the library.
+        assert types == {bytes}
+
+    def test_transfer_header_conversion(self):
+        self.respond(b"#3256" + self.data[:256] + b"\n")
+        self.dst.write_termination = ""
+        assert (
+            transfer(
+                self.instr, self.dst, "CURV?", header_fmt="ieee", dst_header_fmt="hp"
+            )
+            == 256
+        )
+        assert self.lib.written[self.dst.session] == [b"#A\x00\x01" + self.data[:256]]
+        assert self.send_end == [0, 1, b"#A\x00\x01" + self.data[:256], 1]
+
+    def test_transfer_error(self):
+        self.respond(b"#510240" + self.data[:5000])
+        with pytest.raises(errors.VisaIOError):
+            transfer(self.instr, self.dst, "CURV?", chunk_size=1000)
+        assert self.send_end[-1] == 1
+        assert self.dst.send_end
+
+    def test_transfer_unknown_length(self):
+        with pytest.raises(ValueError):
+            transfer(self.instr, self.dst, "CURV?", header_fmt="empty")
+        self.respond(b"#0" + self.data[:256] + b"\n")
+        with pytest.raises(errors.InvalidBinaryFormat):
+            transfer(self.instr, self.dst, "CURV?")
+
+
+class TestFastPath(MessageBasedTestCase):
+    """Test the low overhead access to a resource."""
+
+    def test_query(self):
+        self.lib.responder = lambda session, data: (
+            b"1.0\n" if data == b"MEAS?\r\n" else None
+        )
+        with self.instr.fast_path() as fast:
+            assert fast.query("MEAS?") == "1.0"
+            assert fast.write_raw(b"MEAS?\r\n") == 7
+            assert fast.read_raw() == b"1.0\n"
+        assert not self.lib._ignore_warning_in_session[self.instr.session]
+
+    def test_read_chunks(self):
+        self.instr.chunk_size = 4
+        self.lib.queue_output(self.instr.session, b"0123456789\n")
+        with self.instr.fast_path() as fast:
+            assert fast.read() == "0123456789"
+
+    def test_missing_termination(self):
+        self.lib.queue_output(self.instr.session, b"0123")
+        with self.instr.fast_path() as fast:
+            with pytest.warns(UserWarning):
+                assert fast.read() == "0123"
+
+
+class TestAttributeCache(MessageBasedTestCase):
+    """Test caching the values of the attributes local to a session."""
+
+    def test_disabled(self):
+        assert not self.instr.cache_attributes
+        self.instr.timeout
+        self.instr.timeout
+        assert self.lib.calls["get_attribute"] == 2
+
+    def test_cached(self):
+        self.instr.cache_attributes = True
+        calls = self.lib.calls
+        assert self.instr.timeout == self.instr.timeout
+        assert calls["get_attribute"] == 1
+
+        set_calls = calls["set_attribute"]
+        self.instr.timeout = 1000
+        self.instr.timeout = 1000
+        assert calls["set_attribute"] == set_calls + 1
+        assert self.instr.timeout == 1000
+        assert calls["get_attribute"] == 1
+
+        self.instr.read_termination = "\r"
+        set_calls = calls["set_attribute"]
+        self.instr.read_termination = "\r"
+        assert calls["set_attribute"] == set_calls
+
+        # Attributes which are not local to the session are not cached
+        attrs = self.lib.attributes[self.instr.session]
+        attrs[ResourceAttribute.interface_type] = InterfaceType.tcpip
+        self.instr.interface_type
+        self.instr.interface_type
+        assert calls["get_attribute"] == 3
+
+        self.instr.cache_attributes = False
+        self.instr.timeout
+        assert calls["get_attribute"] == 4
+
+    def test_failed_set(self):
+        self.instr.cache_attributes = True
+        self.instr.timeout = 1000
+
+        def fail(session, attribute, attribute_state):
+            raise errors.VisaIOError(StatusCode.error_nonsupported_attribute_state)
+
+        self.lib.set_attribute = fail
+        with pytest.raises(errors.VisaIOError):
+            self.instr.timeout = 2000
+        assert self.instr.timeout == 1000
+        assert self.lib.calls["get_attribute"] == 1
+
+    def test_reopen(self):
+        self.instr.cache_attributes = True
+        self.instr.timeout = 1000
+        self.instr.close()
+        self.instr.open()
+        assert self.instr.cache_attributes
+        assert self.instr.timeout == 2000
+        assert self.lib.calls["get_attribute"] == 1
+
+
+class TestProfiles(MessageBasedTestCase):
+    """Test snapshotting attributes and applying profiles."""
+
+    def test_snapshot(self):
+        # Read only attributes (resource_class, lock_state) are omitted.
+        assert self.instr.snapshot_attributes() == {
+            "send_end": True,
+            "timeout": 2000,
+        }
+
+    def test_snapshot_invalid_value(self):
+        self.lib.attributes[self.instr.session][ResourceAttribute.io_prot] = 12345
+        assert "io_protocol" not in self.instr.snapshot_attributes()
+
+    def test_apply_profile(self):
+        calls = self.lib.calls
+        set_calls = calls["set_attribute"]
+        profile = ResourceProfile("fast", {"timeout": 2000, "send_end": False})
+        assert self.instr.apply_profile(profile) == ["send_end"]
+        assert calls["set_attribute"] == set_calls + 1
+        assert not self.instr.send_end
+        assert self.instr.apply_profile(profile) == []
+        assert calls["set_attribute"] == set_calls + 1
+
+        snapshot = self.instr.snapshot_attributes()
+        self.instr.timeout = 5000
+        self.instr.read_termination = "\r"
+        assert self.instr.apply_profile(snapshot) == ["timeout"]
+        assert self.instr.timeout == 2000
+        assert self.instr.apply_profile({"read_termination": "\n"}) == [
+            "read_termination"
+        ]
+
+    def test_invalid_profile(self):
+        with pytest.raises(ValueError):
+            self.instr.apply_profile({"timeout": 100, "invalid": 1})
+        assert self.instr.timeout == 2000
+
+    def test_open_with_profile(self):
+        profile = ResourceProfile("slow", {"timeout": 10000, "chunk_size": 256})
+        instr = self.rm.open_resource("TCPIP::192.168.0.2::INSTR", profile=profile)
+        assert instr.timeout == 10000
+        assert instr.chunk_size == 256
+
+        opened = self.lib.calls["open"]
+        with pytest.raises(ValueError):
+            self.rm.open_resource("TCPIP::192.168.0.2::INSTR", profile={"invalid": 1})
+        assert self.lib.calls["open"] == opened
+
+
+class TestLockLease(MessageBasedTestCase):
+    """Test reusing VISA locks across nested contexts."""
+
+    def test_nested(self):
+        calls = self.lib.calls
+        with self.instr.lock_lease() as key:
+            assert key is None
+            with self.instr.lock_lease():
+                with self.instr.lock_lease():
+                    pass
+            assert calls["unlock"] == 0
+        assert calls["lock"] == 1
+        assert calls["unlock"] == 1
+        assert self.instr.lock_metrics.count == 1
+
+    def test_shared(self):
+        with self.instr.lock_lease(requested_key=None) as key:
+            assert key
+            with self.instr.lock_lease(requested_key=None) as other:
+                assert other == key
+            with self.instr.lock_lease(requested_key=key) as other:
+                assert other == key
+            with pytest.raises(ValueError):
+                with self.instr.lock_lease():
+                    pass
+        assert self.lib.calls["lock"] == 1
+
+    def test_hold_time(self):
+        calls = self.lib.calls
+        for _ in range(3):
+            with self.instr.lock_lease(hold_time=60000):
+                pass
+        assert calls["lock"] == 1
+        assert calls["unlock"] == 0
+
+        # An idle lease of another kind is released before locking again
+        with self.instr.lock_lease(requested_key="other", hold_time=60000):
+            assert calls["unlock"] == 1
+        assert calls["lock"] == 2
+
+        self.instr.release_lock_lease()
+        assert calls["unlock"] == 2
+        self.instr.release_lock_lease()
+        assert calls["unlock"] == 2
+
+    def test_expiration(self):
+        with self.instr.lock_lease(hold_time=1):
+            pass
+        deadline = time.monotonic() + 5
+        while self.lib.calls["unlock"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert self.lib.calls["unlock"] == 1
+        with self.instr.lock_lease():
+            pass
+        assert self.lib.calls["lock"] == 2
+
+    def test_wait_without_lease_lock(self):
+        locking = threading.Event()
+        release = threading.Event()
+        lock = self.lib.lock
+
+        def blocking_lock(session, lock_type, timeout, requested_key=None):
+            locking.set()
+            release.wait(1)
+            return lock(session, lock_type, timeout, requested_key)
+
+        self.lib.lock = blocking_lock
+        thread = threading.Thread(target=self.enter_lease)
+        thread.start()
+        assert locking.wait(1)
+        # The lease can be inspected while the other thread waits for the lock.
+        self.instr.release_lock_lease()
+        self.lib.lock = lock
+        with self.instr.lock_lease():
+            release.set()
+            thread.join(1)
+        # The lock acquired second is released and the lease reused.
+        assert self.lib.calls["lock"] == 2
+        assert self.lib.calls["unlock"] == 2
+
+    def enter_lease(self):
+        with self.instr.lock_lease():
+            pass
+
+    def test_close(self):
+        with self.instr.lock_lease(hold_time=60000):
+            pass
+        self.instr.close()
+        assert self.lib.calls["unlock"] == 0
+
+
+class TestReconnect(MessageBasedTestCase):
+    """Test reopening the session after a connection loss."""
+
+    def lose_connection(self):
+        self.lib.write_errors.append(
+            errors.VisaIOError(StatusCode.error_connection_lost)
+        )
+
+    def test_policy_delays(self):
+        policy = ReconnectPolicy(
+            max_attempts=5, initial_delay=0.1, backoff=2.0, max_delay=0.3
+        )
+        assert list(policy.delays()) == pytest.approx([0.0, 0.1, 0.2, 0.3, 0.3])
+        with pytest.raises(ValueError):
+            ReconnectPolicy(max_attempts=0)
+
+    def test_no_policy(self):
+        session = self.instr.session
+        self.lose_connection()
+        with pytest.raises(errors.VisaIOError):
+            self.instr.write("*RST")
+        assert self.instr.session == session
+        assert self.instr.reconnect_count == 0
+
+    def test_replay_configuration(self):
+        self.instr.reconnect_policy = ReconnectPolicy(initial_delay=0)
+        self.instr.timeout = 5000
+        self.instr.enable_event(EventType.service_request, EventMechanism.queue)
+
+        def handler(session, event_type, context, user_handle):
+            pass
+
+        handle = self.instr.install_handler(EventType.service_request, handler)
+        old_session = self.instr.session
+
+        self.lose_connection()
+        with pytest.raises(errors.VisaIOError):
+            self.instr.write("*RST")
+        session = self.instr.session
+        assert session != old_session
+        assert old_session not in self.lib.sessions
+        assert self.instr.reconnect_count == 1
+        attrs = self.lib.attributes[session]
+        assert attrs[ResourceAttribute.timeout_value] == 5000
+        assert attrs[ResourceAttribute.termchar_enabled]
+        assert self.lib.calls["enable_event"] == 2
+        assert self.lib.calls["install_handler"] == 2
+        assert len(self.lib.handlers[session]) == 1
+        assert old_session not in self.lib.handlers
+
+        # The handle returned before reconnecting can still be used.
+        self.instr.uninstall_handler(EventType.service_request, handler, handle)
+        assert not self.lib.handlers[session]
+
+        self.instr.disable_event(EventType.service_request, EventMechanism.queue)
+        self.instr.reconnect()
+        assert self.lib.calls["enable_event"] == 2
+        assert self.lib.calls["install_handler"] == 2
+
+    def test_retry_idempotent(self):
+        self.lib.responder = lambda session, data: b"ANSWER\n"
+        self.instr.reconnect_policy = ReconnectPolicy(initial_delay=0)
+        self.lose_connection()
+        with pytest.raises(errors.VisaIOError):
+            self.instr.query("*IDN?")
+        assert self.instr.reconnect_count == 1
+
+        self.instr.reconnect_policy.retry_idempotent = True
+        self.lose_connection()
+        assert self.instr.query("*IDN?") == "ANSWER"
+        assert self.instr.reconnect_count == 2
+        assert self.lib.written[self.instr.session] == [b"*IDN?\r\n"]
+
+        # Writes are never retried.
+        self.lose_connection()
+        with pytest.raises(errors.VisaIOError):
+            self.instr.write("*RST")
+        assert self.instr.reconnect_count == 3
+
+    def test_other_errors(self):
+        self.instr.reconnect_policy = ReconnectPolicy(initial_delay=0)
+        self.lib.write_errors.append(errors.VisaIOError(StatusCode.error_timeout))
+        with pytest.raises(errors.VisaIOError):
+            self.instr.write("*RST")
+        assert self.instr.reconnect_count == 0
+
+    def test_transaction(self):
+        self.instr.reconnect_policy = ReconnectPolicy(
+            initial_delay=0, retry_idempotent=True
+        )
+        self.lose_connection()
+        with pytest.raises(errors.VisaIOError):
+            with self.instr.transaction():
+                self.instr.write("CONF")
+                self.instr.query("READ?")
+        # The connection is restored once but the sequence is not retried.
+        assert self.instr.reconnect_count == 1
+        assert not self.lib.written[self.instr.session]
+
+    def test_failed_attempts(self):
+        self.instr.reconnect_policy = ReconnectPolicy(
+            max_attempts=3, initial_delay=0.01
+        )
+        open_ = self.lib.open
+        failures = [errors.VisaIOError(StatusCode.error_resource_not_found)] * 2
+
+        def open(*args):
+            if failures:
+                raise failures.pop()
+            return open_(*args)
+
+        self.lib.open = open
+        self.lose_connection()
+        with pytest.raises(errors.VisaIOError):
+            self.instr.write("*RST")
+        assert self.instr.reconnect_count == 1
+
+        failures.extend([errors.VisaIOError(StatusCode.error_resource_not_found)] * 3)
+        with pytest.raises(errors.VisaIOError) as exc_info:
+            self.instr.reconnect()
+        assert exc_info.value.error_code == StatusCode.error_resource_not_found
+        assert self.instr.reconnect_count == 1
+
+
+class TestCancel(MessageBasedTestCase):
+    """Test cancelling operations from another thread."""
+
+    def run_in_thread(self, func):
+        """Run a function in a thread, returning the thread and the outcome."""
+        outcome = {}
+
+        def target():
+            try:
+                outcome["result"] = func()
+            except Exception as exc:
+                outcome["error"] = exc
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        time.sleep(0.05)
+        return thread, outcome
+
+    def test_cancel_idle(self):
+        assert not self.instr.cancel()
+        assert self.lib.calls["terminate"] == 0
+
+    def test_cancel_read(self):
+        self.lib.blocking_reads = True
+        start = time.perf_counter()
+        thread, outcome = self.run_in_thread(self.instr.read)
+        assert self.instr.cancel()
+        thread.join()
+        assert time.perf_counter() - start < 1
+        assert isinstance(outcome["error"], errors.OperationCancelled)
+        assert outcome["error"].error_code == StatusCode.error_abort
+        assert self.lib.calls["terminate"] == 1
+
+        # The following operations are not affected.
+        self.lib.queue_output(self.instr.session, b"1\n")
+        assert self.instr.read() == "1"
+
+    def test_abort_without_cancel(self):
+        self.lib.read_errors.append(errors.VisaIOError(StatusCode.error_abort))
+        with pytest.raises(errors.VisaIOError) as e:
+            self.instr.read()
+        # Aborts not requested using cancel are not reported as cancellations.
+        assert not isinstance(e.value, errors.OperationCancelled)
+        assert e.value.error_code == StatusCode.error_abort
+
+    def test_cancel_between_chunks(self):
+        self.lib.queue_output(self.instr.session, b"0123456789" * 10)
+        instr = self.instr
+
+        class Monitor:
+            def update(self, count):
+                instr.cancel()
+
+        with pytest.raises(errors.OperationCancelled):
+            instr.read_bytes(100, chunk_size=10, monitoring_interface=Monitor())
+        assert self.lib.calls["read"] == 1
+
+    def test_cancel_transaction(self):
+        self.lib.blocking_reads = True
+
+        def sequence():
+            with self.instr.transaction():
+                try:
+                    self.instr.query("MEAS?")
+                except errors.OperationCancelled:
+                    pass
+                # The remaining operations of the transaction are cancelled too.
+                self.instr.write("NEXT")
+
+        thread, outcome = self.run_in_thread(sequence)
+        self.instr.cancel()
+        thread.join()
+        assert isinstance(outcome["error"], errors.OperationCancelled)
+        assert self.lib.written[self.instr.session] == [b"MEAS?\r\n"]
+        assert not self.instr.cancelled
+
+    def test_cancel_wait_complete(self):
+        self.lib.responder = lambda session, data: b"0\n"
+        start = time.perf_counter()
+        thread, outcome = self.run_in_thread(
+            lambda: self.instr.wait_complete("esr_poll", poll_interval=2000)
+        )
+        self.instr.cancel()
+        thread.join()
+        assert time.perf_counter() - start < 1
+        assert isinstance(outcome["error"], errors.OperationCancelled)
+
+
+class TestDrainEvents(MessageBasedTestCase):
+    """Test retrieving all the queued events at once."""
+
+    def test_drain_events(self):
+        events = self.lib.events[self.instr.session]
+        events.extend(
+            [
+                (EventType.trig, {ResourceAttribute.trigger_id: -1}),
+                (EventType.trig, {ResourceAttribute.trigger_id: 0}),
+                EventType.service_request,
+            ]
+        )
+        closed = self.lib.calls["close"]
+        records = self.instr.drain_events(EventType.all_enabled)
+        assert [r.event_type for r in records] == [
+            EventType.trig,
+            EventType.trig,
+            EventType.service_request,
+        ]
+        assert records[0].received_trigger_id == TriggerID.serial_word
+        assert records[1].values == {"received_trigger_id": TriggerID.ttl0}
+        assert records[2].values == {}
+        with pytest.raises(AttributeError):
+            records[2].received_trigger_id
+        # Each context is closed and the queue checked once more.
+        assert self.lib.calls["close"] == closed + 3
+        assert self.lib.calls["wait_on_event"] == 4
+        assert self.instr.drain_events(EventType.all_enabled) == []
+
+    def test_max_events(self):
+        events = self.lib.events[self.instr.session]
+        events.extend([EventType.service_request] * 5)
+        assert len(self.instr.drain_events(EventType.service_request, 2)) == 2
+        assert len(events) == 3
+
+    def test_names(self):
+        self.lib.events[self.instr.session].append(
+            (EventType.trig, {ResourceAttribute.trigger_id: -1})
+        )
+        calls = self.lib.calls["get_attribute"]
+        (record,) = self.instr.drain_events(EventType.trig, names=())
+        assert record.values == {}
+        assert self.lib.calls["get_attribute"] == calls
+
+
+class TestWaitOnEvent(MessageBasedTestCase):
+    """Test waiting for a single event."""
+
+    def test_close(self):
+        self.lib.events[self.instr.session].append(
+            (EventType.trig, {ResourceAttribute.trigger_id: 0})
+        )
+        closed = self.lib.calls["close"]
+        with self.instr.wait_on_event(EventType.trig, 0) as response:
+            assert response.event.received_trigger_id == TriggerID.ttl0
+        assert self.lib.calls["close"] == closed + 1
+        with pytest.raises(errors.InvalidSession):
+            response.event.context
+        # Closing again or deleting the response does not close the context twice.
+        response.close()
+        del response
+        assert self.lib.calls["close"] == closed + 1
+
+    def test_timeout(self):
+        closed = self.lib.calls["close"]
+        response = self.instr.wait_on_event(EventType.trig, 0, capture_timeout=True)
+        assert response.timed_out
+        response.close()
+        assert self.lib.calls["close"] == closed
+
+
+class TestAsyncOperations(MessageBasedTestCase):
+    """Test the operations completed through IO completion events."""
+
+    def test_read_async(self):
+        self.lib.queue_output(self.instr.session, b"1.0\n")
+        future = self.instr.read_async(10)
+        assert not future.done()
+        (job_id,) = self.lib.jobs
+        self.lib.complete_job(job_id)
+        assert future.result(0) == b"1.0\n"
+        # The buffer is released once the data were retrieved.
+        assert job_id not in self.lib.buffers
+
+    def test_write_async(self):
+        futures = [self.instr.write_async(b"*RST\n"), self.instr.write_async(b"*CLS")]
+        for job_id in list(self.lib.jobs):
+            self.lib.complete_job(job_id)
+        assert [f.result(0) for f in futures] == [5, 4]
+        assert self.lib.written[self.instr.session] == [b"*RST\n", b"*CLS"]
+        assert self.lib.calls["install_handler"] == 1
+        assert self.lib.calls["enable_event"] == 1
+
+    def test_write_async_keeps_data(self):
+        message = bytearray(b"*RST")
+        future = self.instr.write_async(message)
+        (job_id,) = self.lib.jobs
+        data = self.instr._async_jobs.jobs[job_id][2]
+        # The object passed to the library, which may still be using it, stays
+        # referenced until the job completes.
+        assert data == b"*RST"
+        assert data is self.lib.written[self.instr.session][-1]
+        self.lib.complete_job(job_id)
+        assert future.result(0) == 4
+        assert job_id not in self.instr._async_jobs.jobs
+
+    def test_completed_before_start_returns(self):
+        self.lib.complete_immediately = True
+        self.lib.queue_output(self.instr.session, b"abc")
+        assert self.instr.read_async(3).result(0) == b"abc"
+        assert not self.instr._async_jobs.completed
+
+    def test_error(self):
+        future = self.instr.read_async()
+        (job_id,) = self.lib.jobs
+        self.lib.complete_job(job_id, StatusCode.error_timeout)
+        with pytest.raises(errors.VisaIOError) as exc:
+            future.result(0)
+        assert exc.value.error_code == StatusCode.error_timeout
+        assert job_id not in self.lib.buffers
+
+    def test_cancel(self):
+        future = self.instr.write_async(b"*TRG")
+        assert future.cancel()
+        assert self.lib.calls["terminate"] == 1
+        (job_id,) = self.lib.jobs
+        self.lib.complete_job(job_id, StatusCode.error_abort)
+        assert future.cancelled()
+
+    def test_close(self):
+        future = self.instr.read_async(4)
+        self.instr.close()
+        assert future.cancelled()
+        assert not self.lib.buffers
+
+    def test_move_async(self):
+        vxi = self.rm.open_resource("VXI0::1::INSTR")
+        transactions = vxi.transaction_metrics.count
+        future = vxi.move_async(
+            AddressSpace.a16,
+            0,
+            DataWidth.bit_8,
+            AddressSpace.a24,
+            0,
+            DataWidth.bit_8,
+            16,
+        )
+        # Starting the operation is serialized like the other operations.
+        assert vxi.transaction_metrics.count == transactions + 1
+        (job_id,) = self.lib.jobs
+        self.lib.complete_job(job_id)
+        assert future.result(0) == 16
+
+
+class TestTransaction(MessageBasedTestCase):
+    """Test sharing a resource between threads."""
+
+    def test_transaction(self):
+        thread = threading.Thread(target=self.instr.write, args=("OTHER",))
+        with self.instr.transaction() as instr:
+            assert instr is self.instr
+            instr.write("FIRST")
+            thread.start()
+            time.sleep(0.05)
+            instr.write("SECOND")
+            assert thread.is_alive()
+        thread.join()
+        assert self.lib.written[self.instr.session] == [
+            b"FIRST\r\n",
+            b"SECOND\r\n",
+            b"OTHER\r\n",
+        ]
+        metrics = self.instr.transaction_metrics
+        assert metrics.count == 2
+        assert metrics.max_wait_time >= 0.04
+
+    def test_concurrent_queries(self):
+        self.lib.responder = lambda session, data: data.strip() + b"\n"
+        results = {}
+
+        def worker(index):
+            results[index] = [self.instr.query("Q%d" % index) for _ in range(50)]
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == {i: ["Q%d" % i] * 50 for i in range(4)}
+
+    def test_fast_path(self):
+        with self.instr.fast_path() as fast:
+            # Other threads can use the resource between two operations.
+            thread = threading.Thread(target=self.instr.write, args=("OTHER",))
+            thread.start()
+            thread.join(1)
+            assert self.lib.written[self.instr.session] == [b"OTHER\r\n"]
+            fast.write("FAST")
+            # But not while the resource is held by a transaction.
+            with self.instr.transaction():
+                thread = threading.Thread(target=self.instr.write, args=("LAST",))
+                thread.start()
+                time.sleep(0.05)
+                fast.write("HELD")
+            thread.join()
+        assert self.lib.written[self.instr.session] == [
+            b"OTHER\r\n",
+            b"FAST\r\n",
+            b"HELD\r\n",
+            b"LAST\r\n",
+        ]
+
+    def test_read_termination_context(self):
+        with pytest.raises(RuntimeError):
+            with self.instr.read_termination_context("\r"):
+                raise RuntimeError()
+        assert self.instr.read_termination == "\n"
+
+    def test_ignore_warning(self):
+        ignored = self.lib._ignore_warning_in_session[self.instr.session]
+        warning = StatusCode.success_max_count_read
+        with self.instr.ignore_warning(warning):
+            with self.instr.ignore_warning(warning):
+                pass
+            assert warning in ignored
+        assert warning not in ignored
+        with pytest.raises(RuntimeError):
+            with self.instr.ignore_warning(warning):
+                raise RuntimeError()
+        assert warning not in ignored
+        with self.instr.ignore_warning(warning, warning):
+            assert ignored[warning] == 2
+        assert warning not in ignored
+
+
+class TestWaitComplete(MessageBasedTestCase):
+    """Test waiting for the completion of pending operations."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.esr = [0]
+
+        def responder(session, data):
+            if data == b"*OPC?\r\n":
+                return b"1\n"
+            elif data == b"*ESR?\r\n":
+                return b"%d\n" % self.esr.pop(0) if self.esr else b"1\n"
+            return None
+
+        self.lib.responder = responder
+
+    def written(self):
+        return self.lib.written[self.instr.session]
+
+    def test_opc_query(self):
+        elapsed = self.instr.wait_complete("opc_query", timeout=10000)
+        assert elapsed >= 0
+        assert self.written() == [b"*OPC?\r\n"]
+        assert self.instr.timeout == 2000
+
+    def test_esr_poll(self):
+        self.esr.extend([0, 0, 32])
+        self.instr.wait_complete("esr_poll", poll_interval=0.1)
+        assert self.written().count(b"*ESR?\r\n") == 5
+        assert b"*OPC\r\n" in self.written()
+
+    def test_stb_poll(self):
+        stbs = iter([0, 0, 0x20])
+
+        def read_stb(session):
+            self.lib.stb[session] = next(stbs)
+            return self.lib.stb[session], StatusCode.success
+
+        self.lib.read_stb = read_stb
+        self.instr.wait_complete("stb_poll", poll_interval=0.1)
+        assert self.written() == [b"*ESR?\r\n", b"*ESE 1;*OPC\r\n", b"*ESR?\r\n"]
+
+    def test_poll_timeout(self):
+        self.lib.responder = lambda session, data: b"0\n"
+        with pytest.raises(errors.VisaIOError) as e:
+            self.instr.wait_complete("esr_poll", timeout=10, poll_interval=1)
+        assert e.value.error_code == StatusCode.error_timeout
+
+    def test_srq(self):
+        self.lib.events[self.instr.session].append(EventType.service_request)
+        self.instr.wait_complete("srq")
+        assert self.written() == [
+            b"*ESR?\r\n",
+            b"*ESE 1;*SRE 32;*OPC\r\n",
+            b"*ESR?\r\n",
+        ]
+        assert self.lib.calls["read_stb"] == 1
+        with pytest.raises(errors.VisaIOError):
+            self.instr.wait_complete("srq", timeout=10)
+
+    def test_auto(self):
+        self.lib.events[self.instr.session].append(EventType.service_request)
+        self.instr.wait_complete()
+        assert self.instr._wait_complete_strategy == "srq"
+
+    def test_auto_no_service_request(self):
+        # The device never requests service but the operations complete.
+        self.instr.wait_complete(timeout=10)
+        assert self.instr._wait_complete_strategy == "esr_poll"
+        assert self.written()[-1] == b"*ESR?\r\n"
+
+    def test_auto_late_service_request(self):
+        # The request is issued after the probe, when the operations complete.
+        def responder(session, data):
+            if data == b"*ESR?\r\n":
+                if not self.esr:
+                    self.lib.events[session].append(EventType.service_request)
+                return b"%d\n" % self.esr.pop(0) if self.esr else b"1\n"
+            return None
+
+        self.esr.append(0)
+        self.lib.responder = responder
+        self.instr.wait_complete_probe_time = 0
+        self.instr.wait_complete(poll_interval=0.1)
+        assert self.instr._wait_complete_strategy == "srq"
+
+    def test_auto_timeout(self):
+        self.lib.responder = lambda session, data: b"0\n"
+        with pytest.raises(errors.VisaIOError):
+            self.instr.wait_complete(timeout=10)
+        # No strategy is remembered until one has been seen working.
+        assert self.instr._wait_complete_strategy is None
+
+    def test_auto_fallback(self):
+        self.lib.unsupported_events.add(EventType.service_request)
+        self.instr.wait_complete()
+        assert self.instr._wait_complete_strategy == "opc_query"
+        self.instr.wait_complete()
+        assert self.lib.calls["enable_event"] == 1
+        assert self.written() == [b"*OPC?\r\n"] * 2
+
+    def test_invalid_strategy(self):
+        with pytest.raises(ValueError):
+            self.instr.wait_complete("invalid")
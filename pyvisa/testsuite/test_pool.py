@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Test reusing sessions through the session pool of the resource manager."""
+
+from pyvisa.constants import AccessModes, ResourceAttribute
+from pyvisa.pool import SessionPool
+
+from .fake_library import FakeLibraryTestCase
+
+NAME = "TCPIP::192.168.0.1::INSTR"
+
+
+class TestSessionPool(FakeLibraryTestCase):
+    """Test the session pool."""
+
+    def test_reuse_session(self):
+        instr = self.rm.open_resource(NAME, pooled=True)
+        session = instr.session
+        instr.timeout = 5000
+        instr.close()
+        # The session is kept open with its attributes restored.
+        assert session in self.lib.sessions
+        assert self.lib.attributes[session][ResourceAttribute.timeout_value] == 2000
+
+        instr = self.rm.open_resource(NAME, pooled=True)
+        assert instr.session == session
+        assert self.lib.calls["open"] == 1
+        pool = self.rm.session_pool
+        assert isinstance(pool, SessionPool)
+        assert (pool.hits, pool.misses) == (1, 1)
+        assert pool.resource_classes[NAME] is type(instr)
+        instr.close()
+        assert len(pool) == 1
+
+        self.rm.close()
+        assert not self.lib.sessions
+        assert len(pool) == 0
+
+    def test_not_pooled(self):
+        instr = self.rm.open_resource(NAME)
+        session = instr.session
+        instr.close()
+        assert session not in self.lib.sessions
+        assert self.rm.session_pool is None
+
+    def test_key(self):
+        instr = self.rm.open_resource(NAME, pooled=True)
+        session = instr.session
+        instr.close()
+        other = self.rm.open_resource(
+            NAME, access_mode=AccessModes.shared_lock, pooled=True
+        )
+        assert other.session != session
+        assert self.lib.calls["open"] == 2
+
+    def test_locked_session(self):
+        instr = self.rm.open_resource(NAME, pooled=True)
+        session = instr.session
+        instr.lock_excl()
+        instr.close()
+        assert session not in self.lib.sessions
+        assert len(self.rm.session_pool) == 0
+
+    def test_health_check(self):
+        instr = self.rm.open_resource(NAME, pooled=True)
+        session = instr.session
+        instr.close()
+        self.rm.session_pool.health_check = lambda visalib, session: False
+        instr = self.rm.open_resource(NAME, pooled=True)
+        assert instr.session != session
+        assert session not in self.lib.sessions
+
+    def test_idle_timeout(self):
+        instr = self.rm.open_resource(NAME, pooled=True)
+        session = instr.session
+        instr.close()
+        self.rm.session_pool.idle_timeout = 0
+        self.rm.session_pool.prune()
+        assert session not in self.lib.sessions
+        assert len(self.rm.session_pool) == 0
+
+    def test_max_size(self):
+        first = self.rm.open_resource(NAME, pooled=True)
+        second = self.rm.open_resource("TCPIP::192.168.0.2::INSTR", pooled=True)
+        self.rm.session_pool.max_size = 1
+        session = first.session
+        first.close()
+        second.close()
+        # The least recently released session is closed.
+        assert session not in self.lib.sessions
+        assert len(self.rm.session_pool) == 1
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Test batched register access using an in-memory VISA library."""
+
+import array
+
+import pytest
+
+from pyvisa.constants import AddressSpace, DataWidth
+from pyvisa.util import np
+
+from .fake_library import FakeLibraryTestCase
+
+A16 = AddressSpace.a16
+A24 = AddressSpace.a24
+
+
+class TestRegisters(FakeLibraryTestCase):
+    """Test reading and writing many registers at once."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.instr = self.rm.open_resource("VXI0::1::INSTR")
+        self.memory = self.lib.memory[self.instr.session]
+
+    def test_adjacent_registers(self):
+        self.memory.update({(A16, 0): 1, (A16, 2): 2, (A16, 4): 3, (A16, 8): 4})
+        registers = [(A16, 8, 16), (A16, 0, DataWidth.bit_16), (A16, 2, 16)]
+        registers.append((A16, 4, 16))
+        values = self.instr.read_registers(registers)
+        assert values == array.array("Q", [4, 1, 2, 3])
+        # Only the registers adjacent in the request are merged.
+        assert self.lib.calls["move_in"] == 1
+        assert self.lib.calls["read_memory"] == 1
+
+    def test_request_order(self):
+        self.memory.update({(A16, 0): 1, (A16, 2): 2, (A16, 4): 3})
+        reads = []
+        original = self.lib.read_memory
+
+        def read_memory(session, space, offset, width, extended=False):
+            reads.append(offset)
+            return original(session, space, offset, width, extended)
+
+        self.lib.read_memory = read_memory
+        registers = [(A16, 4, 16), (A16, 0, 16), (A16, 4, 16)]
+        values = self.instr.read_registers(registers, container=list)
+        assert values == [3, 1, 3]
+        # Registers are neither sorted nor read once when repeated.
+        assert reads == [4, 0, 4]
+        assert self.lib.calls["move_in"] == 0
+
+    def test_reorder(self):
+        self.memory.update({(A16, 0): 1, (A16, 2): 2, (A16, 4): 3, (A16, 8): 4})
+        registers = [(A16, 4, 16), (A16, 0, 16), (A16, 2, 16), (A16, 8, 16)]
+        registers.append((A16, 0, 16))
+        values = self.instr.read_registers(registers, reorder=True)
+        assert values == array.array("Q", [3, 1, 2, 4, 1])
+        assert self.lib.calls["move_in"] == 1
+        assert self.lib.calls["read_memory"] == 1
+
+    def test_different_widths(self):
+        self.memory.update({(A16, 0): 1, (A16, 2): 2})
+        values = self.instr.read_registers(
+            [(A16, 0, 8), (A16, 2, 16), (A16, 0, 8)], container=list, reorder=True
+        )
+        # Registers of different widths are not merged, duplicates read once.
+        assert values == [1, 2, 1]
+        assert self.lib.calls["read_memory"] == 2
+        assert self.lib.calls["move_in"] == 0
+
+    def test_mapped_registers(self):
+        offsets = [0x10, 0x40, 0x100, 0x400]
+        self.memory.update({(A24, o): o + 1 for o in offsets})
+        self.memory[(A16, 0x20)] = 7
+        registers = [(A24, o, 32) for o in offsets] + [(A16, 0x20, 32)]
+        values = self.instr.read_registers(registers, container=list)
+        assert values == [0x11, 0x41, 0x101, 0x401, 7]
+        assert self.lib.calls["map_address"] == 1
+        assert self.lib.calls["peek"] == 4
+        assert self.lib.calls["unmap_address"] == 1
+        assert self.lib.calls["read_memory"] == 1
+
+    def test_map_failure(self):
+        self.lib.mappable = False
+        offsets = [0x10, 0x40, 0x100, 0x400]
+        self.memory.update({(A24, o): o for o in offsets})
+        values = self.instr.read_registers([(A24, o, 8) for o in offsets], list)
+        assert values == offsets
+        assert self.lib.calls["read_memory"] == 4
+
+    @pytest.mark.skipif(np is None, reason="Requires numpy")
+    def test_numpy_container(self):
+        self.memory.update({(A16, 0): 1, (A16, 2): 2})
+        values = self.instr.read_registers([(A16, 0, 16), (A16, 2, 16)], np.array)
+        assert values.dtype == np.uint64
+        assert values.tolist() == [1, 2]
+
+    def test_invalid_width(self):
+        with pytest.raises(ValueError):
+            self.instr.read_registers([(A16, 0, 12)])
+
+    def test_write_registers(self):
+        offsets = [0x10, 0x40, 0x100, 0x400]
+        self.instr.write_registers(
+            [(A16, 0, 16, 1), (A16, 2, 16, 2), (A16, 2, 16, 3)]
+            + [(A24, o, 32, o) for o in offsets]
+        )
+        assert self.memory == {
+            (A16, 0): 1,
+            (A16, 2): 3,
+            **{(A24, o): o for o in offsets},
+        }
+        # Every write is performed, in the requested order.
+        assert self.lib.calls["move_out"] == 1
+        assert self.lib.calls["write_memory"] == 1
+        assert self.lib.calls["poke"] == 4
+
+    def test_write_registers_reorder(self):
+        self.instr.write_registers(
+            [(A16, 2, 16, 2), (A16, 0, 16, 1), (A16, 2, 16, 3)], reorder=True
+        )
+        # Only the last value of a register is written.
+        assert self.memory == {(A16, 0): 1, (A16, 2): 3}
+        assert self.lib.calls["move_out"] == 1
+        assert self.lib.calls["write_memory"] == 0
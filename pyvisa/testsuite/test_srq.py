@@ -0,0 +1,107 @@
+# -*- coding: utf-8 -*-
+"""Test dispatching service requests using a multiplexer."""
+
+import pytest
+
+from pyvisa import errors
+from pyvisa.constants import EventMechanism, EventType
+from pyvisa.srq import SRQMultiplexer
+
+from .fake_library import FakeLibraryTestCase
+
+
+class TestSRQMultiplexer(FakeLibraryTestCase):
+    """Test the service request multiplexer."""
+
+    def setup_method(self):
+        super().setup_method()
+        self.instrs = [
+            self.rm.open_resource("TCPIP::192.168.0.%d::INSTR" % i) for i in (1, 2)
+        ]
+
+    def request_service(self, instr, stb=0x41):
+        """Simulate a service request using the installed VISA handler."""
+        self.lib.stb[instr.session] = stb
+        handler = self.lib.handlers[instr.session][0][0]
+        handler(instr.session, EventType.service_request, 0, None)
+
+    def test_handler(self):
+        received = []
+        with SRQMultiplexer() as mux:
+            for instr in self.instrs:
+                mux.register(instr, lambda r, stb: received.append((r, stb)))
+            assert self.lib.calls["enable_event"] == 2
+            assert self.lib.calls["install_handler"] == 2
+
+            future = mux.next_srq(self.instrs[1])
+            self.request_service(self.instrs[1], 0x42)
+            assert future.result(1) == 0x42
+            self.request_service(self.instrs[0])
+            assert mux.wait_for_srq(self.instrs[0], 1) == 0x41
+            assert received == [(self.instrs[1], 0x42), (self.instrs[0], 0x41)]
+
+        assert not mux.running
+        assert mux.error is None
+        assert self.lib.calls["uninstall_handler"] == 2
+        assert all(not self.lib.handlers[i.session] for i in self.instrs)
+
+    def test_queue(self):
+        with SRQMultiplexer(EventMechanism.queue, poll_interval=0.001) as mux:
+            for instr in self.instrs:
+                mux.register(instr)
+            assert self.lib.calls["install_handler"] == 0
+            instr = self.instrs[0]
+            future = mux.next_srq(instr)
+            self.lib.stb[instr.session] = 0x40
+            self.lib.events[instr.session].append(EventType.service_request)
+            assert future.result(1) == 0x40
+
+    @pytest.mark.parametrize(
+        "mechanism", [EventMechanism.handler, EventMechanism.queue]
+    )
+    def test_closed_resource(self, mechanism):
+        with SRQMultiplexer(mechanism, poll_interval=0.001) as mux:
+            closed, instr = self.instrs
+            for i in self.instrs:
+                mux.register(i)
+            pending = mux.next_srq(closed)
+            if mechanism == EventMechanism.handler:
+                handler = self.lib.handlers[closed.session][0][0]
+                session = closed.session
+                closed.close()
+                handler(session, EventType.service_request, 0, None)
+            else:
+                closed.close()
+            # The closed resource is unregistered and the others still served.
+            future = mux.next_srq(instr)
+            self.lib.stb[instr.session] = 0x40
+            if mechanism == EventMechanism.handler:
+                self.request_service(instr)
+            else:
+                self.lib.events[instr.session].append(EventType.service_request)
+            assert future.result(1) & 0x40
+            assert pending.cancelled()
+            assert mux.running
+            assert mux.error is None
+            with pytest.raises(ValueError):
+                mux.next_srq(closed)
+
+    def test_rqs_only(self):
+        with SRQMultiplexer() as mux:
+            instr = self.instrs[0]
+            mux.register(instr)
+            future = mux.next_srq(instr)
+            self.request_service(instr, 0x01)
+            with pytest.raises(errors.VisaIOError) as exc_info:
+                mux.wait_for_srq(instr, 0.05)
+            assert exc_info.value.error_code == errors.StatusCode.error_timeout
+            assert not future.done()
+            mux.unregister(instr)
+            assert future.cancelled()
+
+    def test_not_registered(self):
+        mux = SRQMultiplexer()
+        with pytest.raises(ValueError):
+            mux.next_srq(self.instrs[0])
+        with pytest.raises(ValueError):
+            SRQMultiplexer(EventMechanism.suspend_handler)
@@ -368,6 +368,100 @@ class TestParser(BaseTestCase):
 
             self.round_trip_block_conversion(values, tb, fb, msg)
 
+    @pytest.mark.skipif(np is None, reason="Requires numpy")
+    @pytest.mark.parametrize("separator", [",", ", ", " "])
+    def test_parallel_ascii_block(self, monkeypatch, separator):
+        monkeypatch.setattr(util, "PARALLEL_PARSING_MIN_CHUNK", 16)
+        values = [val + 0.5 for val in range(999)]
+        for trailing in ("", separator):
+            block = util.to_ascii_block(values, "f", separator) + trailing
+            for workers in (1, 3, 1000):
+                parsed = util.from_ascii_block(
+                    block, "f", separator, np.array, workers=workers
+                )
+                assert list(parsed) == values
+        block = util.to_ascii_block(range(999), "d", separator)
+        parsed = util.from_ascii_block(block, "d", separator, np.array, workers=7)
+        assert parsed.dtype.kind == "i"
+        assert list(parsed) == list(range(999))
+
+    @pytest.mark.parametrize("use_numpy", [True, False])
+    def test_ascii_block_bytes(self, monkeypatch, use_numpy):
+        if use_numpy and np is None:
+            pytest.skip("Requires numpy")
+        if not use_numpy:
+            monkeypatch.setattr(util, "np", None)
+
+        def parse(block, converter, separator=",", container=list):
+            return util.from_ascii_block(block, converter, separator, container)
+
+        assert parse(bytearray(b"1.5;;-2e3;;3;;"), "f", ";;") == [1.5, -2000.0, 3.0]
+        assert parse(b"1, 2,\t3", "d") == [1, 2, 3]
+        assert parse(b"0x1F,-ff,+A", "x") == [31, -255, 10]
+        assert parse(b"0o17,7", "o") == [15, 7]
+        assert parse(b"0b101,-11", "b") == [5, -3]
+        assert parse(b"1,2,-3.5,4", "j") == [1 + 2j, -3.5 + 4j]
+        assert parse(b"123456789012345678901234567890,1", "d") == [
+            123456789012345678901234567890,
+            1,
+        ]
+        assert parse(b"", "f") == []
+
+        values = parse(b"1,2,3", "d", container=array.array)
+        assert isinstance(values, array.array) and list(values) == [1, 2, 3]
+
+        for block, converter in [
+            (b"1,x", "f"),
+            (b"1,,2", "d"),
+            (b"12,1g", "x"),
+            (b"1,2,3", "j"),
+        ]:
+            with pytest.raises(ValueError):
+                parse(block, converter)
+
+    @pytest.mark.skipif(np is None, reason="Requires numpy")
+    def test_ascii_block_numpy(self):
+        values = util.from_ascii_block(b"1 2\n 3\t4", "d", " ", np.array)
+        assert values.dtype == np.int64
+        assert list(values) == [1, 2, 3, 4]
+        values = util.from_ascii_block(b"1,2,-3.5,4", "j", ",", np.array)
+        assert values.dtype == np.complex128
+        assert list(values) == [1 + 2j, -3.5 + 4j]
+        values = util.from_ascii_block(b"1.5,2", "f", ",", array.array)
+        assert values.typecode == "d" and list(values) == [1.5, 2.0]
+        values = util.from_ascii_block(b" 1, 2 ,3,\n", "d", ",", np.array)
+        assert list(values) == [1, 2, 3]
+        # Saturated integers are parsed again instead of being trusted.
+        values = util.from_ascii_block(b"-9223372036854775809,1", "d", ",", list)
+        assert values == [-9223372036854775809, 1]
+
+    def test_iter_ascii_block(self):
+        values = [val * 1.5 - 7 for val in range(20)]
+        integers = list(range(-10, 10))
+        for fmt, data in [
+            ("f", values),
+            ("+.3E", values),
+            ("g", values),
+            ("d", integers),
+            ("x", integers),
+            ("o", integers),
+        ]:
+            expected = ", ".join(("%" + fmt) % v for v in data)
+            for chunk_size in (1, 7, 20, 100):
+                chunks = list(util.iter_ascii_block(data, fmt, ", ", chunk_size))
+                assert len(chunks) == -(-len(data) // chunk_size)
+                assert b"".join(chunks) == expected.encode("ascii")
+            assert util.to_ascii_block(iter(data), fmt, ", ") == expected
+            if np is not None:
+                array_chunks = util.iter_ascii_block(np.array(data), fmt, ", ", 7)
+                assert b"".join(array_chunks) == expected.encode("ascii")
+
+        assert list(util.iter_ascii_block([], "f")) == []
+        assert list(util.iter_ascii_block([1, 2], str, ":".join)) == [b"1:2"]
+        assert list(util.iter_ascii_block([1, 2, 3], "d", "%", 2)) == [b"1%2", b"%3"]
+        utf16 = list(util.iter_ascii_block([1, 2, 3], "d", ",", 2, "utf-16"))
+        assert utf16 == ["1,2,3".encode("utf-16")]
+
     def test_invalid_string_converter(self):
         with pytest.raises(ValueError) as ex:
             util.to_ascii_block([1, 2], "m")
@@ -459,6 +553,93 @@ class TestParser(BaseTestCase):
                 rt = fb(block, datatype=fmt, container=bytes)
                 assert values == rt
 
+    def test_array_binary_block(self):
+        for fmt in "bBhHiIlLqQfd":
+            values = [val + (0.5 if fmt in "fd" else 0) for val in range(99)]
+            for endi in (True, False):
+                msg = "fmt=%s, endianness=%s" % (fmt, endi)
+                endianess = ">" if endi else "<"
+                size = struct.calcsize(endianess + fmt)
+                expected = util.to_ieee_block(values, fmt, endi)
+                assert expected[-99 * size :] == struct.pack(
+                    "%s%d%s" % (endianess, len(values), fmt), *values
+                ), msg
+                arr = util.from_ieee_block(expected, fmt, endi, array.array)
+                assert isinstance(arr, array.array), msg
+                assert arr.itemsize == size, msg
+                assert arr.tolist() == values, msg
+                view = util.from_ieee_block(expected, fmt, endi, memoryview)
+                assert isinstance(view, memoryview), msg
+                assert view.tolist() == values, msg
+                native = endi == (sys.byteorder == "big")
+                assert (view.obj is expected) is native, msg
+                assert util.to_ieee_block(arr, fmt, endi) == expected, msg
+                assert util.to_ieee_block(view, fmt, endi) == expected, msg
+                assert arr.tolist() == values, msg
+
+    def test_array_binary_block_conversion(self):
+        block = util.to_ieee_block(array.array("d", [0.5, 1.5]), "f", False)
+        assert block == util.to_ieee_block([0.5, 1.5], "f", False)
+        view = memoryview(bytearray(b"\x01\x02"))
+        assert util.to_binary_block(view, b"", "h", False) == b"\x01\x00\x02\x00"
+
+    def test_block_codec(self):
+        values = list(range(99))
+        containers = [list, tuple, array.array, memoryview] + ([np.array] if np else [])
+        for header, tb, fb in zip(
+            ("ieee", "hp", "rs", "empty"),
+            (
+                util.to_ieee_block,
+                util.to_hp_block,
+                util.to_rs_block,
+                lambda v, d, e: util.to_binary_block(v, b"", d, e),
+            ),
+            (
+                util.from_ieee_block,
+                util.from_hp_block,
+                util.from_ieee_or_rs_block,
+                lambda b, d, e, c: util.from_binary_block(b, 0, None, d, e, c),
+            ),
+        ):
+            for fmt in "bHlqd":
+                for endi in (True, False):
+                    for cont in containers:
+                        msg = "header=%s, fmt=%s, endianness=%s, container=%s"
+                        msg = msg % (header, fmt, endi, cont)
+                        codec = util.BlockCodec(fmt, endi, header, cont)
+                        block = tb(values, fmt, endi)
+                        assert codec.encode(values) == block, msg
+                        assert codec.encode(tuple(values)) == block, msg
+                        expected = list(fb(block, fmt, endi, cont))
+                        assert list(codec.decode(block)) == expected, msg
+                        assert list(codec.decode(bytearray(block))) == expected, msg
+                        decoded = codec.decode(block)
+                        assert codec.encode(decoded) == block, msg
+
+    def test_block_codec_invalid(self):
+        with pytest.raises(ValueError):
+            util.BlockCodec("z")
+        with pytest.raises(ValueError):
+            util.BlockCodec("ff")
+        with pytest.raises(ValueError):
+            util.BlockCodec(header_fmt="invalid")  # type: ignore
+        codec = util.BlockCodec("h")
+        with pytest.raises(ValueError) as e:
+            codec.decode(b"#210\x00\x00")
+        assert "Binary data is incomplete" in e.exconly()
+        with pytest.raises(ValueError):
+            codec.decode(b"#A\x02\x00\x00\x00")
+
+    def test_block_codec_data(self):
+        codec = util.BlockCodec("s", container=bytes)
+        assert codec.decode_data(b"##abc", 2) == b"abc"
+        assert codec.encode(b"abc") == b"#13abc"
+        codec = util.BlockCodec("h", header_fmt="ieee", length_before_block=1)
+        with pytest.warns(UserWarning):
+            assert codec.decode(b"abc#14\x01\x00\x02\x00") == [1, 2]
+        for i in range(codec.MAX_CACHED_FORMATS + 2):
+            assert codec.decode_data(b"\x01\x00" * i) == [1] * i
+
     def test_no_start_of_block_indicator_binary_block_header(self):
         values = list(range(10))
         for header, tb, fb in zip(
@@ -608,8 +789,21 @@ class TestParser(BaseTestCase):
             with pytest.raises(OverflowError):
                 tb(values, datatype="q")
 
+    def test_block_header(self):
+        assert util.block_header(1000) == b"#41000"
+        assert util.block_header(1000, "rs") == b"#(1000)"
+        assert util.block_header(1000, "hp") == b"#A\xe8\x03"
+        assert util.block_header(1000, "hp", True) == b"#A\x03\xe8"
+        assert util.block_header(1000, "empty") == b""
+        with pytest.raises(ValueError):
+            util.block_header(1000, "invalid")  # type: ignore
+        with pytest.raises(OverflowError):
+            util.block_header(2**16, "hp")
+
     def test_handling_malformed_binary(self):
-        containers = (list, tuple) + ((np.array, np.ndarray) if np else ())
+        containers = (list, tuple, array.array, memoryview) + (
+            (np.array, np.ndarray) if np else ()
+        )
 
         # Use this to generate malformed data which should in theory be
         # impossible
@@ -621,7 +815,9 @@ class TestParser(BaseTestCase):
             with pytest.raises(ValueError) as e:
                 util.from_binary_block(DumbBytes(b"\x00\x00\x00"), container=container)
             assert (
-                "malformed" if container in (list, tuple) else "buffer" in e.exconly()
+                "malformed"
+                if container in (list, tuple, array.array, memoryview)
+                else "buffer" in e.exconly()
             )
 
     def round_trip_block_conversion(self, values, to_block, from_block, msg):
@@ -8,9 +8,11 @@ This file is part of PyVISA.
 
 """
 
+import array
 import functools
 import inspect
 import io
+import itertools
 import math
 import os
 import platform
@@ -19,6 +21,7 @@ import subprocess
 import sys
 import warnings
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from pathlib import Path
 from types import ModuleType
@@ -27,6 +30,7 @@ from typing import (
     Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Optional,
     Sequence,
@@ -284,47 +288,375 @@ _converters: Dict[str, Callable[[str], Any]] = {
     "F": float,
     "g": float,
     "G": float,
+    "j": float,
 }
 
+#: Converters for which the data can be parsed by numpy and the numpy type used.
 _np_converters = {
-    "d": "i",
-    "e": "d",
-    "E": "d",
-    "f": "d",
-    "F": "d",
-    "g": "d",
-    "G": "d",
+    "b": "i8",
+    "d": "i8",
+    "o": "i8",
+    "x": "i8",
+    "X": "i8",
+    "h": "i8",
+    "H": "i8",
+    "e": "f8",
+    "E": "f8",
+    "f": "f8",
+    "F": "f8",
+    "g": "f8",
+    "G": "f8",
+    "j": "c16",
 }
 
+#: Base of the integers written in binary, octal or hexadecimal.
+_integer_bases = {"b": 2, "o": 8, "x": 16, "X": 16, "h": 16, "H": 16}
+
+#: Letters allowed after a leading 0 to indicate the base (e.g. 0x1F).
+_base_prefixes = {2: b"bB", 8: b"oO", 16: b"xX"}
+
+#: Maximal number of digits of an integer that fits in 64 bits for each base.
+_max_digits = {2: 63, 8: 21, 10: 18, 16: 15}
+
+#: Characters stripped around the values of an ascii block.
+_WHITESPACE = b" \t\n\r\x0b\x0c"
+
+
+#: Minimal number of characters of an ascii block handled by each thread when
+#: parsing it in parallel.
+PARALLEL_PARSING_MIN_CHUNK = 2**20
+
+
+def _find_separators(buf: Any, separator: bytes) -> Any:
+    """Find the non-overlapping occurrences of separator in an uint8 array."""
+    assert np  # for typing
+    length = len(separator)
+    if length == 1:
+        return np.flatnonzero(buf == separator[0])
+
+    size = len(buf) - length + 1
+    if size <= 0:
+        return np.empty(0, np.intp)
+    match = buf[:size] == separator[0]
+    for i in range(1, length):
+        match &= buf[i : i + size] == separator[i]
+    positions = np.flatnonzero(match)
+
+    # Overlapping matches (such as ',,' in ',,,') are resolved from the left
+    if len(positions) > 1 and (np.diff(positions) < length).any():
+        kept = []
+        next_allowed = 0
+        for position in positions.tolist():
+            if position >= next_allowed:
+                kept.append(position)
+                next_allowed = position + length
+        positions = np.array(kept, np.intp)
+    return positions
+
+
+def _split_ascii_bytes(buf: Any, separator: str) -> Tuple[Any, Any]:
+    """Locate the values found in an uint8 array.
+
+    Whitespace around the values is ignored and a separator made only of
+    whitespace matches any run of whitespace.
+
+    Returns
+    -------
+    numpy.ndarray
+        Index at which each value starts.
+    numpy.ndarray
+        Index at which each value ends (excluded).
+
+    """
+    assert np  # for typing
+    if not separator.strip():
+        space = np.ones(len(buf) + 2, bool)
+        space[1:-1] = False
+        for char in _WHITESPACE:
+            space[1:-1] |= buf == char
+        edges = np.diff(space.view(np.int8))
+        return np.flatnonzero(edges == -1), np.flatnonzero(edges == 1)
+
+    positions = _find_separators(buf, separator.encode("ascii"))
+    starts = np.empty(len(positions) + 1, np.intp)
+    starts[0] = 0
+    starts[1:] = positions + len(separator)
+    ends = np.empty_like(starts)
+    ends[:-1] = positions
+    ends[-1] = len(buf)
+
+    # Whitespace characters are all below the space so most blocks are skipped
+    if (buf <= ord(" ")).any():
+        is_space = np.zeros(256, bool)
+        is_space[list(_WHITESPACE)] = True
+        last = len(buf) - 1
+        while True:
+            strip = (starts < ends) & is_space[buf[np.minimum(starts, last)]]
+            if not strip.any():
+                break
+            starts += strip
+        while True:
+            strip = (starts < ends) & is_space[buf[ends - 1]]
+            if not strip.any():
+                break
+            ends -= strip
+
+    # Ignore the empty value following a trailing separator
+    if starts[-1] == ends[-1]:
+        starts, ends = starts[:-1], ends[:-1]
+    return starts, ends
+
+
+def _digits_matrix(buf: Any, starts: Any, ends: Any) -> Tuple[Any, Any]:
+    """Copy the values into the rows of a 2D uint8 array, aligned on the right.
+
+    Returns
+    -------
+    numpy.ndarray
+        Characters of each value, the cells before a value containing arbitrary
+        data.
+    numpy.ndarray
+        Boolean mask of the cells containing the characters of the values.
+
+    """
+    assert np  # for typing
+    widths = ends - starts
+    width = int(widths.max())
+    padded = np.zeros(len(buf) + width, np.uint8)
+    padded[width:] = buf
+    # Copy a whole row at once by viewing each window of width bytes as a scalar
+    windows = np.ndarray((len(buf) + 1,), "V%d" % width, buffer=padded, strides=(1,))
+    matrix = windows[ends].view(np.uint8).reshape(len(starts), width)
+    # Values are at most 64 characters long so uint8 are enough for the mask
+    columns = np.arange(width, dtype=np.uint8)
+    inside = columns >= (width - widths).astype(np.uint8)[:, None]
+    return matrix, inside
+
+
+def _parse_decimals(
+    buf: Any, starts: Any, ends: Any, dtype: str, separator: str
+) -> Any:
+    """Convert decimal values using the numpy text parser.
+
+    The parser is given only the span of the block containing the values and
+    its result is checked against the located values, since numpy stops at
+    the first value it cannot parse.
+
+    Returns None if the values cannot be parsed by numpy.
+
+    """
+    assert np  # for typing
+    if dtype == "i8" and (ends - starts).max() > _max_digits[10]:
+        return None
+    try:
+        values = np.fromstring(
+            buf[starts[0] : ends[-1]].tobytes(), dtype, sep=separator
+        )
+    except ValueError:
+        return None
+    return values if len(values) == len(starts) else None
+
+
+def _parse_integers(buf: Any, starts: Any, ends: Any, base: int) -> Any:
+    """Convert the values to 64 bits integers digit by digit.
+
+    Returns None if some values are invalid or may not fit in 64 bits.
+
+    """
+    assert np  # for typing
+    last = len(buf) - 1
+    first = buf[starts]
+    negative = first == ord("-")
+    starts = starts + (negative | (first == ord("+")))
+    prefix = _base_prefixes[base]
+    second = buf[np.minimum(starts + 1, last)]
+    prefixed = (ends - starts > 1) & (buf[np.minimum(starts, last)] == ord("0"))
+    prefixed &= (second == prefix[0]) | (second == prefix[1])
+    starts += 2 * prefixed
+
+    widths = ends - starts
+    if (widths <= 0).any() or widths.max() > _max_digits[base]:
+        return None
+
+    digit_values = np.full(256, 255, np.uint8)
+    digit_values[np.frombuffer(b"0123456789", np.uint8)] = np.arange(10)
+    digit_values[np.frombuffer(b"abcdef", np.uint8)] = np.arange(10, 16)
+    digit_values[np.frombuffer(b"ABCDEF", np.uint8)] = np.arange(10, 16)
+    matrix, inside = _digits_matrix(buf, starts, ends)
+    digits = digit_values[matrix]
+    np.multiply(digits, inside, out=digits)
+    if digits.max() >= base:
+        return None
+
+    values = np.zeros(len(starts), np.int64)
+    for column in np.ascontiguousarray(digits.T):
+        values *= base
+        values += column
+    np.negative(values, out=values, where=negative)
+    return values
+
+
+def _parse_whole_block(data: Any, dtype: str, separator: str) -> Any:
+    """Convert decimal values separated by a single character in one numpy call.
+
+    The number of values is checked against the number of separators, which
+    detects the values numpy could not parse without locating each of them.
+
+    Returns None if the check fails.
+
+    """
+    assert np  # for typing
+    raw = bytes(data)
+    try:
+        values = np.fromstring(raw, dtype, sep=separator)
+    except ValueError:
+        return None
+    sep = separator.encode("ascii")
+    expected = int(np.count_nonzero(np.frombuffer(raw, np.uint8) == sep[0])) + 1
+    if raw.rstrip(_WHITESPACE).endswith(sep):
+        expected -= 1
+    if len(values) != expected:
+        return None
+    if dtype == "i8" and len(values):
+        # numpy saturates the integers which do not fit in 64 bits
+        info = np.iinfo(np.int64)
+        if values.max() == info.max or values.min() == info.min:
+            return None
+    return values
+
+
+def _parse_ascii_bytes(data: Any, converter: str, separator: str) -> Any:
+    """Parse an ascii block stored in a bytes-like object using numpy.
+
+    Decimal values separated by a single character are first parsed as a whole,
+    the values being located one by one only if that fails.
+
+    Returns None if the block cannot be parsed by numpy, in which case it should
+    be parsed by Python which also reports invalid values.
+
+    """
+    assert np  # for typing
+    if converter not in _integer_bases and len(separator) == 1 and separator.strip():
+        values = _parse_whole_block(data, _np_converters[converter], separator)
+        if values is not None:
+            return values
+
+    buf = np.frombuffer(data, np.uint8)
+    starts, ends = _split_ascii_bytes(buf, separator)
+    if not len(starts):
+        return np.empty(0, _np_converters[converter])
+    if (starts == ends).any():
+        return None
+
+    if converter in _integer_bases:
+        return _parse_integers(buf, starts, ends, _integer_bases[converter])
+    return _parse_decimals(buf, starts, ends, _np_converters[converter], separator)
+
+
+def _parse_ascii_block(
+    data: Union[bytes, bytearray, memoryview],
+    converter: str,
+    separator: str,
+    workers: int,
+) -> Any:
+    """Parse an ascii block using numpy, possibly in multiple threads.
+
+    For large blocks, the data are split at separators in chunks of similar
+    sizes which are parsed concurrently, numpy releasing the GIL during the
+    bulk of the parsing.
+
+    """
+    assert np  # for typing
+    view = memoryview(data).cast("B")
+    if converter == "j":
+        values = _parse_ascii_block(view, "f", separator, workers)
+        if len(values) % 2:
+            raise ValueError(
+                "Complex values require an even number of values (real,imag pairs)"
+            )
+        return values.view(np.complex128)
+
+    workers = min(workers, len(view) // PARALLEL_PARSING_MIN_CHUNK)
+    if workers <= 1:
+        return _parse_ascii_bytes(view, converter, separator)
+
+    raw = view.obj if isinstance(view.obj, (bytes, bytearray)) else view.tobytes()
+    sep = separator.encode("ascii")
+    step = len(view) // workers
+    bounds = []
+    start = 0
+    for i in range(1, workers):
+        end = raw.find(sep, max(i * step, start))
+        if end < 0:
+            break
+        bounds.append((start, end))
+        start = end + len(sep)
+    bounds.append((start, len(view)))
+
+    def parse(bound: Tuple[int, int]) -> Any:
+        return _parse_ascii_bytes(view[bound[0] : bound[1]], converter, separator)
+
+    with ThreadPoolExecutor(len(bounds)) as executor:
+        parts = list(executor.map(parse, bounds))
+    if any(part is None for part in parts):
+        return None
+    return np.concatenate(parts)
+
+
+def _to_container(values: Any, container: Callable) -> Any:
+    """Convert a numpy array to the requested container."""
+    if _use_numpy_routines(container):
+        return values
+    if container is array.array:
+        result = array.array(values.dtype.char)
+        result.frombytes(memoryview(values).cast("B"))
+        return result
+    if container is tuple:
+        return tuple(values.tolist())
+    return container(values.tolist())
+
 
 ASCII_CONVERTER = Union[
-    Literal["s", "b", "c", "d", "o", "x", "X", "e", "E", "f", "F", "g", "G"],
+    Literal["s", "b", "c", "d", "o", "x", "X", "e", "E", "f", "F", "g", "G", "j"],
     Callable[[str], Any],
 ]
 
 
 def from_ascii_block(
-    ascii_data: str,
+    ascii_data: Union[str, bytes, bytearray],
     converter: ASCII_CONVERTER = "f",
     separator: Union[str, Callable[[str], Iterable[str]]] = ",",
     container: Callable[
         [Iterable[Union[int, float]]], Sequence[Union[int, float]]
     ] = list,
+    workers: int = 1,
+    encoding: str = "ascii",
 ) -> Sequence:
     """Parse ascii data and return an iterable of numbers.
 
+    When numpy is available, numeric converters used with a str separator are
+    handled by a vectorized parser working directly on the bytes of the block.
+
     Parameters
     ----------
-    ascii_data : str
+    ascii_data : Union[str, bytes, bytearray]
         Data to be parsed.
     converter : ASCII_CONVERTER, optional
-        Str format of function to convert each value. Default to "f".
+        Str format of function to convert each value. The "j" code parses pairs
+        of values (real,imag) as complex numbers. Default to "f".
     separator : Union[str, Callable[[str], Iterable[str]]]
         str or callable used to split the data into individual elements.
         If a str is given, data.split(separator) is used. Default to ",".
     container : Union[Type, Callable[[Iterable], Sequence]], optional
         Container type to use for the output data. Possible values are: list,
-        tuple, np.ndarray, etc, Default to list.
+        tuple, np.ndarray, array.array, etc, Default to list.
+    workers : int, optional
+        Maximal number of threads used to parse large blocks. Only used when
+        the data are parsed by numpy (numeric converter and str separator).
+        Default to 1.
+    encoding : str, optional
+        Encoding used to decode bytes when the block cannot be parsed by numpy.
+        Default to "ascii".
 
     Returns
     -------
@@ -333,14 +665,30 @@ def from_ascii_block(
 
     """
     if (
-        _use_numpy_routines(container)
+        np is not None
         and isinstance(converter, str)
         and isinstance(separator, str)
         and converter in _np_converters
+        and separator
+        and separator.isascii()
     ):
-        assert np  # for typing
-        return np.fromstring(ascii_data, _np_converters[converter], sep=separator)
+        try:
+            raw = (
+                ascii_data.encode("ascii")
+                if isinstance(ascii_data, str)
+                else ascii_data
+            )
+        except UnicodeEncodeError:
+            pass
+        else:
+            parsed = _parse_ascii_block(raw, converter, separator, workers)
+            if parsed is not None:
+                return _to_container(parsed, container)
+
+    if not isinstance(ascii_data, str):
+        ascii_data = ascii_data.decode(encoding)
 
+    complex_pairs = converter == "j"
     if isinstance(converter, str):
         try:
             converter = _converters[converter]
@@ -358,7 +706,113 @@ def from_ascii_block(
     else:
         data = separator(ascii_data)
 
-    return container([converter(raw_value) for raw_value in data])
+    values = [converter(raw_value) for raw_value in data]
+    if complex_pairs:
+        if len(values) % 2:
+            raise ValueError(
+                "Complex values require an even number of values (real,imag pairs)"
+            )
+        values = [complex(r, i) for r, i in zip(values[::2], values[1::2])]
+    if container is array.array:
+        typecode = "d" if any(isinstance(v, float) for v in values) else "q"
+        return array.array(typecode, values)
+    return container(values)
+
+
+#: Number of values formatted at once when building an ascii block.
+ASCII_FORMATTING_CHUNK = 2**16
+
+#: Conversion types of printf-style formatting which can be applied to bytes and
+#: only produce ascii characters.
+_bytes_format_codes = "diouxXeEfFgG"
+
+
+@functools.lru_cache()
+def _ascii_compatible(encoding: str) -> bool:
+    """Whether an encoding encodes the ascii characters as ascii does."""
+    sample = "%0123456789+-.,;:eEfFgGxXoO \t\r\n"
+    try:
+        return sample.encode(encoding) == sample.encode("ascii")
+    except (LookupError, UnicodeError):
+        return False
+
+
+def _value_chunks(iterable: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Split an iterable in lists of at most chunk_size values."""
+    if np is not None and isinstance(iterable, np.ndarray) and iterable.ndim == 1:
+        # Converting numpy scalars in bulk is much faster than one by one
+        for start in range(0, len(iterable), chunk_size):
+            yield iterable[start : start + chunk_size].tolist()
+        return
+
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_ascii_block(
+    iterable: Iterable[Any],
+    converter: Union[str, Callable[[Any], str]] = "f",
+    separator: Union[str, Callable[[Iterable[str]], str]] = ",",
+    chunk_size: int = ASCII_FORMATTING_CHUNK,
+    encoding: str = "ascii",
+) -> Iterator[bytes]:
+    """Format an iterable of numbers as an encoded ascii block, chunk by chunk.
+
+    When using a str formatting code and a str separator, each chunk of values
+    is formatted by a single printf-style operation on bytes, which is much
+    faster than formatting the values one by one. Other converters and
+    separators, and encodings which are not ascii compatible (such as utf-16),
+    produce a single chunk.
+
+    Parameters
+    ----------
+    iterable : Iterable[Any]
+        Data to be formatted.
+    converter : Union[str, Callable[[Any], str]]
+        String formatting code or function used to convert each value.
+        Default to "f".
+    separator : Union[str, Callable[[Iterable[str]], str]]
+        str or callable that join individual elements into a str.
+        If a str is given, separator.join(data) is used.
+    chunk_size : int, optional
+        Number of values formatted in each chunk. Default to
+        ASCII_FORMATTING_CHUNK.
+    encoding : str, optional
+        Encoding used to turn the converter and separator into bytes. Default
+        to "ascii".
+
+    Yields
+    ------
+    bytes
+        Successive parts of the block.
+
+    """
+    if not (
+        isinstance(converter, str)
+        and isinstance(separator, str)
+        and converter[-1:] in _bytes_format_codes
+        and _ascii_compatible(encoding)
+    ):
+        yield to_ascii_block(iterable, converter, separator).encode(encoding)
+        return
+
+    item = ("%" + converter).encode(encoding)
+    # The separator is part of the format and must not be interpreted by it.
+    sep = separator.encode(encoding).replace(b"%", b"%%")
+    formats: Dict[Tuple[bool, int], bytes] = {}
+    first = True
+    for chunk in _value_chunks(iterable, chunk_size):
+        key = (first, len(chunk))
+        if key not in formats:
+            formats[key] = (
+                sep.join([item] * len(chunk)) if first else (sep + item) * len(chunk)
+            )
+        yield formats[key] % tuple(chunk)
+        first = False
 
 
 def to_ascii_block(
@@ -380,6 +834,14 @@ def to_ascii_block(
         If a str is given, separator.join(data) is used.
 
     """
+    if (
+        isinstance(converter, str)
+        and isinstance(separator, str)
+        and converter[-1:] in _bytes_format_codes
+    ):
+        chunks = iter_ascii_block(iterable, converter, separator, encoding="utf-8")
+        return b"".join(chunks).decode("utf-8")
+
     if isinstance(separator, str):
         separator = separator.join
 
@@ -404,6 +866,49 @@ BINARY_DATATYPES = Literal[
 BINARY_CONTAINERS = Union[type, Callable]
 
 
+def _array_typecode(datatype: str) -> Optional[str]:
+    """Typecode of the array.array (and memoryview format) matching a datatype.
+
+    The size of the C types used by array.array is platform dependent while
+    the size of the standard struct formats is not (e.g. 'l' is 4 bytes long),
+    so integer typecodes are selected based on their size.
+
+    """
+    if datatype in ("f", "d"):
+        return datatype
+    if datatype in ("b", "h", "i", "l", "q"):
+        candidates = "bhilq"
+    elif datatype in ("B", "H", "I", "L", "Q"):
+        candidates = "BHILQ"
+    else:
+        return None
+    size = struct.calcsize("<" + datatype)
+    for typecode in candidates:
+        if array.array(typecode).itemsize == size:
+            return typecode
+    return None
+
+
+def _np_dtype(datatype: str, is_big_endian: bool) -> Any:
+    """Numpy dtype matching a binary datatype using its struct standard size.
+
+    Numpy uses the native size of the C types so that 'l' and 'L' can be 8
+    bytes long.
+
+    """
+    assert np  # for typing
+    datatype = {"l": "i4", "L": "u4"}.get(datatype, datatype)
+    return np.dtype((">" if is_big_endian else "<") + datatype)
+
+
+#: Typecode of the array.array storing each binary datatype it supports.
+_array_typecodes: Dict[str, str] = {
+    k: v
+    for k, v in ((dt, _array_typecode(dt)) for dt in "bBhHiIlLqQfd")
+    if v is not None
+}
+
+
 def parse_ieee_block_header(
     block: Union[bytes, bytearray],
     length_before_block: Optional[int] = None,
@@ -940,25 +1445,51 @@ def from_binary_block(
         Are the data in big or little endian order.
     container : Union[Type, Callable[[Iterable], Sequence]], optional
         Container type to use for the output data. Possible values are: list,
-        tuple, np.ndarray, etc, Default to list.
+        tuple, np.ndarray, array.array, memoryview etc, Default to list.
 
     Returns
     -------
     Sequence[Union[int, float]]
         Parsed data.
 
+    Notes
+    -----
+    When using array.array or memoryview as container, the values are not
+    unpacked into Python objects. A memoryview references the original block
+    if the byte order of the data is the native one and is backed by an
+    array.array holding the byte swapped values otherwise.
+
     """
     if data_length is None:
         data_length = len(block) - offset
 
-    element_length = struct.calcsize(datatype)
+    element_length = struct.calcsize("<" + datatype)
     array_length = int(data_length / element_length)
 
     endianess = ">" if is_big_endian else "<"
 
     if _use_numpy_routines(container):
         assert np  # for typing
-        return np.frombuffer(block, endianess + datatype, array_length, offset)
+        return np.frombuffer(
+            block, _np_dtype(datatype, is_big_endian), array_length, offset
+        )
+
+    if (container is array.array or container is memoryview) and (
+        datatype in _array_typecodes
+    ):
+        typecode = _array_typecodes[datatype]
+        size = array_length * element_length
+        data = memoryview(block)[offset : offset + size]
+        if offset < 0 or len(data) != size:
+            raise ValueError("Binary data was malformed")
+        native = is_big_endian == (sys.byteorder == "big")
+        if native and container is memoryview:
+            return data.cast(typecode)
+        values = array.array(typecode)
+        values.frombytes(data)
+        if not native:
+            values.byteswap()
+        return values if container is array.array else memoryview(values)
 
     fullfmt = "%s%d%s" % (endianess, array_length, datatype)
 
@@ -997,6 +1528,13 @@ def to_binary_block(
     bytes
         Binary block of data preceded by the specified header
 
+    Notes
+    -----
+    array.array and contiguous memoryview whose format match the datatype are
+    copied as is into the block (after swapping the bytes if the requested byte
+    order is not the native one) without converting the values to Python
+    objects.
+
     """
     if isinstance(header, str):
         header = header.encode("ascii")
@@ -1015,7 +1553,22 @@ def to_binary_block(
 
     if _use_numpy_routines(type(iterable)):
         assert np and isinstance(iterable, np.ndarray)  # For typing
-        return header + iterable.astype(endianess + datatype).tobytes()
+        return header + iterable.astype(_np_dtype(datatype, is_big_endian)).tobytes()
+
+    typecode = _array_typecodes.get(datatype)
+    if typecode is not None and (
+        (isinstance(iterable, array.array) and iterable.typecode == typecode)
+        or (
+            isinstance(iterable, memoryview)
+            and iterable.format == typecode
+            and iterable.c_contiguous
+        )
+    ):
+        if is_big_endian == (sys.byteorder == "big"):
+            return header + iterable
+        swapped = array.array(typecode, iterable)
+        swapped.byteswap()
+        return header + swapped
 
     array_length = len(iterable)
     fullfmt = "%s%d%s" % (endianess, array_length, datatype)
@@ -1052,24 +1605,10 @@ def to_ieee_block(
 
     """
     array_length = len(iterable)
-    element_length = struct.calcsize(datatype)
+    element_length = struct.calcsize("<" + datatype)
     data_length = array_length * element_length
 
-    number_of_digits_in_data_length = f"{len(str(data_length)):X}"
-
-    if len(number_of_digits_in_data_length) > 1:
-        msg = (
-            "Block length in bytes cannot be greater than or equal to 1 PB "
-            "(it must be representable with 15 decimal digits), but the "
-            f"block length was {data_length} bytes, which requires "
-            f"{len(str(data_length))} digits to represent."
-        )
-        raise OverflowError(msg)
-
-    header = f"#{number_of_digits_in_data_length}{data_length:d}"
-
-    # header = "%d" % data_length
-    # header = "#%d%s" % (len(header), header)
+    header = block_header(data_length, "ieee")
 
     return to_binary_block(iterable, header, datatype, is_big_endian)
 
@@ -1099,10 +1638,10 @@ def to_rs_block(
 
     """
     array_length = len(iterable)
-    element_length = struct.calcsize(datatype)
+    element_length = struct.calcsize("<" + datatype)
     data_length = array_length * element_length
 
-    header = f"#({data_length:d})"
+    header = block_header(data_length, "rs")
 
     return to_binary_block(iterable, header, datatype, is_big_endian)
 
@@ -1130,22 +1669,351 @@ def to_hp_block(
 
     """
     array_length = len(iterable)
-    element_length = struct.calcsize(datatype)
+    element_length = struct.calcsize("<" + datatype)
     data_length = array_length * element_length
 
-    if data_length >= 2**16:
-        msg = (
-            "Block length in bytes cannot be greater than or equal to 64 KiB "
-            "(it must be representable with a 16-bit unsigned int), but the "
-            f"block length was {data_length} bytes."
+    header = block_header(data_length, "hp", is_big_endian)
+
+    return to_binary_block(iterable, header, datatype, is_big_endian)
+
+
+def block_header(
+    data_length: int,
+    header_fmt: BINARY_HEADERS = "ieee",
+    is_big_endian: bool = False,
+) -> bytes:
+    """Build the header of a binary block containing data_length bytes.
+
+    Parameters
+    ----------
+    data_length : int
+        Length of the data in the block in bytes.
+    header_fmt : BINARY_HEADERS, optional
+        Format of the header. Default to 'ieee'.
+    is_big_endian : bool, optional
+        Is the length encoded in big or little endian order. Used only for the
+        'hp' format. Default to False.
+
+    Returns
+    -------
+    bytes
+        Header of the block.
+
+    Raises
+    ------
+    OverflowError
+        Raised if the length of the block cannot be represented in the
+        requested format.
+
+    """
+    if header_fmt == "ieee":
+        number_of_digits_in_data_length = f"{len(str(data_length)):X}"
+
+        if len(number_of_digits_in_data_length) > 1:
+            msg = (
+                "Block length in bytes cannot be greater than or equal to 1 PB "
+                "(it must be representable with 15 decimal digits), but the "
+                f"block length was {data_length} bytes, which requires "
+                f"{len(str(data_length))} digits to represent."
+            )
+            raise OverflowError(msg)
+
+        return f"#{number_of_digits_in_data_length}{data_length:d}".encode("ascii")
+
+    elif header_fmt == "rs":
+        return f"#({data_length:d})".encode("ascii")
+
+    elif header_fmt == "hp":
+        if data_length >= 2**16:
+            msg = (
+                "Block length in bytes cannot be greater than or equal to 64 KiB "
+                "(it must be representable with a 16-bit unsigned int), but the "
+                f"block length was {data_length} bytes."
+            )
+            raise OverflowError(msg)
+
+        return b"#A" + int.to_bytes(
+            data_length, 2, "big" if is_big_endian else "little"
         )
-        raise OverflowError(msg)
 
-    header = b"#A" + (
-        int.to_bytes(data_length, 2, "big" if is_big_endian else "little")
-    )
+    elif header_fmt == "empty":
+        return b""
 
-    return to_binary_block(iterable, header, datatype, is_big_endian)
+    raise ValueError("Unsupported header_fmt: %s" % header_fmt)
+
+
+class BlockCodec:
+    """Conversion between binary blocks and sequences of values.
+
+    All the work that does not depend on the content of the block (validation
+    of the arguments, struct formats, numpy dtype, choice of the header parser
+    and of the conversion routine) is done once when creating the codec, which
+    makes it suitable to convert many small blocks.
+
+    Parameters
+    ----------
+    datatype : BINARY_DATATYPES, optional
+        Format string for a single element. See struct module. 'f' by default.
+    is_big_endian : bool, optional
+        Are the data (and the length of 'hp' headers) in big or little endian
+        order. Default to False.
+    header_fmt : BINARY_HEADERS, optional
+        Format of the header of the blocks. Blocks using the 'rs' format may
+        also use the 'ieee' format. Default to 'ieee'.
+    container : Union[Type, Callable[[Iterable], Sequence]], optional
+        Container type to use for the decoded data. Possible values are: list,
+        tuple, np.ndarray, array.array, memoryview etc, Default to list.
+    length_before_block : Optional[int], optional
+        Number of bytes to expect before the start of the block, see
+        parse_ieee_block_header. Default to None.
+    raise_on_late_block : bool, optional
+        Raise an error rather than warning when the block starts later than
+        expected. Default to False.
+
+    """
+
+    #: Format string for a single element. See struct module.
+    datatype: BINARY_DATATYPES
+
+    #: Are the data in big or little endian order.
+    is_big_endian: bool
+
+    #: Format of the header of the blocks.
+    header_fmt: BINARY_HEADERS
+
+    #: Container type used for the decoded data.
+    container: Callable[[Iterable[Union[int, float]]], Sequence[Union[int, float]]]
+
+    #: Size of a single element in bytes.
+    element_size: int
+
+    #: Maximal number of struct formats (one per block length) kept by a codec.
+    MAX_CACHED_FORMATS = 16
+
+    def __init__(
+        self,
+        datatype: BINARY_DATATYPES = "f",
+        is_big_endian: bool = False,
+        header_fmt: BINARY_HEADERS = "ieee",
+        container: Callable[
+            [Iterable[Union[int, float]]], Sequence[Union[int, float]]
+        ] = list,
+        length_before_block: Optional[int] = None,
+        raise_on_late_block: bool = False,
+    ) -> None:
+        endianess = ">" if is_big_endian else "<"
+        try:
+            if len(datatype) != 1:
+                raise struct.error()
+            self.element_size = struct.calcsize(endianess + datatype)
+        except struct.error:
+            raise ValueError("Unsupported datatype: %s" % datatype)
+
+        self._header_parser: Callable[[Union[bytes, bytearray]], Tuple[int, int]]
+        if header_fmt == "ieee":
+            self._header_parser = functools.partial(
+                parse_ieee_block_header,
+                length_before_block=length_before_block,
+                raise_on_late_block=raise_on_late_block,
+            )
+        elif header_fmt == "rs":
+            self._header_parser = functools.partial(
+                parse_ieee_or_rs_block_header,
+                length_before_block=length_before_block,
+                raise_on_late_block=raise_on_late_block,
+            )
+        elif header_fmt == "hp":
+            self._header_parser = functools.partial(
+                parse_hp_block_header,
+                is_big_endian=is_big_endian,
+                length_before_block=length_before_block,
+                raise_on_late_block=raise_on_late_block,
+            )
+        elif header_fmt == "empty":
+            self._header_parser = lambda block: (0, -1)
+        else:
+            raise ValueError("Unsupported header_fmt: %s" % header_fmt)
+
+        self.datatype = datatype
+        self.is_big_endian = is_big_endian
+        self.header_fmt = header_fmt
+        self.container = container
+        self._endianess = endianess
+        self._ieee = header_fmt in ("ieee", "rs")
+        self._dtype = None
+        self._typecode = None
+        self._swap = is_big_endian != (sys.byteorder == "big")
+        self._structs: Dict[int, struct.Struct] = {}
+        if _use_numpy_routines(container):
+            assert np  # for typing
+            self._dtype = _np_dtype(datatype, is_big_endian)
+        elif container is array.array or container is memoryview:
+            self._typecode = _array_typecodes.get(datatype)
+
+    def parse_header(self, block: Union[bytes, bytearray]) -> Tuple[int, int]:
+        """Parse the header of a block.
+
+        Parameters
+        ----------
+        block : Union[bytes, bytearray]
+            Block of data starting with a header in the format of the codec.
+
+        Returns
+        -------
+        int
+            Offset at which the data start.
+        int
+            Length of the data in bytes, -1 if the header does not specify it.
+
+        """
+        return self._header_parser(block)
+
+    def decode(self, block: Union[bytes, bytearray]) -> Sequence[Union[int, float]]:
+        """Decode a block including its header.
+
+        Parameters
+        ----------
+        block : Union[bytes, bytearray]
+            Block of data starting with a header in the format of the codec.
+
+        Returns
+        -------
+        Sequence[Union[int, float]]
+            Decoded data.
+
+        """
+        # Fast path for the common case of a definite length IEEE header at
+        # the start of the block.
+        if self._ieee and block[:1] == b"#" and b"1" <= block[1:2] <= b"9":
+            offset = block[1] - 46
+            data_length = int(block[2:offset])
+        else:
+            offset, data_length = self._header_parser(block)
+
+        # If the data length is not reported takes all the data and do not make
+        # any assumption about the termination character
+        if data_length == -1:
+            data_length = len(block) - offset
+
+        if len(block) < offset + data_length:
+            raise ValueError(
+                "Binary data is incomplete. The header states %d data"
+                " bytes, but %d were received." % (data_length, len(block) - offset)
+            )
+
+        return self.decode_data(block, offset, data_length)
+
+    def decode_data(
+        self,
+        block: Union[bytes, bytearray],
+        offset: int = 0,
+        data_length: Optional[int] = None,
+    ) -> Sequence[Union[int, float]]:
+        """Decode the data of a block whose header has already been parsed.
+
+        This is equivalent to from_binary_block.
+
+        Parameters
+        ----------
+        block : Union[bytes, bytearray]
+            Block of data.
+        offset : int, optional
+            Offset at which the actual data starts. Default to 0.
+        data_length : Optional[int], optional
+            Length of the data in bytes. Default to None meaning all the data
+            after offset.
+
+        Returns
+        -------
+        Sequence[Union[int, float]]
+            Decoded data.
+
+        """
+        if data_length is None:
+            data_length = len(block) - offset
+        array_length = data_length // self.element_size
+
+        if self._dtype is not None:
+            assert np  # for typing
+            return np.frombuffer(block, self._dtype, array_length, offset)
+
+        if self._typecode is None or self.datatype in "sp":
+            fmt = self._struct(array_length)
+            try:
+                raw_data = fmt.unpack_from(block, offset)
+            except struct.error:
+                raise ValueError("Binary data was malformed")
+            if self.datatype in "sp":
+                return self.container(raw_data[0])
+            return self.container(raw_data)
+
+        size = array_length * self.element_size
+        data = memoryview(block)[offset : offset + size]
+        if offset < 0 or len(data) != size:
+            raise ValueError("Binary data was malformed")
+        if not self._swap and self.container is memoryview:
+            return data.cast(self._typecode)
+        values = array.array(self._typecode)
+        values.frombytes(data)
+        if self._swap:
+            values.byteswap()
+        return values if self.container is array.array else memoryview(values)
+
+    def encode(self, values: Sequence[Union[int, float]]) -> bytes:
+        """Encode values into a block preceded by a header.
+
+        Parameters
+        ----------
+        values : Sequence[Union[int, float]]
+            Values to encode.
+
+        Returns
+        -------
+        bytes
+            Binary block of data preceded by a header in the format of the codec.
+
+        """
+        header = block_header(
+            len(values) * self.element_size, self.header_fmt, self.is_big_endian
+        )
+        return self.encode_data(values, header)
+
+    def encode_data(
+        self, values: Sequence[Union[int, float]], header: bytes = b""
+    ) -> bytes:
+        """Encode values into a block preceded by an arbitrary header.
+
+        This is equivalent to to_binary_block.
+
+        Parameters
+        ----------
+        values : Sequence[Union[int, float]]
+            Values to encode.
+        header : bytes, optional
+            Header which should prefix the binary block. Default to b"".
+
+        Returns
+        -------
+        bytes
+            Binary block of data preceded by the specified header
+
+        """
+        if isinstance(values, (list, tuple)) and self.datatype not in "sp":
+            return header + self._struct(len(values)).pack(*values)
+
+        return to_binary_block(values, header, self.datatype, self.is_big_endian)
+
+    def _struct(self, array_length: int) -> struct.Struct:
+        """Get the struct handling a given number of values."""
+        try:
+            return self._structs[array_length]
+        except KeyError:
+            if len(self._structs) >= self.MAX_CACHED_FORMATS:
+                self._structs.clear()
+            fmt = self._structs[array_length] = struct.Struct(
+                "%s%d%s" % (self._endianess, array_length, self.datatype)
+            )
+            return fmt
 
 
 # The actual value would be:
@@ -1405,7 +2273,7 @@ def message_size(
         The total message size in bytes
 
     """
-    data_length = num_points * struct.calcsize(datatype)
+    data_length = num_points * struct.calcsize("<" + datatype)
     if header_format == "ieee":
         header_length = len(f"{data_length}") + 2
     elif header_format == "hp":